@@ -0,0 +1,330 @@
+"""
+baker's percentages of recipes and mini-batch k-means clustering of them
+
+a baker's percentage is the mass of an ingredient relative to the mass of
+the base: every flour and the cornmeal. Scaling a recipe up or down does not
+change them, so variants of a dish (the three cornbreads of comparisons.py,
+or thousands of scraped ones) can be grouped into families by their ratios
+alone. The ratios are kept in a growing NumPy matrix and clustered with
+mini-batch k-means, which also takes new recipes as they are ingested.
+"""
+import numpy as np
+
+from corpus_index import mass_terms
+
+# keywords of the ingredients that make up the base, 100%
+BASE_KEYWORDS = frozenset(('flour', 'cornmeal'))
+
+def bakers_percentages(ingredients) -> dict:
+    """
+    returns a dict of term -> percentage of the base for every ingredient
+    with a mass, see corpus_index.mass_terms for the terms. The base terms
+    themselves add up to 100. Returns an empty dict if there is no flour or
+    cornmeal
+    """
+    terms = mass_terms(ingredients)
+    base = sum(grams for term, grams in terms.items()
+               if not BASE_KEYWORDS.isdisjoint(term.split(' ')))
+    if base <= 0:
+        return {}
+    return {term: 100 * grams / base for term, grams in terms.items()}
+
+
+class RatioClusters:
+    """
+    baker's percentage vectors of many recipes grouped with mini-batch k-means
+
+    rows are recipes and columns are ingredient terms, both grow as recipes
+    are added. Each centroid keeps the number of recipes it has absorbed and
+    moves to the running mean of them, so fitting on batches gives the same
+    centroid as absorbing the recipes one at a time. Assigning a recipe only
+    compares it with the k centroids, whatever the size of the corpus
+    """
+
+    def __init__(self, k: int = 4, batchSize: int = 256, seed: int = 0):
+        """
+        constructor class
+
+        Parameters:
+            k: int:
+                number of clusters
+
+            batchSize: int:
+                number of recipes sampled for each step of fit
+
+            seed: int:
+                seed of the centroid initialisation and of the batch sampling
+
+        Attributes:
+            self._data:
+                rows x columns capacity array of percentages, only the first
+                len(self._keys) rows and len(self._vocabulary) columns are used
+
+            self._centroids:
+                k x len(self._vocabulary) array, None until there are at least
+                k recipes to start from
+
+            self._counts:
+                number of recipes each centroid has absorbed
+
+        Raises:
+            TypeError:
+                if k or batchSize is not an int
+            ValueError:
+                if k or batchSize is less than 1
+        """
+        for label, value in (('k', k), ('batchSize', batchSize)):
+            if not isinstance(value, int) or isinstance(value, bool):
+                raise TypeError(f"{label} must be an int but is a {type(value)}")
+            if value < 1:
+                raise ValueError(f"{label} must be at least 1 but is {value}")
+        self._k = k
+        self._batchSize = batchSize
+        self._random = np.random.default_rng(seed)
+        self._vocabulary = {}
+        self._keys = []
+        self._data = np.zeros((16, 16))
+        self._centroids = None
+        self._counts = np.zeros(k)
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def vocabulary(self) -> list:
+        """
+        returns the terms of the vocabulary in column order
+        """
+        return list(self._vocabulary)
+
+    def keys(self) -> list:
+        return list(self._keys)
+
+    def _vector(self, percentages: dict, grow: bool) -> np.ndarray:
+        """
+        internal method that returns percentages as a vector over the
+        vocabulary. Unknown terms are added to the vocabulary if grow is True
+        and left out otherwise
+        """
+        if grow:
+            for term in percentages:
+                self._vocabulary.setdefault(term, len(self._vocabulary))
+            self._reserve(len(self._keys) + 1, len(self._vocabulary))
+        vector = np.zeros(len(self._vocabulary))
+        for term, percentage in percentages.items():
+            column = self._vocabulary.get(term)
+            if column is not None:
+                vector[column] = percentage
+        return vector
+
+    def _reserve(self, rows: int, columns: int) -> None:
+        """
+        internal method that grows self._data to hold rows x columns by
+        doubling, and pads the centroids with zeros for new columns
+        """
+        capacityRows, capacityColumns = self._data.shape
+        if rows > capacityRows or columns > capacityColumns:
+            while capacityRows < rows:
+                capacityRows *= 2
+            while capacityColumns < columns:
+                capacityColumns *= 2
+            data = np.zeros((capacityRows, capacityColumns))
+            used = self._data[:len(self._keys)]
+            data[:used.shape[0], :used.shape[1]] = used
+            self._data = data
+        if self._centroids is not None and self._centroids.shape[1] < columns:
+            self._centroids = np.pad(
+                self._centroids,
+                ((0, 0), (0, columns - self._centroids.shape[1])))
+
+    def matrix(self) -> np.ndarray:
+        """
+        returns a copy of the recipes x terms array of percentages
+        """
+        return self._data[:len(self._keys), :len(self._vocabulary)].copy()
+
+    def add(self, recipe, key=None) -> int:
+        """
+        adds the baker's percentages of recipe and returns its row. key
+        defaults to the recipe title. The centroids are not moved, see
+        partial_fit
+
+        Raises:
+            ValueError:
+                if recipe has no flour or cornmeal
+        """
+        percentages = bakers_percentages(recipe.ingredients())
+        if not percentages:
+            raise ValueError(f"{recipe.title()} has no flour or cornmeal to "
+                             "compute baker's percentages from")
+        vector = self._vector(percentages, grow=True)
+        row = len(self._keys)
+        self._data[row, :len(vector)] = vector
+        self._keys.append(recipe.title() if key is None else key)
+        return row
+
+    def add_many(self, recipes) -> list:
+        """
+        adds every recipe of recipes that has flour or cornmeal and returns
+        the list of their rows
+        """
+        rows = []
+        for recipe in recipes:
+            try:
+                rows.append(self.add(recipe))
+            except ValueError:
+                continue
+        return rows
+
+    def _initialize(self) -> None:
+        """
+        internal method that picks the first centroids from the recipes with
+        k-means++, each next centroid is drawn with a probability
+        proportional to its squared distance from the nearest one chosen
+        """
+        data = self.matrix()
+        centroids = [data[self._random.integers(len(data))]]
+        distances = ((data - centroids[0]) ** 2).sum(axis=1)
+        for _ in range(1, self._k):
+            total = distances.sum()
+            if total > 0:
+                row = self._random.choice(len(data), p=distances / total)
+            else:
+                row = self._random.integers(len(data))
+            centroids.append(data[row])
+            distances = np.minimum(distances,
+                                   ((data - data[row]) ** 2).sum(axis=1))
+        self._centroids = np.array(centroids)
+        self._counts = np.zeros(self._k)
+
+    def _nearest(self, vectors: np.ndarray) -> np.ndarray:
+        """
+        internal method that returns the index of the nearest centroid of
+        every row of vectors
+        """
+        centroids = self._centroids
+        distances = ((vectors * vectors).sum(axis=1)[:, np.newaxis]
+                     - 2 * vectors @ centroids.T
+                     + (centroids * centroids).sum(axis=1))
+        return distances.argmin(axis=1)
+
+    def _step(self, rows) -> None:
+        """
+        internal method that moves each centroid to the running mean of the
+        recipes it had absorbed and the recipes of rows nearest to it
+        """
+        vectors = self._data[rows, :len(self._vocabulary)]
+        nearest = self._nearest(vectors)
+        added = np.bincount(nearest, minlength=self._k)
+        sums = np.zeros_like(self._centroids)
+        np.add.at(sums, nearest, vectors)
+        moved = added > 0
+        counts = self._counts + added
+        self._centroids[moved] = (
+            (self._centroids[moved] * self._counts[moved, np.newaxis]
+             + sums[moved]) / counts[moved, np.newaxis])
+        self._counts = counts
+
+    def fit(self, iterations: int = 50) -> 'RatioClusters':
+        """
+        starts the centroids again from the recipes and runs iterations
+        mini-batch steps over batchSize recipes sampled from all of them
+
+        Raises:
+            ValueError:
+                if there are fewer recipes than clusters
+        """
+        if len(self._keys) < self._k:
+            raise ValueError(f"fit needs at least {self._k} recipes but has "
+                             f"{len(self._keys)}")
+        self._initialize()
+        size = min(self._batchSize, len(self._keys))
+        for _ in range(iterations):
+            self._step(self._random.choice(len(self._keys), size,
+                                           replace=False))
+        return self
+
+    def partial_fit(self, recipes) -> list:
+        """
+        adds recipes and moves the centroids with one mini-batch step over
+        them, so clusters follow recipes as they are ingested without fitting
+        the whole corpus again. The centroids are started from the corpus the
+        first time there are at least k recipes. Returns the rows added
+        """
+        rows = self.add_many(recipes)
+        stepRows = rows
+        if self._centroids is None:
+            if len(self._keys) < self._k:
+                return rows
+            self._initialize()
+            # the recipes added before the centroids started are absorbed too
+            stepRows = list(range(len(self._keys)))
+        if stepRows:
+            self._step(stepRows)
+        return rows
+
+    def _check_fitted(self) -> None:
+        if self._centroids is None:
+            raise ValueError("the clusters are not fitted yet, see fit")
+
+    def assign(self, recipe) -> int:
+        """
+        returns the cluster nearest to the baker's percentages of recipe.
+        Terms that no added recipe has are left out
+
+        Raises:
+            ValueError:
+                if the clusters are not fitted or recipe has no flour or
+                cornmeal
+        """
+        self._check_fitted()
+        percentages = bakers_percentages(recipe.ingredients())
+        if not percentages:
+            raise ValueError(f"{recipe.title()} has no flour or cornmeal to "
+                             "compute baker's percentages from")
+        vector = self._vector(percentages, grow=False)
+        return int(self._nearest(vector[np.newaxis, :])[0])
+
+    def labels(self) -> np.ndarray:
+        """
+        returns the nearest cluster of every added recipe
+
+        Raises:
+            ValueError:
+                if the clusters are not fitted
+        """
+        self._check_fitted()
+        return self._nearest(self._data[:len(self._keys),
+                                        :len(self._vocabulary)])
+
+    def centroids(self) -> np.ndarray:
+        """
+        returns a copy of the k x terms array of centroids
+
+        Raises:
+            ValueError:
+                if the clusters are not fitted
+        """
+        self._check_fitted()
+        return self._centroids.copy()
+
+    def clusters(self) -> list:
+        """
+        returns a list with the keys of the recipes in each cluster
+        """
+        result = [[] for _ in range(self._k)]
+        for key, label in zip(self._keys, self.labels()):
+            result[label].append(key)
+        return result
+
+    def describe(self, cluster: int, top: int = 5) -> list:
+        """
+        returns (term, percentage) of the top largest ingredients of the
+        centroid of cluster, largest first, such as [('cornmeal', 62.0),
+        ('white sugar', 40.0), ('flour', 38.0), ...] for a sweet cornbread
+        family
+        """
+        centroid = self.centroids()[cluster]
+        terms = self.vocabulary()
+        order = np.argsort(-centroid, kind='stable')[:top]
+        return [(terms[column], float(centroid[column]))
+                for column in order if centroid[column] > 0]
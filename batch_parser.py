@@ -0,0 +1,98 @@
+import os
+from bootstrap import get_parser, local_nltk_data
+
+# sample line parsed once by each worker so the CRF model and tagger are
+# loaded before the first real chunk arrives
+WARM_UP_LINE = '1 cup flour'
+
+def _load_parser():
+    """
+    internal function that returns parse_ingredient, loaded once per process
+    through the shared bootstrap module
+    """
+    return get_parser()
+
+def _init_worker() -> None:
+    """
+    internal function run once in each worker process, loads the parser model
+    and the local tagger with a warm up parse
+    """
+    _load_parser()(WARM_UP_LINE)
+
+def parse_lines(lines, workers: int | None = None,
+                chunksize: int | None = None, cache=None) -> list:
+    """
+    parses every ingredient line with ingredient_parser.parse_ingredient,
+    spreading the lines across a pool of worker processes. Returns the parsed
+    ingredients in the same order as lines
+
+    Parameters:
+        lines: iterable of str:
+            raw ingredient lines, such as '1 cup (125g) all-purpose flour'
+
+        workers: int or None:
+            number of worker processes, defaults to the number of cpus.
+            1 parses in the current process without starting a pool
+
+        chunksize: int or None:
+            number of lines sent to a worker at a time, defaults to spreading
+            the lines in about four chunks per worker
+
+    Precondition:
+        lines must only contain str
+        workers and chunksize must be positive ints or None
+
+    Raises:
+        TypeError:
+            if a line, workers or chunksize is not the correct type
+        ValueError:
+            if workers or chunksize is not a positive int
+    """
+    lines = list(lines)
+    for line in lines:
+        if not isinstance(line, str):
+            raise TypeError(f"each line must be a str but is a {type(line)}")
+
+    if workers is None:
+        workers = os.cpu_count() or 1
+    for label, value in (('workers', workers), ('chunksize', chunksize)):
+        if value is None:
+            continue
+        if not isinstance(value, int) or isinstance(value, bool):
+            raise TypeError(f"{label} must be an int but is a {type(value)}")
+        if value < 1:
+            raise ValueError(f"{label} must be at least 1 but is {value}")
+
+    if cache is None:
+        return _parse_all(lines, workers, chunksize)
+
+    results = [None] * len(lines)
+    missing = {}    # cache key -> positions of the lines with that key
+    for position, line in enumerate(lines):
+        parsed = cache.get(line)
+        if parsed is None:
+            missing.setdefault(cache.key(line), []).append(position)
+        else:
+            results[position] = parsed
+
+    keys = list(missing)
+    for key, parsed in zip(keys, _parse_all(keys, workers, chunksize)):
+        cache.put(key, parsed)
+        for position in missing[key]:
+            results[position] = parsed
+    return results
+
+def _parse_all(lines: list, workers: int, chunksize: int | None) -> list:
+    """
+    internal function that parses every line, in the shared pool of warm
+    parser processes (see parser_pool) if there is more than one worker and
+    more than one line. The pool outlives the call so later calls do not load
+    the parser again
+    """
+    if min(workers, len(lines)) <= 1:
+        parse_ingredient = _load_parser()
+        return [parse_ingredient(line) for line in lines]
+
+    # the pool, and multiprocessing, are only started once actually needed
+    from parser_pool import get_parser_pool
+    return get_parser_pool(workers).parse(lines, chunksize)
@@ -0,0 +1,4 @@
+"""
+micro-benchmarks for the hot paths of the tool, each module can be run with
+python -m benchmarks.<module>
+"""
@@ -0,0 +1,54 @@
+"""
+times fitting bakers_percentage.RatioClusters on the synthetic benchmark
+corpus, ingesting it again in batches with partial_fit, and assigning a
+recipe to its nearest cluster as the corpus grows
+
+    python -m benchmarks.bench_bakers_percentage
+"""
+import timeit
+
+from bakers_percentage import RatioClusters
+from benchmarks.suite import _prepare
+from benchmarks.corpora import load_corpus
+
+def main(repeat: int = 5, k: int = 4, batch: int = 16) -> dict:
+    recipes = _prepare(load_corpus('synthetic'))['recipes']
+
+    def fit() -> RatioClusters:
+        clusters = RatioClusters(k=k)
+        clusters.add_many(recipes)
+        return clusters.fit()
+
+    def ingest() -> RatioClusters:
+        clusters = RatioClusters(k=k)
+        for start in range(0, len(recipes), batch):
+            clusters.partial_fit(recipes[start:start + batch])
+        return clusters
+
+    clusters = fit()
+    grown = RatioClusters(k=k)
+    for _ in range(8):
+        grown.add_many(recipes)
+    grown.fit()
+    query = recipes[0]
+
+    results = {
+        'recipes': len(clusters),
+        'terms': len(clusters.vocabulary()),
+        'fit_ms': min(timeit.repeat(fit, number=1, repeat=repeat)) * 1000,
+        'ingest_ms': min(timeit.repeat(ingest, number=1, repeat=repeat)) * 1000,
+        'assign_us': min(timeit.repeat(lambda: clusters.assign(query),
+                                       number=100, repeat=repeat)) * 1e4,
+        'assign_grown_us': min(timeit.repeat(lambda: grown.assign(query),
+                                             number=100, repeat=repeat)) * 1e4,
+    }
+    print(f"{results['recipes']} recipes with flour or cornmeal, "
+          f"{results['terms']} terms, k={k}")
+    print(f"add and fit {results['fit_ms']:.2f} ms, partial_fit in batches "
+          f"of {batch} {results['ingest_ms']:.2f} ms")
+    print(f"assign {results['assign_us']:.1f} us, with 8x the recipes "
+          f"{results['assign_grown_us']:.1f} us")
+    return results
+
+if __name__ == '__main__':
+    main()
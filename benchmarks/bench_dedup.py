@@ -0,0 +1,83 @@
+"""
+plants near-duplicates (one ingredient dropped, or reordered with reworded
+names) among the recipes of the synthetic benchmark corpus, then compares finding them with
+dedup.DuplicateIndex against pairing the ingredients of every pair with Recipe.match_ingredients, the
+work compare_recipe does before formatting:
+time, and how many planted copies the index flags
+
+    python -m benchmarks.bench_dedup
+"""
+import random
+import timeit
+
+from dedup import DuplicateIndex
+from ingredient_class import Ingredient
+from recipe_class import Recipe
+from benchmarks.suite import _prepare
+from benchmarks.corpora import load_corpus
+
+def plant_copies(corpus: dict, seed: int = 23) -> list:
+    """
+    returns (copy, original title) of a near-duplicate of every recipe of
+    corpus, with its last ingredient dropped or its ingredients shuffled and
+    prefixed with a filler word
+    """
+    generator = random.Random(seed)
+    copies = []
+    for recipe in corpus['recipes']:
+        ingredients = [list(ingredient) for ingredient in recipe['ingredients']]
+        if generator.random() < 0.5 and len(ingredients) > 6:
+            ingredients = ingredients[:-1]
+            title = f"{recipe['title']} (trimmed)"
+        else:
+            generator.shuffle(ingredients)
+            for ingredient in ingredients:
+                ingredient[0] = f'organic {ingredient[0]}'
+            title = f"{recipe['title']} (reworded)"
+        copy = Recipe.from_ingredients(title, '', [Ingredient(*ingredient)
+                                                   for ingredient in ingredients], '')
+        copies.append((copy, recipe['title']))
+    return copies
+
+def main(repeat: int = 3, threshold: float = 0.7) -> dict:
+    raw = load_corpus('synthetic')
+    recipes = _prepare(raw)['recipes']
+    copies = plant_copies(raw)
+    corpus = recipes + [copy for copy, _ in copies]
+
+    def ingest() -> DuplicateIndex:
+        index = DuplicateIndex(threshold)
+        for recipe in corpus:
+            index.add(recipe)
+        return index
+
+    def all_pairs():
+        for first in range(len(corpus)):
+            for second in range(first + 1, len(corpus)):
+                corpus[first].match_ingredients(corpus[second])
+
+    index = DuplicateIndex(threshold)
+    for recipe in recipes:
+        index.add(recipe)
+    found = sum(original in [key for key, _ in index.add(copy)]
+                for copy, original in copies)
+
+    results = {
+        'recipes': len(corpus),
+        'planted': len(copies),
+        'found': found,
+        'candidate_pairs': len(index.candidate_pairs()),
+        'lsh_ms': min(timeit.repeat(ingest, number=1, repeat=repeat)) * 1000,
+        'all_pairs_ms': min(timeit.repeat(all_pairs, number=1,
+                                          repeat=repeat)) * 1000,
+    }
+    pairs = len(corpus) * (len(corpus) - 1) // 2
+    print(f"{results['recipes']} recipes, {found} of {len(copies)} planted "
+          f"copies flagged at threshold {threshold}")
+    print(f"{results['candidate_pairs']} candidate pairs of {pairs}")
+    print(f"DuplicateIndex ingest {results['lsh_ms']:.1f} ms, "
+          f"match_ingredients on every pair {results['all_pairs_ms']:.1f} ms")
+    return results
+
+if __name__ == '__main__':
+    main()
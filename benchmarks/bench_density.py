@@ -0,0 +1,86 @@
+"""
+compares DensityTable.lookup (exact then substring) with DensityTable.match
+(exact, whole words, trigrams, then substring) on misspelled and reordered
+versions of the density keys: how often each finds the intended key and how
+long a lookup takes
+
+    python -m benchmarks.bench_density
+"""
+import random
+import timeit
+from collections import Counter
+
+from density_table import DensityTable
+
+def misspell(key: str, generator: random.Random) -> str:
+    """
+    returns key with one letter dropped, doubled or swapped with the next
+    """
+    positions = [index for index, char in enumerate(key) if char.isalpha()]
+    index = generator.choice(positions[:-1] or positions)
+    change = generator.randrange(3)
+    if change == 0:
+        return key[:index] + key[index + 1:]
+    if change == 1:
+        return key[:index] + key[index] + key[index:]
+    return key[:index] + key[index + 1:index + 2] + key[index] + key[index + 2:]
+
+def reorder(key: str) -> str:
+    """
+    returns key with its last word moved to the front, such as
+    'flour, all-purpose' for 'all-purpose flour'
+    """
+    words = key.split()
+    return ', '.join([words[-1], ' '.join(words[:-1])])
+
+def make_queries(table: DensityTable, seed: int = 19) -> list:
+    """
+    returns (query, intended key) for a misspelling of every key and a
+    reordering of every key with more than one word
+    """
+    generator = random.Random(seed)
+    keys = [key for key in table._keys if len(key) > 3]
+    queries = [(misspell(key, generator), key) for key in keys]
+    queries += [(reorder(key), key) for key in keys if ' ' in key]
+    return queries
+
+def main(repeat: int = 5) -> dict:
+    table = DensityTable.from_file()
+    queries = make_queries(table)
+    names = [query for query, _ in queries]
+
+    lookupHits = sum(table.lookup(query) is table._entries[key]
+                     for query, key in queries)
+    matchHits = sum(table.match(query).key == key for query, key in queries)
+    paths = Counter(table.match(query).path for query in names)
+
+    def cold_match():
+        table._matches.clear()
+        for name in names:
+            table.match(name)
+
+    results = {
+        'queries': len(queries),
+        'lookup_hits': lookupHits,
+        'match_hits': matchHits,
+        'paths': dict(paths),
+        'lookup_us': min(timeit.repeat(
+            lambda: [table.lookup(name) for name in names],
+            number=1, repeat=repeat)) / len(names) * 1e6,
+        'match_cold_us': min(timeit.repeat(cold_match, number=1,
+                                           repeat=repeat)) / len(names) * 1e6,
+        'match_cached_us': min(timeit.repeat(
+            lambda: [table.match(name) for name in names],
+            number=1, repeat=repeat)) / len(names) * 1e6,
+    }
+    print(f"{results['queries']} misspelled or reordered names")
+    print(f"lookup finds the intended key for {lookupHits}, "
+          f"match for {matchHits}")
+    print(f"match paths: {results['paths']}")
+    print(f"lookup {results['lookup_us']:.1f} us, match "
+          f"{results['match_cold_us']:.1f} us cold and "
+          f"{results['match_cached_us']:.1f} us cached per name")
+    return results
+
+if __name__ == '__main__':
+    main()
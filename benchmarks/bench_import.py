@@ -0,0 +1,57 @@
+"""
+measures the import time of the package's modules with python -X importtime
+in a fresh interpreter, so the heavy dependencies loaded on first use by
+bootstrap do not creep back into a plain import
+
+    python -m benchmarks.bench_import
+"""
+import os
+import subprocess
+import sys
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# modules a short-lived job imports before it parses anything
+MODULES = ('ingredient_class', 'recipe_class', 'comparisons', 'batch_parser',
+           'parse_cache', 'keyword_index', 'compact_ingredient', 'quantity')
+
+# dependencies that must only be imported on first use
+HEAVY_MODULES = ('nltk', 'ingredient_parser', 'pint', 'numpy',
+                 'multiprocessing')
+
+def import_times(modules=MODULES) -> dict:
+    """
+    imports modules in a fresh interpreter and returns a dict of every
+    imported module -> its cumulative import time in microseconds
+
+    Raises:
+        RuntimeError:
+            if the import fails
+    """
+    command = [sys.executable, '-X', 'importtime', '-c',
+               f"import {', '.join(modules)}"]
+    completed = subprocess.run(command, cwd=PROJECT_ROOT, capture_output=True,
+                               text=True)
+    if completed.returncode != 0:
+        raise RuntimeError(f"importing {modules} failed:\n{completed.stderr}")
+
+    times = {}
+    for line in completed.stderr.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        _, cumulative, name = line.split('|')
+        if not cumulative.strip().isdigit():
+            continue # the header line
+        times[name.strip()] = int(cumulative)
+    return times
+
+def main() -> dict:
+    times = import_times()
+    for module in MODULES:
+        print(f"{module:>20}: {times.get(module, 0) / 1000:8.2f} ms")
+    heavy = [module for module in HEAVY_MODULES if module in times]
+    print(f"heavy modules imported: {', '.join(heavy) or 'none'}")
+    return times
+
+if __name__ == '__main__':
+    main()
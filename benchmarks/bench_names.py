@@ -0,0 +1,73 @@
+"""
+compares the memoized names.normalize_name with the old per ingredient
+cleaning (string += per character) and keyword split (scan of a filler word
+tuple) on the names of the synthetic benchmark corpus, by time and by the
+number of distinct name and keyword objects held
+
+    python -m benchmarks.bench_names
+"""
+import timeit
+
+import names
+from benchmarks.corpora import load_corpus
+
+LEGACY_FILLER_WORDS = ('all', 'purpose', 'extra', 'large', 'small', 'medium',
+                       'fine', 'coarse', 'thick', 'thin', 'melted',
+                       'softened', 'chilled', 'cold', 'room', 'temperature',
+                       'sifted', 'packed', 'leveled', 'spooned', 'grated',
+                       'minced', 'chopped', 'diced', 'sliced', 'crushed',
+                       'beaten', 'whisked', 'melted', 'organic', 'natural',
+                       'virgin', 'unsalted', 'salted', 'sweetened',
+                       'unsweetened', 'light', 'dark')
+
+def legacy_normalize(name: str) -> tuple:
+    if name.isalpha():
+        cleanName = name.lower()
+    else:
+        cleanName = ''
+        for char in name:
+            if char.isalpha() or char == ' ':
+                cleanName += char.lower()
+            elif char == '-' or char == '_':
+                cleanName += ' '
+    keywords = []
+    for word in cleanName.split(' '):
+        if word not in LEGACY_FILLER_WORDS:
+            keywords.append(word)
+    if keywords == ['white', 'sugar']:
+        keywords = ['white sugar']
+    elif keywords == ['brown', 'sugar']:
+        keywords = ['brown sugar']
+    return cleanName, keywords, frozenset(keywords)
+
+def main(repeat: int = 5) -> dict:
+    rawNames = [ingredient[0]
+                for ingredient in load_corpus('synthetic')['ingredients']]
+
+    legacy = [legacy_normalize(name) for name in rawNames]
+    memoized = [names.normalize_name(name) for name in rawNames]
+    assert [(name, tuple(keywords)) for name, keywords, _ in legacy] == \
+        [(name, keywords) for name, keywords, _ in memoized]
+
+    results = {
+        'names': len(rawNames),
+        'legacy_us': min(timeit.repeat(
+            lambda: [legacy_normalize(name) for name in rawNames],
+            number=1, repeat=repeat)) / len(rawNames) * 1e6,
+        'memoized_us': min(timeit.repeat(
+            lambda: [names.normalize_name(name) for name in rawNames],
+            number=1, repeat=repeat)) / len(rawNames) * 1e6,
+        'legacy_keyword_objects': len({id(keywords)
+                                       for _, keywords, _ in legacy}),
+        'memoized_keyword_objects': len({id(keywords)
+                                         for _, keywords, _ in memoized}),
+    }
+    print(f"{results['names']} ingredient names")
+    print(f"legacy   {results['legacy_us']:.2f} us per name, "
+          f"{results['legacy_keyword_objects']} keyword lists")
+    print(f"memoized {results['memoized_us']:.2f} us per name, "
+          f"{results['memoized_keyword_objects']} keyword tuples")
+    return results
+
+if __name__ == '__main__':
+    main()
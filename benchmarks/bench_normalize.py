@@ -0,0 +1,80 @@
+"""
+compares the unit table fast path of comparisons.normalize_ingredients with
+the Pint path on the bundled sample lists
+
+the lines of comparisons.ingredients1, ingredients2 and ingredients3 are kept
+here in their parsed form (name, quantity, unit) so the benchmark only times
+the conversion and runs without the parser model
+
+    python -m benchmarks.bench_normalize
+"""
+import timeit
+from fractions import Fraction
+
+import comparisons
+
+SAMPLE_AMOUNTS = [
+    # ingredients1
+    ('fine cornmeal', Fraction(1), 'cup'),
+    ('all-purpose flour', Fraction(1), 'cup'),
+    ('baking powder', Fraction(1), 'teaspoon'),
+    ('baking soda', Fraction(1, 2), 'teaspoon'),
+    ('salt', Fraction(1, 8), 'teaspoon'),
+    ('unsalted butter', Fraction(1, 2), 'cup'),
+    ('light or dark brown sugar', Fraction(1, 3), 'cup'),
+    ('honey', Fraction(2), 'tablespoon'),
+    ('egg', Fraction(1), 'large'),
+    ('buttermilk', Fraction(1), 'cup'),
+    # ingredients2
+    ('flour', Fraction(5, 2), 'cup'),
+    ('cornmeal', Fraction(1), 'cup'),
+    ('sugar', Fraction(1), 'cup'),
+    ('baking powder', Fraction(3, 2), 'tablespoon'),
+    ('salt', Fraction(1), 'teaspoon'),
+    ('butter', Fraction(1, 2), 'cup'),
+    ('oil', Fraction(1, 2), 'cup'),
+    ('milk', Fraction(5, 4), 'cup'),
+    ('eggs', Fraction(3), 'large'),
+    # ingredients3
+    ('all-purpose flour', Fraction(1), 'cup'),
+    ('yellow cornmeal', Fraction(1), 'cup'),
+    ('white sugar', Fraction('0.66666668653488'), 'cup'),
+    ('baking powder', Fraction(7, 2), 'teaspoon'),
+    ('salt', Fraction(1), 'teaspoon'),
+    ('milk', Fraction(1), 'cup'),
+    ('vegetable oil', Fraction('0.33333334326744'), 'cup'),
+    ('egg', Fraction(1), ''),
+]
+
+def normalize(function, amounts) -> list:
+    results = []
+    for name, qty, unit in amounts:
+        try:
+            results.append(function(name, qty, unit))
+        except Exception:
+            # Pint does not know units such as 'large'
+            results.append(None)
+    return results
+
+def fast_path(name: str, qty, unit: str):
+    normalized = comparisons.fast_normalize_amount(name, qty, unit)
+    if normalized is None:
+        normalized = comparisons.pint_normalize_amount(name, qty, unit)
+    return normalized
+
+def main(number: int = 20, repeat: int = 5) -> dict:
+    # build the registry and density table outside the timed runs
+    normalize(comparisons.pint_normalize_amount, SAMPLE_AMOUNTS)
+    results = {}
+    for name, function in (('pint', comparisons.pint_normalize_amount),
+                           ('fast', fast_path)):
+        seconds = min(timeit.repeat(lambda: normalize(function, SAMPLE_AMOUNTS),
+                                    number=number, repeat=repeat))
+        results[name] = seconds / (number * len(SAMPLE_AMOUNTS))
+    for name, seconds in results.items():
+        print(f"{name:>6}: {seconds * 1e6:8.1f} us/line "
+              f"({results['pint'] / seconds:5.1f}x pint)")
+    return results
+
+if __name__ == '__main__':
+    main()
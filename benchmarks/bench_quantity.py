@@ -0,0 +1,72 @@
+"""
+compares the quantity kernel with the old conversion that went through
+Fraction(str(float)) and multiplied Fractions by float unit factors
+
+    python -m benchmarks.bench_quantity
+"""
+import fractions
+import random
+import timeit
+
+import quantity
+
+LEGACY_FACTORS = {'cup': 1, 'tablespoon': 1/16, 'teaspoon': 1/48}
+
+def legacy_to_fraction(value) -> fractions.Fraction:
+    if isinstance(value, fractions.Fraction):
+        return value
+    float(value)
+    return fractions.Fraction(str(value))
+
+def legacy_to_metric(amount, measure: str, density: int) -> fractions.Fraction:
+    return legacy_to_fraction(amount * density * LEGACY_FACTORS[measure])
+
+def legacy_to_kitchen(amount, density: int) -> tuple:
+    amount = fractions.Fraction(amount / density)
+    if amount >= fractions.Fraction(1, 4):
+        return amount, 'cup'
+    elif amount >= fractions.Fraction(1, 32):
+        return amount * 16, 'tablespoon'
+    return amount * 48, 'teaspoon'
+
+def make_workload(size: int = 2000, seed: int = 0) -> list:
+    """
+    returns size (amount, measure, density) tuples with the amounts a recipe
+    corpus is made of
+    """
+    rng = random.Random(seed)
+    amounts = [0.25, 0.5, 0.75, 1, 1.5, 2, 3, 0.33, 0.125, 2.5]
+    measures = list(LEGACY_FACTORS)
+    densities = [125, 200, 220, 240, 113, 340, 109]
+    return [(rng.choice(amounts), rng.choice(measures), rng.choice(densities))
+            for _ in range(size)]
+
+def run_legacy(workload) -> None:
+    for amount, measure, density in workload:
+        metric = legacy_to_metric(legacy_to_fraction(amount), measure, density)
+        legacy_to_kitchen(metric, density)
+
+def run_kernel(workload) -> None:
+    for amount, measure, density in workload:
+        metric = quantity.kitchen_to_metric(quantity.to_fraction(amount),
+                                            measure, density)
+        quantity.metric_to_kitchen(metric, density)
+
+def run_float(workload) -> None:
+    for amount, measure, density in workload:
+        quantity.kitchen_to_metric_float(amount, measure, density)
+
+def main(repeat: int = 5) -> dict:
+    workload = make_workload()
+    results = {}
+    for name, function in (('legacy', run_legacy), ('kernel', run_kernel),
+                           ('float', run_float)):
+        results[name] = min(timeit.repeat(lambda: function(workload),
+                                          number=1, repeat=repeat))
+    for name, seconds in results.items():
+        print(f"{name:>8}: {seconds * 1000:8.2f} ms "
+              f"({results['legacy'] / seconds:5.1f}x legacy)")
+    return results
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,54 @@
+"""
+compares scaling the synthetic benchmark corpus to grams per serving with
+scaling.MassMatrix against a loop of per ingredient Fraction arithmetic
+
+    python -m benchmarks.bench_scaling
+"""
+import random
+import timeit
+from fractions import Fraction
+
+from scaling import MassMatrix
+from benchmarks.suite import _prepare
+from benchmarks.corpora import load_corpus
+
+def fraction_per_serving(recipes) -> list:
+    """
+    the per ingredient way, exact grams per serving of each recipe as dicts
+    """
+    result = []
+    for recipe in recipes:
+        servings = Fraction(recipe.servings())
+        row = {}
+        for ingredient in recipe.ingredients():
+            if ingredient.state() == 'thing' or ingredient.metric_amount() is None:
+                continue
+            term = ' '.join(ingredient.keywords())
+            row[term] = row.get(term, 0) + Fraction(ingredient.metric_amount()) / servings
+        result.append(row)
+    return result
+
+def main(repeat: int = 5) -> dict:
+    recipes = _prepare(load_corpus('synthetic'))['recipes']
+    generator = random.Random(21)
+    for recipe in recipes:
+        recipe.set_servings(generator.choice((4, 6, 8, 9, 12, 16, 24)))
+
+    masses = MassMatrix.from_recipes(recipes)
+    results = {
+        'recipes': len(recipes),
+        'fraction_ms': min(timeit.repeat(lambda: fraction_per_serving(recipes),
+                                         number=1, repeat=repeat)) * 1000,
+        'build_ms': min(timeit.repeat(lambda: MassMatrix.from_recipes(recipes),
+                                      number=1, repeat=repeat)) * 1000,
+        'scale_ms': min(timeit.repeat(lambda: masses.scaled('serving'),
+                                      number=1, repeat=repeat)) * 1000,
+    }
+    print(f"{results['recipes']} recipes, {len(masses.terms())} terms")
+    print(f"Fraction loop    {results['fraction_ms']:7.2f} ms")
+    print(f"MassMatrix build {results['build_ms']:7.2f} ms, "
+          f"scale {results['scale_ms']:7.3f} ms")
+    return results
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,59 @@
+"""
+compares the binary format of serialization with pickle on the synthetic
+benchmark corpus, by size and by encode and decode time. The corpus is
+measured as it is, where nearly every ingredient row is distinct, and
+repeated four times as separate objects, where rows repeat the way the same
+ingredient lines do across scraped recipes
+
+    python -m benchmarks.bench_serialization
+"""
+import pickle
+import timeit
+
+import serialization
+from benchmarks.suite import _prepare
+from benchmarks.corpora import load_corpus
+
+def measure(recipes, repeat: int) -> dict:
+    """
+    returns the bytes and the best encode and decode seconds of pickle and of
+    the binary format for recipes. The four timings take turns in each round
+    so a slow spell of the machine does not favour one of them
+    """
+    pickled = pickle.dumps(recipes, pickle.HIGHEST_PROTOCOL)
+    encoded = serialization.encode_recipes(recipes)
+    timed = {
+        ('pickle', 'encode'): lambda: pickle.dumps(recipes,
+                                                   pickle.HIGHEST_PROTOCOL),
+        ('pickle', 'decode'): lambda: pickle.loads(pickled),
+        ('binary', 'encode'): lambda: serialization.encode_recipes(recipes),
+        ('binary', 'decode'): lambda: serialization.decode_recipes(encoded),
+    }
+    best = dict.fromkeys(timed, float('inf'))
+    for _ in range(repeat):
+        for key, function in timed.items():
+            best[key] = min(best[key], timeit.timeit(function, number=1))
+    return {name: {'bytes': len(pickled if name == 'pickle' else encoded),
+                   'encode': best[(name, 'encode')],
+                   'decode': best[(name, 'decode')]}
+            for name in ('pickle', 'binary')}
+
+def main(repeat: int = 30) -> dict:
+    corpus = load_corpus('synthetic')
+    corpora = {
+        'distinct': _prepare(corpus)['recipes'],
+        'repeated': _prepare({'ingredients': [],
+                              'recipes': corpus['recipes'] * 4})['recipes'],
+    }
+    results = {}
+    for label, recipes in corpora.items():
+        results[label] = measure(recipes, repeat)
+        print(f"{label}: {len(recipes)} recipes")
+        for name, result in results[label].items():
+            print(f"{name:>7}: {result['bytes']:8d} bytes  "
+                  f"encode {result['encode'] * 1000:7.2f} ms  "
+                  f"decode {result['decode'] * 1000:7.2f} ms")
+    return results
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,124 @@
+"""
+fixed benchmark corpora, checked in under benchmarks/corpora as JSON
+
+each corpus holds raw ingredient 'lines' for the parser and 'recipes' whose
+ingredients are already parsed into (name, amount, measure) so the later
+stages run without the parser model. load_corpus adds every parsed
+ingredient as 'ingredients'. samples.json is seeded from the sample lists in comparisons and
+synthetic.json is a larger list made by make_synthetic, regenerate it with
+
+    python -m benchmarks.corpora
+"""
+import json
+import os
+import random
+
+CORPORA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                           'corpora')
+
+# parsed form of comparisons.ingredients1, ingredients2 and ingredients3,
+# dimensionless lines such as '1 large egg' are left out since Ingredient
+# needs a measure
+SAMPLE_RECIPES = [
+    {'title': 'ingredients1',
+     'ingredients': [['fine cornmeal', '1', 'cup'],
+                     ['all-purpose flour', '1', 'cup'],
+                     ['baking powder', '1', 'teaspoon'],
+                     ['baking soda', '0.5', 'teaspoon'],
+                     ['salt', '0.125', 'teaspoon'],
+                     ['unsalted butter', '0.5', 'cup'],
+                     ['light brown sugar', '⅓', 'cup'],
+                     ['honey', '2', 'tablespoon'],
+                     ['buttermilk', '1', 'cup']]},
+    {'title': 'ingredients2',
+     'ingredients': [['flour', '2.5', 'cup'],
+                     ['cornmeal', '1', 'cup'],
+                     ['sugar', '1', 'cup'],
+                     ['baking powder', '1.5', 'tablespoon'],
+                     ['salt', '1', 'teaspoon'],
+                     ['butter', '0.5', 'cup'],
+                     ['vegetable oil', '0.5', 'cup'],
+                     ['milk', '1.25', 'cup']]},
+    {'title': 'ingredients3',
+     'ingredients': [['all-purpose flour', '1', 'cup'],
+                     ['yellow cornmeal', '1', 'cup'],
+                     ['white sugar', '0.66666668653488', 'cup'],
+                     ['baking powder', '3.5', 'teaspoon'],
+                     ['salt', '1', 'teaspoon'],
+                     ['milk', '1', 'cup'],
+                     ['vegetable oil', '0.33333334326744', 'cup']]},
+]
+
+KITCHEN_AMOUNTS = ['0.25', '0.5', '0.75', '1', '1.5', '2', '3', '⅓', '⅔', '⅛']
+KITCHEN_MEASURES = ['cup', 'tablespoon', 'teaspoon']
+METRIC_AMOUNTS = ['15', '100', '250', '500']
+METRIC_MEASURES = ['g', 'ml']
+# share of synthetic ingredients given in metric
+METRIC_SHARE = 0.2
+SYNTHETIC_PREFIXES = ['', '', 'organic ', 'fresh ', 'unsalted ', 'fine ']
+
+def sample_lines() -> list:
+    """
+    returns the raw sample lines of comparisons
+    """
+    import comparisons
+    return (comparisons.ingredients1 + comparisons.ingredients2
+            + comparisons.ingredients3)
+
+def make_samples() -> dict:
+    return {'lines': sample_lines(), 'recipes': SAMPLE_RECIPES}
+
+def make_synthetic(recipes: int = 100, seed: int = 12) -> dict:
+    """
+    returns a synthetic corpus of recipes with 6 to 14 ingredients each drawn
+    from the names of the density table
+    """
+    from density_table import DENSITY_FILE
+    with open(DENSITY_FILE, encoding='utf-8') as file:
+        names = [name for name in json.load(file) if not name.startswith('_')]
+
+    rng = random.Random(seed)
+    corpus = {'lines': [], 'recipes': []}
+    for number in range(recipes):
+        ingredients = []
+        for name in rng.sample(names, rng.randint(6, 14)):
+            if rng.random() < METRIC_SHARE:
+                amount = rng.choice(METRIC_AMOUNTS)
+                measure = rng.choice(METRIC_MEASURES)
+            else:
+                amount = rng.choice(KITCHEN_AMOUNTS)
+                measure = rng.choice(KITCHEN_MEASURES)
+            name = rng.choice(SYNTHETIC_PREFIXES) + name
+            ingredients.append([name, amount, measure])
+            corpus['lines'].append(f"{amount} {measure} {name}")
+        corpus['recipes'].append({'title': f"synthetic {number}",
+                                  'ingredients': ingredients})
+    return corpus
+
+def load_corpus(name: str) -> dict:
+    """
+    returns the checked-in corpus name, 'samples' or 'synthetic'
+    """
+    with open(os.path.join(CORPORA_DIR, f"{name}.json"),
+              encoding='utf-8') as file:
+        corpus = json.load(file)
+    corpus['ingredients'] = [ingredient for recipe in corpus['recipes']
+                             for ingredient in recipe['ingredients']]
+    return corpus
+
+def write_corpora() -> None:
+    for name, corpus in (('samples', make_samples()),
+                         ('synthetic', make_synthetic())):
+        with open(os.path.join(CORPORA_DIR, f"{name}.json"), 'w',
+                  encoding='utf-8') as file:
+            # one line or recipe per line keeps the files small and diffable
+            file.write('{"lines": [\n')
+            file.write(',\n'.join(json.dumps(line, ensure_ascii=False)
+                                   for line in corpus['lines']))
+            file.write('\n],\n"recipes": [\n')
+            file.write(',\n'.join(json.dumps(recipe, ensure_ascii=False)
+                                   for recipe in corpus['recipes']))
+            file.write('\n]}\n')
+
+if __name__ == '__main__':
+    write_corpora()
@@ -0,0 +1,248 @@
+"""
+micro-benchmark suite for the parse -> normalize -> compare pipeline
+
+each stage is timed separately on the checked-in corpora of
+benchmarks.corpora and reported as seconds per operation. Results can be
+saved as a JSON baseline and later runs compared against it, the comparison
+fails when a stage is slower than the baseline by more than the threshold
+
+    python -m benchmarks.suite
+    python -m benchmarks.suite --save benchmarks/baselines/baseline.json
+    python -m benchmarks.suite --compare benchmarks/baselines/baseline.json
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+from benchmarks.corpora import load_corpus
+
+BASELINE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                            'baselines')
+DEFAULT_BASELINE = os.path.join(BASELINE_DIR, 'baseline.json')
+
+CORPORA = ('samples', 'synthetic')
+STAGES = ('parse', 'construct', 'density', 'convert', 'compare_ingredient',
+          'compare_recipe')
+
+# a stage regresses when it is this much slower than its baseline
+DEFAULT_THRESHOLD = 0.25
+
+# each ingredient is compared with this many following ingredients and each
+# recipe with this many following recipes
+INGREDIENT_WINDOW = 32
+RECIPE_WINDOW = 4
+
+# shortest timed run of a stage
+MIN_RUN_SECONDS = 0.05
+
+def _prepare(corpus: dict) -> dict:
+    """
+    internal function that builds the Ingredient and Recipe objects the later
+    stages run on
+    """
+    from ingredient_class import Ingredient
+    from recipe_class import Recipe
+
+    ingredients = [Ingredient(*ingredient)
+                   for ingredient in corpus['ingredients']]
+    recipes = [Recipe.from_ingredients(recipe['title'], '',
+                                       [Ingredient(*ingredient) for ingredient
+                                        in recipe['ingredients']], '')
+               for recipe in corpus['recipes']]
+    return {'ingredients': ingredients, 'recipes': recipes}
+
+def bench_parse(corpus: dict, prepared: dict) -> int:
+    from bootstrap import get_parser
+    parse_ingredient = get_parser()
+    for line in corpus['lines']:
+        parse_ingredient(line)
+    return len(corpus['lines'])
+
+def bench_construct(corpus: dict, prepared: dict) -> int:
+    from ingredient_class import Ingredient
+    for ingredient in corpus['ingredients']:
+        Ingredient(*ingredient)
+    return len(corpus['ingredients'])
+
+def bench_density(corpus: dict, prepared: dict) -> int:
+    from density_table import get_density_table
+    table = get_density_table()
+    # every run starts without the memo of earlier runs, so names are
+    # matched and only repeats inside the corpus are memo hits
+    table._matches.clear()
+    match = table.match
+    for ingredient in prepared['ingredients']:
+        match(ingredient.name())
+    return len(prepared['ingredients'])
+
+def bench_convert(corpus: dict, prepared: dict) -> int:
+    for ingredient in prepared['ingredients']:
+        ingredient._convert_to_metric()
+        ingredient._convert_to_kitchen()
+    return 2 * len(prepared['ingredients'])
+
+def bench_compare_ingredient(corpus: dict, prepared: dict) -> int:
+    ingredients = prepared['ingredients']
+    count = 0
+    for i, ingredient in enumerate(ingredients):
+        for other in ingredients[i + 1:i + 1 + INGREDIENT_WINDOW]:
+            ingredient.compare_ingredient(other)
+            count += 1
+    return count
+
+def bench_compare_recipe(corpus: dict, prepared: dict) -> int:
+    # times the ingredient matching of Recipe.compare_recipe, its text
+    # formatting needs Ingredient.difference which is not written yet
+    recipes = prepared['recipes']
+    # match_ingredients caches its pairs, without this every run after the
+    # first would only time cache hits
+    for recipe in recipes:
+        recipe._matchCache.clear()
+    count = 0
+    for i, recipe in enumerate(recipes):
+        for other in recipes[i + 1:i + 1 + RECIPE_WINDOW]:
+            recipe.match_ingredients(other)
+            count += 1
+    return count
+
+STAGE_FUNCTIONS = {'parse': bench_parse,
+                   'construct': bench_construct,
+                   'density': bench_density,
+                   'convert': bench_convert,
+                   'compare_ingredient': bench_compare_ingredient,
+                   'compare_recipe': bench_compare_recipe}
+
+def parser_available() -> str | None:
+    """
+    returns None if the parser model can run, otherwise the reason it can't
+    """
+    from bootstrap import get_parser
+    try:
+        get_parser()('1 cup flour')
+    except (LookupError, OSError, ImportError) as error:
+        return type(error).__name__
+    return None
+
+def time_stage(function, corpus: dict, prepared: dict, repeat: int) -> dict:
+    """
+    returns the best time per operation of function over repeat runs. Each
+    run calls function as many times as fit in MIN_RUN_SECONDS so the small
+    corpora are not dominated by timer noise
+    """
+    start = time.perf_counter()
+    ops = function(corpus, prepared)
+    once = time.perf_counter() - start
+    calls = max(1, int(MIN_RUN_SECONDS / once)) if once > 0 else 1
+
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(calls):
+            function(corpus, prepared)
+        elapsed = time.perf_counter() - start
+        if best is None or elapsed < best:
+            best = elapsed
+    return {'seconds_per_op': best / (ops * calls) if ops else 0.0, 'ops': ops}
+
+def run_suite(corpora=CORPORA, stages=STAGES, repeat: int = 5) -> dict:
+    """
+    times every stage of stages on every corpus of corpora and returns a dict
+    of 'corpus/stage' -> {'seconds_per_op', 'ops'}, or {'skipped': reason}
+    for the parse stage when the parser model can't be loaded
+
+    Raises:
+        ValueError:
+            if a stage is not in STAGES
+    """
+    for stage in stages:
+        if stage not in STAGE_FUNCTIONS:
+            raise ValueError(f"stage must be one of {STAGES} but is {stage}")
+    skipParse = parser_available() if 'parse' in stages else None
+
+    results = {}
+    for name in corpora:
+        corpus = load_corpus(name)
+        prepared = _prepare(corpus)
+        for stage in stages:
+            key = f"{name}/{stage}"
+            if stage == 'parse' and skipParse is not None:
+                results[key] = {'skipped': skipParse}
+                continue
+            results[key] = time_stage(STAGE_FUNCTIONS[stage], corpus, prepared,
+                                      repeat)
+    return results
+
+def save_baseline(results: dict, path: str = DEFAULT_BASELINE) -> None:
+    with open(path, 'w', encoding='utf-8') as file:
+        json.dump(results, file, indent=2, sort_keys=True)
+        file.write('\n')
+
+def load_baseline(path: str = DEFAULT_BASELINE) -> dict:
+    with open(path, encoding='utf-8') as file:
+        return json.load(file)
+
+def compare_results(baseline: dict, current: dict,
+                    threshold: float = DEFAULT_THRESHOLD) -> list:
+    """
+    returns a list of (key, baseline seconds, current seconds, ratio) for every
+    stage timed in both baseline and current that is slower than its baseline
+    by more than threshold
+    """
+    regressions = []
+    for key, result in current.items():
+        before = baseline.get(key, {}).get('seconds_per_op')
+        after = result.get('seconds_per_op')
+        if not before or after is None:
+            continue
+        ratio = after / before
+        if ratio > 1 + threshold:
+            regressions.append((key, before, after, ratio))
+    return regressions
+
+def format_results(results: dict, baseline: dict | None = None) -> str:
+    rows = []
+    for key, result in results.items():
+        if 'skipped' in result:
+            rows.append(f"{key:<32} skipped ({result['skipped']})")
+            continue
+        row = (f"{key:<32} {result['seconds_per_op'] * 1e6:10.2f} us/op "
+               f"x{result['ops']}")
+        before = (baseline or {}).get(key, {}).get('seconds_per_op')
+        if before:
+            row += f"  {result['seconds_per_op'] / before:5.2f}x baseline"
+        rows.append(row)
+    return '\n'.join(rows)
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--corpus', action='append', choices=CORPORA,
+                        help='corpus to run, all by default')
+    parser.add_argument('--stage', action='append', choices=STAGES,
+                        help='stage to run, all by default')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--save', metavar='PATH',
+                        help='write the results as a JSON baseline')
+    parser.add_argument('--compare', metavar='PATH',
+                        help='fail if a stage regressed against this baseline')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD)
+    args = parser.parse_args(argv)
+
+    results = run_suite(args.corpus or CORPORA, args.stage or STAGES,
+                        args.repeat)
+    baseline = load_baseline(args.compare) if args.compare else None
+    print(format_results(results, baseline))
+    if args.save:
+        save_baseline(results, args.save)
+    if baseline is not None:
+        regressions = compare_results(baseline, results, args.threshold)
+        for key, before, after, ratio in regressions:
+            print(f"REGRESSION {key}: {before * 1e6:.2f} -> {after * 1e6:.2f} "
+                  f"us/op ({ratio:.2f}x)")
+        if regressions:
+            return 1
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,76 @@
+"""
+shared, lazy loading of the heavy dependencies of the tool
+
+importing the parser pulls in NLTK and the CRF model and building a Pint
+UnitRegistry parses its whole definition file, together they take most of a
+second. Nothing here is loaded until it is first used, so importing the
+package stays cheap for short-lived jobs that never parse a line.
+"""
+import os
+import threading
+
+import instrumentation
+
+project_root = os.path.dirname(os.path.abspath(__file__))
+local_nltk_data = os.path.join(project_root, 'nltk_data')
+
+_lock = threading.Lock()
+_parser = None
+_unitRegistry = None
+
+def _disabled_download(*args, **kwargs):
+    print("NLTK download blocked - using local project data.")
+    return True
+
+def configure_nltk():
+    """
+    forces NLTK to use only the local project folder and replaces
+    nltk.download so nothing is ever downloaded. Returns the nltk module
+    """
+    # the NLTK_DATA environment variable is the strongest way to redirect it
+    os.environ['NLTK_DATA'] = local_nltk_data
+    import nltk
+    nltk.data.path = [local_nltk_data]
+    nltk.download = _disabled_download
+    return nltk
+
+def get_parser():
+    """
+    returns ingredient_parser.parse_ingredient, configuring NLTK and
+    importing the parser the first time it is called in a process
+    """
+    global _parser
+    if _parser is None:
+        with _lock:
+            if _parser is None:
+                configure_nltk()
+                from ingredient_parser import parse_ingredient
+                _parser = instrumentation.timed('parse_ingredient')(
+                    parse_ingredient)
+    return _parser
+
+def parse_ingredient(line: str):
+    """
+    parses a single ingredient line with the lazily loaded parser
+    """
+    return get_parser()(line)
+
+def get_unit_registry():
+    """
+    returns the process-wide Pint UnitRegistry, built on first use
+    """
+    global _unitRegistry
+    if _unitRegistry is None:
+        with _lock:
+            if _unitRegistry is None:
+                from pint import UnitRegistry
+                _unitRegistry = UnitRegistry()
+    return _unitRegistry
+
+def get_density_table():
+    """
+    returns the shared DensityTable, loaded from ingredient_densities.json on
+    first use
+    """
+    from density_table import get_density_table as getTable
+    return getTable()
@@ -0,0 +1,227 @@
+"""
+command line batch comparison of recipes as JSONL
+
+each input line is a JSON object with 'title', 'source', 'ingredients' (a
+list of raw ingredient lines) and 'steps'. Recipes are read, parsed and
+compared as a stream and one JSON result per comparison is written to stdout,
+so memory stays the same however large the input is
+
+    python cli.py recipes.jsonl --reference reference.json
+    cat recipes.jsonl | python cli.py --mode pairs > results.jsonl
+"""
+import argparse
+import json
+import sys
+
+from recipe_class import Recipe
+
+MODES = ('reference', 'pairs')
+
+# recipes parsed together, bounds the memory held at once
+DEFAULT_BATCH = 64
+
+REQUIRED_FIELDS = ('title', 'ingredients')
+
+
+class RecordError(ValueError):
+    """
+    raised for an input line that is not a valid recipe record
+    """
+
+
+def check_record(record) -> dict:
+    """
+    returns record if it is a valid recipe record
+
+    Raises:
+        RecordError:
+            if record is not a dict with a title and a list of ingredients
+    """
+    if not isinstance(record, dict):
+        raise RecordError("record must be a JSON object")
+    missing = [field for field in REQUIRED_FIELDS if field not in record]
+    if missing:
+        raise RecordError(f"missing {', '.join(missing)}")
+    if not isinstance(record['ingredients'], list):
+        raise RecordError("ingredients must be a list")
+    return record
+
+def read_records(stream):
+    """
+    generator yielding (line number, record) for every non blank line of
+    stream. A line that is not a valid recipe record yields
+    (line number, RecordError) instead so one bad line does not stop the run
+    """
+    for lineNumber, line in enumerate(stream, 1):
+        if not line.strip():
+            continue
+        try:
+            yield lineNumber, check_record(json.loads(line))
+        except json.JSONDecodeError as error:
+            yield lineNumber, RecordError(f"invalid JSON: {error}")
+        except RecordError as error:
+            yield lineNumber, error
+
+def _as_tuple(record: dict) -> tuple:
+    return (record['title'], record.get('source', ''), record['ingredients'],
+            record.get('steps', ''))
+
+def _build_batch(batch: list, workers: int) -> list:
+    """
+    internal function that returns (line number, Recipe or error) for every
+    (line number, record) of batch. If the batch fails to parse as a whole
+    each record is built on its own so only the bad ones become errors
+    """
+    try:
+        recipes = Recipe.from_many([_as_tuple(record) for _, record in batch],
+                                   workers=workers)
+        return list(zip((lineNumber for lineNumber, _ in batch), recipes))
+    except (TypeError, ValueError):
+        pass
+
+    built = []
+    for lineNumber, record in batch:
+        try:
+            recipe = Recipe.from_many([_as_tuple(record)], workers=1)[0]
+        except (TypeError, ValueError) as error:
+            recipe = RecordError(str(error))
+        built.append((lineNumber, recipe))
+    return built
+
+def iter_recipes(records, batch: int = DEFAULT_BATCH, workers: int = 1):
+    """
+    generator yielding (line number, Recipe or error) for every item of
+    records, parsing batch recipes at a time
+    """
+    pending = []
+    for lineNumber, record in records:
+        if isinstance(record, Exception):
+            # flush first so results stay in input order
+            if pending:
+                yield from _build_batch(pending, workers)
+                pending = []
+            yield lineNumber, record
+            continue
+        pending.append((lineNumber, record))
+        if len(pending) >= batch:
+            yield from _build_batch(pending, workers)
+            pending = []
+    if pending:
+        yield from _build_batch(pending, workers)
+
+def comparison_record(recipe: Recipe, other: Recipe,
+                      optimal: bool = False) -> dict:
+    """
+    returns the JSON result of comparing recipe with other: the matched
+    ingredient names, the ingredients only in either recipe and the share of
+    ingredients that were matched
+    """
+    matched = []
+    onlyFirst = []
+    onlySecond = []
+    for ingredient, match in recipe.match_ingredients(other, optimal):
+        if ingredient is None:
+            onlySecond.append(match.name())
+        elif match is None:
+            onlyFirst.append(ingredient.name())
+        else:
+            matched.append([ingredient.name(), match.name()])
+    total = len(matched) + len(onlyFirst) + len(onlySecond)
+    return {'recipe': recipe.title(), 'other': other.title(),
+            'matched': matched, 'only_recipe': onlyFirst,
+            'only_other': onlySecond,
+            'similarity': len(matched) / total if total else 0.0}
+
+def compare_stream(recipes, mode: str = 'reference', reference=None,
+                   optimal: bool = False):
+    """
+    generator yielding a JSON serializable dict for every comparison of the
+    (line number, Recipe or error) items of recipes, or for every error
+
+    Parameters:
+        mode: str:
+            'reference' compares every recipe with reference, or with the
+            first recipe if reference is None. 'pairs' compares the first
+            recipe with the second, the third with the fourth and so on
+
+    Raises:
+        ValueError:
+            if mode is not a correct value
+    """
+    if mode not in MODES:
+        raise ValueError(f"mode must be 'reference' or 'pairs' but is {mode}")
+    previous = None
+    for lineNumber, recipe in recipes:
+        if isinstance(recipe, Exception):
+            yield {'line': lineNumber, 'error': str(recipe)}
+            continue
+        if mode == 'reference':
+            if reference is None:
+                reference = recipe
+                continue
+            result = comparison_record(recipe, reference, optimal)
+        else:
+            if previous is None:
+                previous = recipe
+                continue
+            result = comparison_record(previous, recipe, optimal)
+            previous = None
+        result['line'] = lineNumber
+        yield result
+    if previous is not None:
+        yield {'recipe': previous.title(), 'error': 'recipe has no pair'}
+
+def load_reference(path: str, workers: int = 1) -> Recipe:
+    """
+    returns the Recipe of the JSON recipe record in the file at path
+
+    Raises:
+        RecordError:
+            if the file does not hold a valid recipe record
+    """
+    with open(path, encoding='utf-8') as file:
+        try:
+            record = check_record(json.load(file))
+        except json.JSONDecodeError as error:
+            raise RecordError(f"{path} is not valid JSON: {error}")
+    return Recipe.from_many([_as_tuple(record)], workers=workers)[0]
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(
+        description='compare recipes read as JSONL and write JSONL results')
+    parser.add_argument('input', nargs='?', default='-',
+                        help='JSONL file of recipes, - or nothing for stdin')
+    parser.add_argument('--mode', choices=MODES, default='reference')
+    parser.add_argument('--reference', metavar='PATH',
+                        help='JSON recipe to compare against, the first '
+                             'input recipe by default')
+    parser.add_argument('--optimal', action='store_true',
+                        help='pair ingredients by the most shared keywords')
+    parser.add_argument('--batch', type=int, default=DEFAULT_BATCH,
+                        help='recipes parsed together')
+    parser.add_argument('--workers', type=int, default=1,
+                        help='parser processes per batch')
+    args = parser.parse_args(argv)
+
+    reference = None
+    if args.reference is not None:
+        reference = load_reference(args.reference, args.workers)
+
+    stream = (sys.stdin if args.input == '-'
+              else open(args.input, encoding='utf-8'))
+    try:
+        recipes = iter_recipes(read_records(stream), args.batch, args.workers)
+        for result in compare_stream(recipes, args.mode, reference,
+                                     args.optimal):
+            sys.stdout.write(json.dumps(result, ensure_ascii=False) + '\n')
+    except BrokenPipeError:
+        # the reader of a pipeline such as | head went away
+        sys.stderr.close()
+        return 1
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
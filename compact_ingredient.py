@@ -0,0 +1,201 @@
+import sys
+from enum import IntEnum
+
+from names import intern_keywords, keyword_set
+
+
+class Unit(IntEnum):
+    """
+    measurement units an ingredient can be stored in
+    """
+    NONE = 0
+    CUP = 1
+    TABLESPOON = 2
+    TEASPOON = 3
+    G = 4
+    ML = 5
+
+
+class State(IntEnum):
+    """
+    possible values of an ingredient's state, NONE if it is not known
+    """
+    NONE = 0
+    SOLID = 1
+    LIQUID = 2
+    THING = 3
+
+
+UNIT_NAMES = {Unit.NONE: None, Unit.CUP: 'cup', Unit.TABLESPOON: 'tablespoon',
+              Unit.TEASPOON: 'teaspoon', Unit.G: 'g', Unit.ML: 'ml'}
+UNITS = {name: unit for unit, name in UNIT_NAMES.items()}
+
+STATE_NAMES = {State.NONE: None, State.SOLID: 'solid',
+               State.LIQUID: 'liquid', State.THING: 'thing'}
+STATES = {name: state for state, name in STATE_NAMES.items()}
+
+class CompactIngredient:
+    """
+    immutable, memory compact form of an Ingredient for large in-memory
+    corpora
+
+    there is no per-instance __dict__, units and state are small enums,
+    amounts are floats and the name and keywords are interned so they are
+    shared by every identical ingredient. The accessors match Ingredient.
+    """
+    __slots__ = ('_name', '_keywords', '_keywordSet', '_kitchenAmount',
+                 '_metricAmount', '_kitchenUnit', '_metricUnit', '_state',
+                 '_density')
+
+    def __init__(self, name: str, keywords, kitchenAmount: float | None,
+                 kitchenUnit: Unit, metricAmount: float | None,
+                 metricUnit: Unit, state: State, density: int | None):
+        """
+        constructor class, see from_ingredient to make one from an Ingredient
+
+        Raises:
+            TypeError:
+                if name is not a str or a unit or state is not the enum
+        """
+        if not isinstance(name, str):
+            raise TypeError(f"name must be a str but is a {type(name)}")
+        if not (isinstance(kitchenUnit, Unit) and isinstance(metricUnit, Unit)):
+            raise TypeError("kitchenUnit and metricUnit must be a Unit")
+        if not isinstance(state, State):
+            raise TypeError(f"state must be a State but is a {type(state)}")
+
+        setField = object.__setattr__
+        setField(self, '_name', sys.intern(name))
+        setField(self, '_keywords', intern_keywords(keywords))
+        setField(self, '_keywordSet', keyword_set(self._keywords))
+        setField(self, '_kitchenAmount',
+                 None if kitchenAmount is None else float(kitchenAmount))
+        setField(self, '_kitchenUnit', kitchenUnit)
+        setField(self, '_metricAmount',
+                 None if metricAmount is None else float(metricAmount))
+        setField(self, '_metricUnit', metricUnit)
+        setField(self, '_state', state)
+        setField(self, '_density', density)
+
+    @classmethod
+    def from_ingredient(cls, ingredient) -> 'CompactIngredient':
+        """
+        returns the compact form of an Ingredient
+        """
+        return cls(ingredient.name(), ingredient.keywords(),
+                   ingredient.kitchen_amount(),
+                   UNITS[ingredient.kitchen_measure()],
+                   ingredient.metric_amount(),
+                   UNITS[ingredient.metric_measure()],
+                   STATES[ingredient.state()], ingredient._density)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("CompactIngredient is immutable")
+
+    def __delattr__(self, name):
+        raise AttributeError("CompactIngredient is immutable")
+
+    def name(self) -> str:
+        return self._name
+
+    def metric_amount(self) -> float | None:
+        return self._metricAmount
+
+    def kitchen_amount(self) -> float | None:
+        return self._kitchenAmount
+
+    def metric_measure(self) -> str | None:
+        return UNIT_NAMES[self._metricUnit]
+
+    def kitchen_measure(self) -> str | None:
+        return UNIT_NAMES[self._kitchenUnit]
+
+    def state(self) -> str | None:
+        return STATE_NAMES[self._state]
+
+    def keywords(self) -> tuple:
+        """
+        returns the shared tuple of the ingredient's keywords
+        """
+        return self._keywords
+
+    def keyword_set(self) -> frozenset:
+        """
+        returns the shared frozenset of the ingredient's keywords
+        """
+        return self._keywordSet
+
+    def compare_ingredient(self, other) -> bool:
+        """
+        checks if other is a same or similar ingredient as self and returns
+        a boolean. other can be an Ingredient or a CompactIngredient
+        """
+        return not self._keywordSet.isdisjoint(other._keywordSet)
+
+    def _fields(self) -> tuple:
+        return (self._name, self._keywords, self._kitchenAmount,
+                self._kitchenUnit, self._metricAmount, self._metricUnit,
+                self._state, self._density)
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, CompactIngredient):
+            return NotImplemented
+        return self._fields() == other._fields()
+
+    def __hash__(self) -> int:
+        return hash(self._fields())
+
+    def __reduce__(self):
+        return (CompactIngredient, self._fields())
+
+    def __str__(self) -> str:
+        """
+        returns print friendly str representation of an ingredient
+        """
+        if self._state == State.THING:
+            if not self._kitchenAmount:
+                return self._name
+            return f"{self._kitchenAmount:g} {self._name}"
+        return (f"{self._kitchenAmount:g} {UNIT_NAMES[self._kitchenUnit]} "
+                f"{self._name}")
+
+
+def _deep_size(obj, seen: set) -> int:
+    """
+    internal function that returns the bytes used by obj and everything it
+    references that is not in seen. Objects are counted once, so strings and
+    tuples shared between ingredients only count for the first one
+    """
+    if id(obj) in seen or obj is None or isinstance(obj, (bool, IntEnum)):
+        return 0
+    seen.add(id(obj))
+    size = sys.getsizeof(obj)
+
+    if isinstance(obj, dict):
+        for key, value in obj.items():
+            size += _deep_size(key, seen) + _deep_size(value, seen)
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        for item in obj:
+            size += _deep_size(item, seen)
+    elif hasattr(obj, '__dict__'):
+        size += _deep_size(vars(obj), seen)
+    elif hasattr(type(obj), '__slots__'):
+        for slot in type(obj).__slots__:
+            size += _deep_size(getattr(obj, slot, None), seen)
+    return size
+
+def memory_report(ingredients) -> dict:
+    """
+    returns a dict describing the memory held by ingredients, a list of
+    Ingredient or CompactIngredient. Shared objects are only counted once
+
+    Returns:
+        dict with 'count', 'bytes' and 'bytes_per_ingredient'
+    """
+    ingredients = list(ingredients)
+    seen = {id(ingredients)}
+    total = sum(_deep_size(ingredient, seen) for ingredient in ingredients)
+    count = len(ingredients)
+    return {'count': count,
+            'bytes': total,
+            'bytes_per_ingredient': total / count if count else 0.0}
@@ -0,0 +1,262 @@
+import numpy as np
+
+METRICS = ('cosine', 'l1')
+
+def ingredient_term(ingredient) -> str:
+    """
+    returns the vocabulary term of an ingredient, its keywords joined by a
+    space. 'all-purpose flour' and 'flour' share the term 'flour'
+    """
+    return ' '.join(ingredient.keywords())
+
+def ingredient_grams(ingredient) -> float | None:
+    """
+    returns the metric amount of an ingredient as a float number of grams,
+    or None for a dimensionless ingredient such as 1 large egg. Liquids use
+    the same density conversion as the metric amount so ml count as grams
+    """
+    if ingredient.state() == 'thing':
+        return None
+    amount = ingredient.metric_amount()
+    if amount is None:
+        return None
+    return float(amount)
+
+def mass_terms(ingredients) -> dict:
+    """
+    returns a dict of term -> total grams for ingredients, skipping
+    ingredients without a mass
+    """
+    terms = {}
+    for ingredient in ingredients:
+        grams = ingredient_grams(ingredient)
+        if grams is None or grams <= 0:
+            continue
+        term = ingredient_term(ingredient)
+        terms[term] = terms.get(term, 0.0) + grams
+    return terms
+
+
+class RecipeCorpusIndex:
+    """
+    similarity index over a corpus of recipes
+
+    each recipe becomes an ingredient-mass vector over a vocabulary shared by
+    the corpus. The vectors are kept as a sparse column-major matrix in
+    NumPy arrays, so a query only touches the rows that share an ingredient
+    with it and scoring the whole corpus is a single bincount.
+    """
+    # number of queries scored together by top_k_many
+    QUERY_BATCH = 64
+
+    def __init__(self):
+        """
+        constructor class
+
+        Attributes:
+            self._vocabulary:
+                dict of term -> column
+
+            self._keys:
+                list of the key of each row, the recipe title by default
+
+            self._rows:
+                list of dict of column -> grams for each recipe, the source
+                of the matrix
+
+            self._colPtr, self._rowIndex, self._cosineData, self._l1Data:
+                compressed sparse columns of the matrix. Row values are
+                divided by the row's L2 norm for cosine and by the row's total
+                mass for l1. None until the matrix is built
+        """
+        self._vocabulary = {}
+        self._keys = []
+        self._rows = []
+        self._colPtr = None
+        self._rowIndex = None
+        self._cosineData = None
+        self._l1Data = None
+
+    def add(self, recipe, key=None) -> int:
+        """
+        adds recipe to the corpus and returns its row. key defaults to the
+        recipe title and is returned by the queries
+        """
+        return self.add_ingredients(recipe.ingredients(),
+                                    recipe.title() if key is None else key)
+
+    def add_ingredients(self, ingredients, key) -> int:
+        """
+        adds a recipe given as a list of Ingredient and returns its row
+        """
+        row = {}
+        for term, grams in mass_terms(ingredients).items():
+            column = self._vocabulary.setdefault(term, len(self._vocabulary))
+            row[column] = grams
+        self._rows.append(row)
+        self._keys.append(key)
+        self._colPtr = None
+        return len(self._rows) - 1
+
+    def add_many(self, recipes) -> None:
+        """
+        adds every recipe of recipes to the corpus
+        """
+        for recipe in recipes:
+            self.add(recipe)
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def vocabulary(self) -> list:
+        """
+        returns the terms of the vocabulary in column order
+        """
+        return list(self._vocabulary)
+
+    def _build(self) -> None:
+        """
+        internal method to build the sparse column matrix from self._rows
+        """
+        counts = [len(row) for row in self._rows]
+        total = sum(counts)
+        rowIndex = np.repeat(np.arange(len(self._rows), dtype=np.int64),
+                             counts)
+        columns = np.fromiter((column for row in self._rows for column in row),
+                              dtype=np.int64, count=total)
+        grams = np.fromiter((value for row in self._rows
+                             for value in row.values()),
+                            dtype=np.float64, count=total)
+
+        norms = np.sqrt(np.bincount(rowIndex, weights=grams * grams,
+                                    minlength=len(self._rows)))
+        masses = np.bincount(rowIndex, weights=grams,
+                             minlength=len(self._rows))
+
+        order = np.argsort(columns, kind='stable')
+        self._rowIndex = rowIndex[order]
+        self._cosineData = (grams / norms[rowIndex])[order]
+        self._l1Data = (grams / masses[rowIndex])[order]
+        self._colPtr = np.zeros(len(self._vocabulary) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(columns, minlength=len(self._vocabulary)),
+                  out=self._colPtr[1:])
+
+    def _query_entries(self, ingredients, metric: str) -> tuple:
+        """
+        internal method that returns (positions, weights) for a query. The
+        positions index the stored column entries that share a term with the
+        query and weights holds the query value for each position
+        """
+        terms = mass_terms(ingredients)
+        if not terms:
+            return (np.empty(0, dtype=np.int64), np.empty(0))
+        values = np.fromiter(terms.values(), dtype=np.float64,
+                             count=len(terms))
+        # unknown terms still count towards the query's norm and mass
+        if metric == 'cosine':
+            values = values / np.sqrt(np.dot(values, values))
+        else:
+            values = values / values.sum()
+
+        positions = []
+        weights = []
+        for term, value in zip(terms, values):
+            column = self._vocabulary.get(term)
+            if column is None:
+                continue
+            start = self._colPtr[column]
+            end = self._colPtr[column + 1]
+            positions.append(np.arange(start, end))
+            weights.append(np.full(end - start, value))
+        if not positions:
+            return (np.empty(0, dtype=np.int64), np.empty(0))
+        return (np.concatenate(positions), np.concatenate(weights))
+
+    def scores(self, recipes, metric: str = 'cosine') -> np.ndarray:
+        """
+        returns a len(recipes) x len(corpus) array with the similarity of each
+        recipe to every recipe of the corpus
+
+        Parameters:
+            recipes: list of Recipe:
+                query recipes
+
+            metric: str:
+                'cosine' for the cosine similarity of the mass vectors or 'l1'
+                for 1 - half the L1 distance of the mass distributions. Both
+                are 1 for identical proportions and 0 for no shared
+                ingredient
+
+        Raises:
+            ValueError:
+                if metric is not a correct value
+        """
+        if metric not in METRICS:
+            raise ValueError(f"metric must be 'cosine' or 'l1' but is {metric}")
+        if self._colPtr is None:
+            self._build()
+
+        data = self._cosineData if metric == 'cosine' else self._l1Data
+        corpusSize = len(self._rows)
+        recipes = list(recipes)
+
+        flatIndex = []
+        flatWeights = []
+        for queryRow, recipe in enumerate(recipes):
+            positions, weights = self._query_entries(recipe.ingredients(),
+                                                     metric)
+            flatIndex.append(self._rowIndex[positions] + queryRow * corpusSize)
+            if metric == 'cosine':
+                flatWeights.append(data[positions] * weights)
+            else:
+                # 1 - L1/2 of two distributions is the sum of their minimums
+                flatWeights.append(np.minimum(data[positions], weights))
+
+        if not recipes:
+            return np.zeros((0, corpusSize))
+        result = np.bincount(np.concatenate(flatIndex),
+                             weights=np.concatenate(flatWeights),
+                             minlength=len(recipes) * corpusSize)
+        return result.reshape(len(recipes), corpusSize)
+
+    def top_k(self, recipe, k: int = 5, metric: str = 'cosine') -> list:
+        """
+        returns a list of the k most similar recipes of the corpus as
+        (key, score) tuples, most similar first
+        """
+        return self.top_k_many([recipe], k, metric)[0]
+
+    def top_k_many(self, recipes, k: int = 5, metric: str = 'cosine') -> list:
+        """
+        returns a list with the result of top_k for each recipe of recipes.
+        Queries are scored QUERY_BATCH at a time
+
+        Raises:
+            TypeError:
+                if k is not an int
+            ValueError:
+                if k is less than 1
+        """
+        if not isinstance(k, int) or isinstance(k, bool):
+            raise TypeError(f"k must be an int but is a {type(k)}")
+        if k < 1:
+            raise ValueError(f"k must be at least 1 but is {k}")
+
+        recipes = list(recipes)
+        k = min(k, len(self._rows))
+        results = []
+        for start in range(0, len(recipes), self.QUERY_BATCH):
+            batch = recipes[start:start + self.QUERY_BATCH]
+            scores = self.scores(batch, metric)
+            if k == 0:
+                results.extend([] for _ in batch)
+                continue
+            best = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+            bestScores = np.take_along_axis(scores, best, axis=1)
+            order = np.argsort(-bestScores, axis=1, kind='stable')
+            best = np.take_along_axis(best, order, axis=1)
+            bestScores = np.take_along_axis(bestScores, order, axis=1)
+            for rowBest, rowScores in zip(best, bestScores):
+                results.append([(self._keys[row], float(score))
+                                for row, score in zip(rowBest, rowScores)])
+        return results
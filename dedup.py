@@ -0,0 +1,287 @@
+"""
+near-duplicate detection of recipes with MinHash and locality-sensitive
+hashing
+
+scraped corpora hold many copies of one recipe with trivial edits: a unit
+written differently, an ingredient renamed or left out.
+Comparing every pair with Recipe.compare_recipe is quadratic, so each recipe
+is reduced to a set of tokens (ingredient keywords and normalized
+quantities) and the set to a short MinHash signature. Signatures are split
+into bands and recipes sharing any band land in the same bucket, which gives
+candidate pairs in about linear time. A candidate is a duplicate when the
+Jaccard similarity estimated from the signatures reaches the threshold.
+
+    index = DuplicateIndex(threshold=0.8)
+    for recipe in scraped:
+        if index.add(recipe):
+            continue  # near-duplicate of a recipe already ingested
+"""
+import math
+from hashlib import blake2b
+
+import numpy as np
+
+from corpus_index import ingredient_grams, ingredient_term
+
+# Mersenne prime the MinHash permutations are taken modulo, small enough for
+# a * x + b to stay within int64
+PRIME = (1 << 31) - 1
+
+DEFAULT_THRESHOLD = 0.8
+DEFAULT_PERMUTATIONS = 128
+
+# quantity buckets per doubling, 4 puts 100 g and 115 g in the same bucket
+QUANTITY_STEPS = 4
+
+def _bucket(value: float) -> int:
+    return round(math.log2(value) * QUANTITY_STEPS)
+
+def recipe_tokens(recipe) -> set:
+    """
+    returns the set of tokens of a recipe: the term of every ingredient (see
+    corpus_index.ingredient_term) and the term with its normalized quantity.
+    Masses are taken in grams so the same ingredient written in other units
+    is not told apart, counts such as 3 eggs of a stored or decoded recipe
+    are taken as they are. Quantities are bucketed on a log scale. A share
+    of the recipe's mass is not used as it shifts every quantity when one
+    ingredient is left out
+    """
+    tokens = set()
+    for ingredient in recipe.ingredients():
+        term = ingredient_term(ingredient)
+        tokens.add(term)
+        if ingredient.state() == 'thing':
+            # a thing has no mass, ingredient_grams is always None for it
+            count = ingredient.kitchen_amount()
+            if count:
+                tokens.add(f"{term}#{_bucket(float(count))}")
+            continue
+        grams = ingredient_grams(ingredient)
+        if grams:
+            tokens.add(f"{term}@{_bucket(grams)}")
+    return tokens
+
+def token_hash(token: str) -> int:
+    """
+    returns a stable 64 bit hash of token, the same in every process unlike
+    the builtin hash of a str
+    """
+    return int.from_bytes(blake2b(token.encode(), digest_size=8).digest(),
+                          'little')
+
+def choose_bands(threshold: float, permutations: int) -> tuple:
+    """
+    returns (bands, rows) with bands * rows == permutations whose LSH
+    S-curve, the similarity (1 / bands) ** (1 / rows) where a pair becomes
+    likely to share a band, is nearest to and not above threshold, so pairs
+    at the threshold are rarely missed. When every split is above threshold,
+    such as for a single permutation or a threshold below 1 / permutations,
+    one row per band is the split nearest to it
+    """
+    best = None
+    for rows in range(1, permutations + 1):
+        if permutations % rows:
+            continue
+        bands = permutations // rows
+        point = (1 / bands) ** (1 / rows)
+        if point > threshold:
+            continue
+        if best is None or point > best[0]:
+            best = (point, bands, rows)
+    if best is None:
+        return permutations, 1
+    return best[1], best[2]
+
+
+class MinHasher:
+    """
+    MinHash signatures of token sets with universal hashing
+
+    each of the permutations is h(x) = (a * x + b) mod PRIME of the token hash
+    x, and the signature keeps the minimum of each over the set. The share of
+    equal values of two signatures estimates the Jaccard similarity of the sets
+    """
+
+    def __init__(self, permutations: int = DEFAULT_PERMUTATIONS, seed: int = 1):
+        """
+        constructor class
+
+        Raises:
+            TypeError:
+                if permutations is not an int
+            ValueError:
+                if permutations is less than 1
+        """
+        if not isinstance(permutations, int) or isinstance(permutations, bool):
+            raise TypeError(f"permutations must be an int but is a "
+                            f"{type(permutations)}")
+        if permutations < 1:
+            raise ValueError(f"permutations must be at least 1 but is "
+                             f"{permutations}")
+        generator = np.random.default_rng(seed)
+        self._a = generator.integers(1, PRIME, permutations, dtype=np.int64)
+        self._b = generator.integers(0, PRIME, permutations, dtype=np.int64)
+
+    def __len__(self) -> int:
+        return len(self._a)
+
+    def signature(self, tokens) -> np.ndarray:
+        """
+        returns the signature of the set of tokens, an int64 array with one
+        value per permutation. An empty set gets PRIME everywhere
+        """
+        hashes = np.fromiter((token_hash(token) % PRIME for token in tokens),
+                             dtype=np.int64)
+        if not len(hashes):
+            return np.full(len(self._a), PRIME, dtype=np.int64)
+        values = (hashes[:, np.newaxis] * self._a + self._b) % PRIME
+        return values.min(axis=0)
+
+def estimate_jaccard(first: np.ndarray, second: np.ndarray) -> float:
+    """
+    returns the Jaccard similarity estimated from two signatures of the same
+    MinHasher
+    """
+    return float(np.mean(first == second))
+
+
+class DuplicateIndex:
+    """
+    streaming near-duplicate index of recipes
+
+    keeps the signature of each ingested recipe and one bucket table per band.
+    Ingesting or querying a recipe only looks at the recipes sharing one of
+    its buckets, never the whole corpus
+    """
+
+    def __init__(self, threshold: float = DEFAULT_THRESHOLD,
+                 permutations: int = DEFAULT_PERMUTATIONS, seed: int = 1):
+        """
+        constructor class
+
+        Parameters:
+            threshold: float:
+                estimated Jaccard similarity from which two recipes are
+                duplicates, between 0 and 1
+
+            permutations: int:
+                length of the signatures, more is more accurate and slower
+
+            seed: int:
+                seed of the permutations, indexes are only comparable with the
+                same seed
+
+        Raises:
+            TypeError:
+                if threshold is not a float or permutations is not an int
+            ValueError:
+                if threshold is not above 0 and at most 1
+        """
+        if not isinstance(threshold, (int, float)) or isinstance(threshold, bool):
+            raise TypeError(f"threshold must be a float but is a {type(threshold)}")
+        if not 0 < threshold <= 1:
+            raise ValueError(f"threshold must be above 0 and at most 1 but is "
+                             f"{threshold}")
+        self._threshold = threshold
+        self._hasher = MinHasher(permutations, seed)
+        self._bands, self._rows = choose_bands(threshold, permutations)
+        self._buckets = [{} for _ in range(self._bands)]
+        self._keys = []
+        self._signatures = []
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def threshold(self) -> float:
+        return self._threshold
+
+    def bands(self) -> tuple:
+        """
+        returns (bands, rows) of the signatures, see choose_bands
+        """
+        return self._bands, self._rows
+
+    def keys(self) -> list:
+        return list(self._keys)
+
+    def _band_keys(self, signature: np.ndarray) -> list:
+        return [signature[band * self._rows:(band + 1) * self._rows].tobytes()
+                for band in range(self._bands)]
+
+    def _matches(self, signature: np.ndarray, bandKeys: list) -> list:
+        """
+        internal method that returns (key, similarity) of the ingested
+        recipes sharing a bucket with signature and reaching the threshold,
+        most similar first
+        """
+        candidates = set()
+        for buckets, bandKey in zip(self._buckets, bandKeys):
+            candidates.update(buckets.get(bandKey, ()))
+        matches = []
+        for position in sorted(candidates):
+            similarity = estimate_jaccard(signature, self._signatures[position])
+            if similarity >= self._threshold:
+                matches.append((self._keys[position], similarity))
+        matches.sort(key=lambda match: -match[1])
+        return matches
+
+    def query(self, recipe) -> list:
+        """
+        returns (key, estimated similarity) of the ingested recipes that are
+        near-duplicates of recipe, most similar first, without ingesting it
+        """
+        signature = self._hasher.signature(recipe_tokens(recipe))
+        return self._matches(signature, self._band_keys(signature))
+
+    def add(self, recipe, key=None) -> list:
+        """
+        ingests recipe and returns (key, estimated similarity) of the recipes
+        ingested before that it is a near-duplicate of, an empty list for a
+        new recipe. key defaults to the recipe title
+        """
+        signature = self._hasher.signature(recipe_tokens(recipe))
+        bandKeys = self._band_keys(signature)
+        matches = self._matches(signature, bandKeys)
+        position = len(self._keys)
+        self._keys.append(recipe.title() if key is None else key)
+        self._signatures.append(signature)
+        for buckets, bandKey in zip(self._buckets, bandKeys):
+            buckets.setdefault(bandKey, []).append(position)
+        return matches
+
+    def candidate_pairs(self) -> set:
+        """
+        returns the set of (first, second) positions in ingest order that
+        share at least one bucket
+        """
+        pairs = set()
+        for buckets in self._buckets:
+            for positions in buckets.values():
+                for index, first in enumerate(positions):
+                    for second in positions[index + 1:]:
+                        pairs.add((first, second))
+        return pairs
+
+    def duplicate_pairs(self) -> list:
+        """
+        returns (first key, second key, estimated similarity) of every
+        candidate pair reaching the threshold, in ingest order
+        """
+        result = []
+        for first, second in sorted(self.candidate_pairs()):
+            similarity = estimate_jaccard(self._signatures[first],
+                                          self._signatures[second])
+            if similarity >= self._threshold:
+                result.append((self._keys[first], self._keys[second],
+                               similarity))
+        return result
+
+def deduplicate(recipes, threshold: float = DEFAULT_THRESHOLD,
+                permutations: int = DEFAULT_PERMUTATIONS) -> list:
+    """
+    returns recipes without the ones that are near-duplicates of a recipe
+    before them, keeping the first copy in order
+    """
+    index = DuplicateIndex(threshold, permutations)
+    return [recipe for position, recipe in enumerate(recipes)
+            if not index.add(recipe, position)]
@@ -0,0 +1,345 @@
+import os
+import json
+import instrumentation
+from trigram_index import TrigramIndex, normalize
+
+project_root = os.path.dirname(os.path.abspath(__file__))
+DENSITY_FILE = os.path.join(project_root, 'ingredient_densities.json')
+
+# lowest trigram similarity accepted by DensityTable.match for a fuzzy match
+FUZZY_THRESHOLD = 0.6
+
+# fallback paths of DensityTable.match, in the order they are tried
+MATCH_PATHS = ('exact', 'word', 'fuzzy', 'substring', 'miss')
+
+# names whose DensityMatch is remembered by each DensityTable
+MATCH_CACHE_SIZE = 4096
+
+
+class DensityMatch:
+    """
+    result of DensityTable.match: the density key that was used, its details,
+    the path that found it and the trigram similarity of the name and the key
+
+    Attributes:
+        self.path:
+            one of MATCH_PATHS. 'exact' is the name itself, 'word' the longest
+            key made of whole words of the name, 'fuzzy' the most similar key
+            by trigrams, 'substring' the longest key inside the name and
+            'miss' means no key was found
+    """
+    __slots__ = ('key', 'details', 'path', 'score')
+
+    def __init__(self, key: str | None, details: dict | None, path: str,
+                 score: float):
+        self.key = key
+        self.details = details
+        self.path = path
+        self.score = score
+
+    def __repr__(self) -> str:
+        return (f"DensityMatch(key={self.key!r}, path={self.path!r}, "
+                f"score={self.score:.2f})")
+
+
+class DensityTable:
+    """
+    read-only lookup table of ingredient densities in g/cup
+
+    the table is built once from the density json file and is shared by every
+    Ingredient in the process (see get_density_table). Lookups first try an
+    exact match on the name, then the longest density key that is a substring
+    of the name. The substring search runs through a precompiled Aho-Corasick
+    automaton so a lookup scans the name once instead of testing every key.
+    match also finds misspelled and reordered names through a trigram index
+    over the keys.
+    """
+
+    def __init__(self, densities: dict):
+        """
+        constructor class
+
+        Parameters:
+            densities: dict:
+                ingredient names as keys and dicts with 'density' and 'state'
+                as values. Keys starting with '_' (such as '_comment') are
+                ignored
+
+        Attributes:
+            self._entries:
+                dict of ingredient name -> {'density': int, 'state': str}
+
+            self._keys:
+                list of ingredient names in file order, the index of a key is
+                used to break ties between matches of the same length
+
+            self._goto, self._fail, self._best:
+                Aho-Corasick automaton over self._keys. self._best[node] is
+                the index of the longest key that ends at node, or -1
+
+            self._byWords:
+                dict of normalized key -> index of the key, see
+                trigram_index.normalize
+
+            self._trigrams:
+                TrigramIndex over self._keys
+        """
+        if not isinstance(densities, dict):
+            raise TypeError("densities must be a dict but is a "
+                            f"{type(densities)}")
+
+        self._entries = {}
+        for key, details in densities.items():
+            if key.startswith('_') or not isinstance(details, dict):
+                continue
+            self._entries[key] = details
+        self._keys = list(self._entries.keys())
+
+        self._goto = [{}]
+        self._fail = [0]
+        self._best = [-1]
+        self._build_automaton()
+
+        self._byWords = {}
+        for index, key in enumerate(self._keys):
+            self._byWords.setdefault(normalize(key), index)
+        self._maxWords = max((len(words.split()) for words in self._byWords),
+                             default=0)
+        # words of each key, a fuzzy match may not just add words to a name
+        self._keyWords = [frozenset(normalize(key).split()) for key in self._keys]
+        # the trigram index holds the keys at their index in self._keys
+        self._trigrams = TrigramIndex(self._keys)
+        # (name, threshold) -> DensityMatch, the table never changes
+        self._matches = {}
+
+    @classmethod
+    def from_file(cls, filename: str = DENSITY_FILE) -> 'DensityTable':
+        """
+        loads a density file where ingredients are keys and density in g/cup
+        are values. Returns an empty table if the file does not exist
+        """
+        try:
+            with open(filename, 'r') as f:
+                return cls(json.load(f))
+        except FileNotFoundError:
+            print(f"{filename} does not exist, cannot use a density table")
+            return cls({})
+
+    def _build_automaton(self) -> None:
+        """
+        internal method to build the trie, failure links and longest match
+        for every node of the automaton
+        """
+        for index, key in enumerate(self._keys):
+            node = 0
+            for char in key:
+                nextNode = self._goto[node].get(char)
+                if nextNode is None:
+                    nextNode = len(self._goto)
+                    self._goto[node][char] = nextNode
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._best.append(-1)
+                node = nextNode
+            if self._best[node] == -1:
+                self._best[node] = index
+
+        # breadth first so a node's failure link is finished before its
+        # children need it
+        queue = list(self._goto[0].values())
+        head = 0
+        while head < len(queue):
+            node = queue[head]
+            head += 1
+            for char, child in self._goto[node].items():
+                fallback = self._fail[node]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                failNode = self._goto[fallback].get(char, 0)
+                self._fail[child] = failNode
+                if self._best[child] == -1:
+                    # the node's own key is always the longest suffix, so
+                    # only inherit when the node is not the end of a key
+                    self._best[child] = self._best[failNode]
+                queue.append(child)
+
+    def _longest_substring_key(self, name: str) -> str | None:
+        """
+        internal method that returns the longest key contained in name.
+        Keys of the same length are resolved in file order
+        """
+        goto = self._goto
+        fail = self._fail
+        best = self._best
+        keys = self._keys
+
+        node = 0
+        bestIndex = -1
+        bestLength = 0
+        for char in name:
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+            index = best[node]
+            if index != -1:
+                length = len(keys[index])
+                if (length > bestLength
+                        or (length == bestLength and index < bestIndex)):
+                    bestIndex = index
+                    bestLength = length
+
+        if bestIndex == -1:
+            return None
+        return keys[bestIndex]
+
+    def _longest_word_key(self, name: str) -> int:
+        """
+        internal method that returns the index of the longest key whose words
+        appear next to each other in name, ignoring case and punctuation, or
+        -1. Keys of the same length are resolved in file order
+        """
+        words = normalize(name).split()
+        keys = self._keys
+        bestIndex = -1
+        bestLength = 0
+        for size in range(min(self._maxWords, len(words)), 0, -1):
+            for start in range(len(words) - size + 1):
+                index = self._byWords.get(' '.join(words[start:start + size]))
+                if index is None:
+                    continue
+                length = len(keys[index])
+                if (length > bestLength
+                        or (length == bestLength and index < bestIndex)):
+                    bestIndex = index
+                    bestLength = length
+        return bestIndex
+
+    def match(self, name: str,
+              threshold: float = FUZZY_THRESHOLD) -> DensityMatch:
+        """
+        returns the DensityMatch for name, trying in order an exact match,
+        the longest key made of whole words of name, the key most similar to
+        name by trigrams with a score of at least threshold and the longest
+        key contained in name. A similar key only wins over a whole word key
+        when it has the same words reordered, such as 'all-purpose flour'
+        for 'flour, all purpose'. Unlike lookup a misspelled name such as
+        'buttermik' finds buttermilk and not butter
+
+        Raises:
+            TypeError:
+                if name is not the correct type
+        """
+        if not isinstance(name, str):
+            raise TypeError(f"name must be a str but is a {type(name)}")
+
+        result = self._matches.get((name, threshold))
+        if result is None:
+            result = self._match(name, threshold)
+            if len(self._matches) >= MATCH_CACHE_SIZE:
+                del self._matches[next(iter(self._matches))]
+            self._matches[(name, threshold)] = result
+        instrumentation.count(f'density.{result.path}')
+        return result
+
+    def _match(self, name: str, threshold: float) -> DensityMatch:
+        """
+        internal method that finds the DensityMatch of match
+        """
+        if name in self._entries:
+            return DensityMatch(name, self._entries[name], 'exact', 1.0)
+
+        # one trigram pass scores every key that could match
+        scores = self._trigrams.scores(name)
+        index = self._longest_word_key(name)
+        score = scores.get(index, 0.0)
+        path = 'word'
+        # the best key scoring at least threshold and more than the word key
+        bestIndex = -1
+        bestScore = 0.0
+        words = frozenset(normalize(name).split())
+        for position, positionScore in scores.items():
+            if positionScore < threshold or positionScore <= score:
+                continue
+            keyWords = self._keyWords[position]
+            # a key made of whole words of name wins over a similar key, as
+            # 'chopped kale' is kale and not 'chopped apple', unless the
+            # similar key is the same words reordered
+            if index != -1 and keyWords != words:
+                continue
+            # 'cream' is not 'sour cream', a key holding every word of name
+            # and more is a different ingredient, not a misspelling
+            if words < keyWords:
+                continue
+            if positionScore > bestScore or (positionScore == bestScore
+                                              and position < bestIndex):
+                bestIndex = position
+                bestScore = positionScore
+        if bestIndex != -1:
+            # such as 'brown sugar, packed' that is closer to
+            # 'packed brown sugar' than to its word 'brown sugar'
+            index, score = bestIndex, bestScore
+            path = 'fuzzy'
+        elif index == -1:
+            key = self._longest_substring_key(name)
+            if key is None:
+                return DensityMatch(None, None, 'miss', 0.0)
+            index = self._keys.index(key)
+            score = scores.get(index, 0.0)
+            path = 'substring'
+
+        key = self._keys[index]
+        return DensityMatch(key, self._entries[key], path, score)
+
+    def similar(self, name: str, limit: int = 5,
+                threshold: float = 0.0) -> list:
+        """
+        returns (score, key) of the limit density keys most similar to name,
+        best first
+        """
+        return self._trigrams.search(name, threshold, limit)
+
+    def lookup(self, name: str) -> dict | None:
+        """
+        returns the density details {'density': int, 'state': str} for name,
+        or None if no key matches
+
+        Precondition:
+            name must be a str
+
+        Raises:
+            TypeError:
+                if name is not the correct type
+        """
+        if not isinstance(name, str):
+            raise TypeError(f"name must be a str but is a {type(name)}")
+
+        details = self._entries.get(name)
+        if details is not None:
+            instrumentation.count('density.exact')
+            return details
+
+        key = self._longest_substring_key(name)
+        if key is None:
+            instrumentation.count('density.miss')
+            return None
+        instrumentation.count('density.substring')
+        return self._entries[key]
+
+    def __contains__(self, name) -> bool:
+        return name in self._entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+_sharedTable = None
+
+def get_density_table() -> DensityTable:
+    """
+    returns the process-wide DensityTable, loading the density file on the
+    first call only
+    """
+    global _sharedTable
+    if _sharedTable is None:
+        _sharedTable = DensityTable.from_file()
+    return _sharedTable
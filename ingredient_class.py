@@ -1,5 +1,9 @@
-import json
 import fractions
+from density_table import get_density_table
+import quantity
+import instrumentation
+from names import clean_name, normalize_name
+from compact_ingredient import CompactIngredient
 
 class Ingredient:
     """
@@ -42,7 +46,8 @@ class Ingredient:
                     taste')
 
                 self._keywords:
-                    list that contains key words of the ingredient
+                    tuple that contains key words of the ingredient, shared
+                    by every ingredient with the same name
                     removes filler words such as 'all', 'extra', 'virgin',
                     'fine', 'coarse', etc that are adjectives. Makes comparison
                     of ingredients more efficient
@@ -58,7 +63,8 @@ class Ingredient:
         self._metricMeasure = None
         self._density = None
         self._state = None
-        self._keywords = []
+        self._keywords = ()
+        self._keywordSet = frozenset()
 
         if measure:
             self._state = self._verify_state(ingState)
@@ -88,25 +94,13 @@ class Ingredient:
             self._kitchenMeasure = measure
             self._kitchenAmount = self._verify_amount(amount)
             # _convert_to_metric returns tuple as (amount, measure)
-            metricAmount, metricMeasure = self._convert_to_metric()
-            self._metricAmount = self._convert_to_fraction(metricAmount)
-            self._metricMeasure = metricMeasure
+            self._metricAmount, self._metricMeasure = self._convert_to_metric()
 
         elif measure in METRIC_MEASURES:
-            if measure in ('ml', 'g'):
-                self._metricAmount = self._verify_amount(amount)
-                self._metricMeasure = measure
-            elif measure in ('l', 'kg'):
-                if measure == 'l':
-                    measure = 'ml'
-                else:
-                    measure = 'g'
-                self._metricAmount = self._verify_amount(amount) * 1000
-                self._metricMeasure = measure
-
-            kitchenAmount, kitchenMeasure = self._convert_to_kitchen()
-            self._kitchenAmount = self._convert_to_fraction(kitchenAmount)
-            self._kitchenMeasure = kitchenMeasure
+            self._metricAmount, self._metricMeasure = quantity.metric_to_base(
+                self._verify_amount(amount), measure)
+
+            self._kitchenAmount, self._kitchenMeasure = self._convert_to_kitchen()
 
 
     def _verify_amount(self, amount: str | int | float) -> fractions.Fraction:
@@ -125,35 +119,7 @@ class Ingredient:
             TypeError:
                 if amount is not a correct type
         """
-        if isinstance(amount, fractions.Fraction):
-            return amount
-        if type(amount) == int or type(amount) == float:
-            return self._convert_to_fraction(amount)
-
-        if not isinstance(amount, str):
-            raise TypeError("amount must be a float, int, or unicode character"
-                            f" of a fraction but is a {type(amount)}")
-        try:
-            return self._convert_to_fraction((amount))
-        except ValueError:
-            match amount:
-                case '¼':
-                    return fractions.Fraction(1, 4)
-                case '½':
-                    return fractions.Fraction(1,2)
-                case '¾':
-                    return fractions.Fraction(3,4)
-                case '⅓':
-                    return fractions.Fraction(1,3)
-                case '⅔':
-                    return fractions.Fraction(2,3)
-                case '⅛':
-                    return fractions.Fraction(1,8)
-                case '⅜':
-                    return fractions.Fraction(3,8)
-                case _: # default value
-                    raise ValueError(f"{amount} is not a recognized ingredient "
-                                     "amount")
+        return quantity.parse_amount(amount)
 
     def _verify_measure(self, measure:str) -> str:
         """
@@ -244,59 +210,81 @@ class Ingredient:
     def kitchen_measure(self) -> str:
         return self._kitchenMeasure
 
-    def _load_densities(self, filename="ingredient_densities.json") -> dict:
+    def state(self) -> str | None:
+        return self._state
+
+    @classmethod
+    def from_fields(cls, name: str, kitchenAmount, kitchenMeasure: str | None,
+                    metricAmount, metricMeasure: str | None,
+                    state: str | None, density: int | None) -> 'Ingredient':
+        """
+        rebuilds an Ingredient from values it already had, such as a stored
+        row, without looking up its density or converting its amounts again.
+        name must already be cleaned
+        """
+        name, keywords, keywordSet = normalize_name(name)
+        ingredient = cls.__new__(cls)
+        ingredient.__dict__ = {'_name': name,
+                               '_kitchenAmount': kitchenAmount,
+                               '_kitchenMeasure': kitchenMeasure,
+                               '_metricAmount': metricAmount,
+                               '_metricMeasure': metricMeasure,
+                               '_density': density,
+                               '_state': state,
+                               '_keywords': keywords,
+                               '_keywordSet': keywordSet}
+        return ingredient
+
+    def to_bytes(self) -> bytes:
+        """
+        returns the ingredient in the compact binary format of serialization
+        """
+        from serialization import encode_ingredients
+        return encode_ingredients([self])
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> 'Ingredient':
+        """
+        returns the Ingredient encoded in data by to_bytes
+
+        Raises:
+            ValueError:
+                if data does not hold exactly one ingredient
+        """
+        from serialization import decode_ingredients
+        ingredients = decode_ingredients(data)
+        if len(ingredients) != 1:
+            raise ValueError("data must hold one ingredient but holds "
+                             f"{len(ingredients)}")
+        return ingredients[0]
+
+    def compact(self):
         """
-        internal method to load a density file where ingredients are keys
-        and density in g/cup are values
-        # TODO need to figure out how to avoid loading this for each ingredient, maybe should be in recipe?
+        returns an immutable CompactIngredient with the same values, for
+        holding large corpora in memory
         """
-        try:
-            with open(filename, 'r') as f:
-                return json.load(f)
-        except FileNotFoundError:
-            print(f"{filename} does not exist, cannot use a density table")
-            return {}
+        return CompactIngredient.from_ingredient(self)
 
+    @instrumentation.timed('ingredient.density_and_state')
     def _set_density_and_state_for_ingredient(self) -> None:
         """
         internal method to set ingredient density and state
         sets self._density as the density as g/cup as an int if ingredient in
-        json file. Sets the self._state to 'solid' or 'liquid'
-        """
-        DENSITIES = self._load_densities()
-        try:
-            ingDetails = DENSITIES[self._name]
-            self._density = ingDetails['density']
-            self._state = ingDetails['state']
-
-        except KeyError:
-            sortedKeys = sorted(DENSITIES.keys(), key=len, reverse=True)
-            for key in sortedKeys:
-                if key in self._name:
-                    ingDetails = DENSITIES[key]
-                    self._density = ingDetails['density']
-                    self._state = ingDetails['state']
-                    return
+        the shared density table, see DensityTable.match for how misspelled
+        names are found. Sets the self._state to 'solid' or 'liquid'
+        """
+        ingDetails = get_density_table().match(self._name).details
+        if ingDetails is None:
             return
+        self._density = ingDetails['density']
+        self._state = ingDetails['state']
 
     def _clean_name(self, name:str) -> str:
         """
-        internal method to clean up the name of an ingredient
-        removes non-alpha characters and returns a lowercase string
+        internal method to clean up the name of an ingredient, see clean_name.
+        Returns the shared interned string of the clean name
         """
-        if not isinstance(name, str):
-            raise TypeError(f"name must be a str but is a {type(name)}")
-
-        if name.isalpha():
-            return name.lower()
-
-        cleanName = ''
-        for char in name:
-            if char.isalpha() or char == ' ':
-                cleanName += char.lower()
-            elif char == '-' or char == '_':
-                cleanName += ' '
-        return cleanName
+        return normalize_name(name)[0]
 
     def to_kitchen_measurement(self) -> str:
         """
@@ -318,38 +306,26 @@ class Ingredient:
 
     def _add_keywords(self) -> None:
         """
-        adds all keywords from self._name to self._keywords.
+        sets self._keywords to the keywords of self._name.
         keywords are words that are not adjectives such as 'all', 'coarse',
-        'virgin', etc
+        'virgin', etc, see names.FILLER_WORDS. The keyword tuple and set are
+        shared by every ingredient with the same name
         """
-        # constant
-        FILLER_WORDS = ('all', 'purpose', 'extra', 'large', 'small', 'medium',
-                        'fine', 'coarse', 'thick', 'thin', 'melted',
-                        'softened', 'chilled', 'cold', 'room', 'temperature',
-                        'sifted', 'packed', 'leveled', 'spooned', 'grated',
-                        'minced', 'chopped', 'diced', 'sliced', 'crushed',
-                        'beaten', 'whisked', 'melted', 'organic', 'natural',
-                        'virgin', 'unsalted', 'salted', 'sweetened',
-                        'unsweetened', 'light', 'dark')
-
-        words = self._name.split(' ')
-        for word in words:
-            if word not in FILLER_WORDS:
-                self._keywords.append(word)
+        _, self._keywords, self._keywordSet = normalize_name(self._name)
 
-        # hardcode white and brown sugar so aren't returned as the same
-        if self._keywords == ['white', 'sugar']:
-            self._keywords = ['white sugar']
-        elif self._keywords == ['brown', 'sugar']:
-            self._keywords = ['brown sugar']
-
-
-    def keywords(self) -> list:
+    def keywords(self) -> tuple:
         """
-        returns a list of the ingredient's keywords
+        returns the shared tuple of the ingredient's keywords
         """
         return self._keywords
 
+    def keyword_set(self) -> frozenset:
+        """
+        returns the shared frozenset of the ingredient's keywords
+        """
+        return self._keywordSet
+
+    @instrumentation.timed('ingredient.convert_to_kitchen')
     def _convert_to_kitchen(self) -> tuple:
         """
         converts ingredient amount of metric units to kithcen measurements
@@ -370,28 +346,7 @@ class Ingredient:
         if self._metricMeasure not in METRIC_UNITS:
             raise ValueError("self._metricMeasure must be 'g' or 'ml'  but is "
                              f"{self._metricMeasure}")
-        # constants
-        TABLESPOON_TO_CUP = fractions.Fraction(1,16)
-        TEASPOON_TO_CUP = fractions.Fraction(1,48)
-        QUARTER_CUP = fractions.Fraction(1,4)
-
-        amount = fractions.Fraction(self._metricAmount / self._density)
-
-        # format kitchen measurement
-        if amount >= QUARTER_CUP:
-            # formattedAmount = self._format_amount(amount) # will convert 1.0000 to 1 for example
-            # if formattedAmount != 1: # TODO come back and figure out how to handle this
-            #     return amount, 'cups'
-            # else:
-            return amount, 'cup'
-
-        elif QUARTER_CUP > amount >= TABLESPOON_TO_CUP / 2:
-            # amount is between 1/2 tablespoon and 1/4 cup
-            amount = amount * (1/TABLESPOON_TO_CUP)
-            return amount, 'tablespoon'
-        else:
-            amount = amount * (1/TEASPOON_TO_CUP)
-            return amount, 'teaspoon'
+        return quantity.metric_to_kitchen(self._metricAmount, self._density)
 
     def to_metric(self) -> str:
         """
@@ -410,6 +365,7 @@ class Ingredient:
             raise Exception(f".self._kitchenMeasure: {measure} "
                             "is not a possible value")
 
+    @instrumentation.timed('ingredient.convert_to_metric')
     def _convert_to_metric(self) -> tuple:
         """
         converts ingredient amount and measure to metric units.
@@ -430,17 +386,8 @@ class Ingredient:
             raise ValueError("self._measure must be 'cup' or 'tablespoon' or"
                              f"'teaspoon', but is {self._measure}")
 
-        if self._kitchenMeasure == 'cup':
-            conversionFactor = 1
-        elif self._kitchenMeasure == 'teaspoon':
-            conversionFactor = 1/48
-        elif self._kitchenMeasure == 'tablespoon':
-            conversionFactor = 1/16
-        else:
-            raise Exception(f"self._kitchenMeasure: {self._kitchenMeasure} is "
-                            "not a possible value.")
-
-        amount = self._convert_to_fraction(self._kitchenAmount * self._density * conversionFactor)
+        amount = quantity.kitchen_to_metric(self._kitchenAmount, self._kitchenMeasure,
+                                            self._density)
 
         if self._state == 'solid':
             return amount, 'g'
@@ -462,19 +409,7 @@ class Ingredient:
             TypeError:
                 if value not the correct type
         """
-        if isinstance(value, fractions.Fraction):
-            return value
-        if not (isinstance(value, str)
-                or isinstance(value, int)
-                or isinstance(value, float)):
-            raise TypeError(f"value must be a str that can be converted to an "
-                            f"int or float or an int or float")
-        try:
-            float(value)
-            return fractions.Fraction(str(value))
-        except ValueError:
-            raise ValueError(f"value: {(value)} be a str that represents a "
-                             f"int or float")
+        return quantity.to_fraction(value)
 
     def _format_amount(self, value: int | float | fractions.Fraction)  -> int | float:
         """
@@ -515,7 +450,7 @@ class Ingredient:
     def compare_ingredient(self, other) -> bool:
         """
         checks if other is a same or similar ingredient as self and returns
-        a boolean
+        a boolean. other can be an Ingredient or a CompactIngredient
 
         Precondition:
             other must be the correct type
@@ -524,14 +459,13 @@ class Ingredient:
             TypeError:
                 if other not the correct type
         """
-        if not isinstance(other, Ingredient):
-            raise TypeError("other must be an Ingredient but is a "
-                            f"{type(other)}")
+        # the common case of two Ingredients skips the isinstance check
+        if (type(other) is not Ingredient
+                and not isinstance(other, (Ingredient, CompactIngredient))):
+            raise TypeError("other must be an Ingredient or a "
+                            f"CompactIngredient but is a {type(other)}")
 
-        for keyword in self._keywords:
-            if keyword in other._keywords:
-                return True
-        return False
+        return not self._keywordSet.isdisjoint(other._keywordSet)
 
     def difference(self, other) -> str:
         """
@@ -0,0 +1,155 @@
+"""
+opt-in timing spans and counters for finding where a slow batch spends its
+time
+
+instrumentation is off unless enable() is called or the RECIPE_INSTRUMENT
+environment variable is set. While it is off a timed function costs one
+flag check per call and count() returns straight away. When
+RECIPE_INSTRUMENT_DUMP names a file, the stats are written there as JSON when
+the process exits.
+"""
+import os
+import time
+import atexit
+import threading
+from functools import wraps
+
+ENABLE_VARIABLE = 'RECIPE_INSTRUMENT'
+DUMP_VARIABLE = 'RECIPE_INSTRUMENT_DUMP'
+
+_lock = threading.Lock()
+_enabled = False
+_dumpPath = None
+# name -> [calls, total seconds, max seconds]
+_spans = {}
+# name -> count
+_counters = {}
+
+def enable(dumpPath: str | None = None) -> None:
+    """
+    turns instrumentation on. If dumpPath is given the stats are written to
+    it as JSON when the process exits
+    """
+    global _enabled, _dumpPath
+    _enabled = True
+    if dumpPath is not None:
+        if _dumpPath is None:
+            atexit.register(_dump_at_exit)
+        _dumpPath = dumpPath
+
+def disable() -> None:
+    global _enabled
+    _enabled = False
+
+def is_enabled() -> bool:
+    return _enabled
+
+def reset() -> None:
+    """
+    clears every span and counter
+    """
+    with _lock:
+        _spans.clear()
+        _counters.clear()
+
+def _record(name: str, seconds: float) -> None:
+    """
+    internal function that adds one call of seconds to the span name
+    """
+    with _lock:
+        span = _spans.get(name)
+        if span is None:
+            _spans[name] = [1, seconds, seconds]
+        else:
+            span[0] += 1
+            span[1] += seconds
+            if seconds > span[2]:
+                span[2] = seconds
+
+def count(name: str, amount: int = 1) -> None:
+    """
+    adds amount to the counter name, does nothing while disabled
+    """
+    if not _enabled:
+        return
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + amount
+
+
+class _Span:
+    """
+    context manager that records the time spent in its block under name
+    """
+    __slots__ = ('_name', '_start')
+
+    def __init__(self, name: str):
+        self._name = name
+        self._start = None
+
+    def __enter__(self):
+        if _enabled:
+            self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *excInfo):
+        if self._start is not None:
+            _record(self._name, time.perf_counter() - self._start)
+            self._start = None
+        return False
+
+
+def span(name: str) -> _Span:
+    """
+    returns a context manager timing its block as the span name
+
+        with instrumentation.span('ingest.batch'):
+            ...
+    """
+    return _Span(name)
+
+def timed(name: str):
+    """
+    decorator that times every call of the decorated function as the span
+    name
+    """
+    def decorator(function):
+        @wraps(function)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return function(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                _record(name, time.perf_counter() - start)
+        return wrapper
+    return decorator
+
+def stats() -> dict:
+    """
+    returns a dict with 'spans', name -> {'calls', 'total', 'mean', 'max'}
+    in seconds, and 'counters', name -> count
+    """
+    with _lock:
+        spans = {name: {'calls': calls, 'total': total,
+                        'mean': total / calls, 'max': longest}
+                 for name, (calls, total, longest) in sorted(_spans.items())}
+        counters = dict(sorted(_counters.items()))
+    return {'spans': spans, 'counters': counters}
+
+def dump(path: str) -> None:
+    """
+    writes stats() to path as JSON
+    """
+    import json
+    with open(path, 'w', encoding='utf-8') as file:
+        json.dump(stats(), file, indent=2)
+        file.write('\n')
+
+def _dump_at_exit() -> None:
+    if _dumpPath is not None:
+        dump(_dumpPath)
+
+if (os.environ.get(ENABLE_VARIABLE, '') not in ('', '0')
+        or os.environ.get(DUMP_VARIABLE)):
+    enable(os.environ.get(DUMP_VARIABLE) or None)
@@ -0,0 +1,291 @@
+class KeywordIndex:
+    """
+    inverted index from ingredient keywords to the ingredients of a recipe
+
+    every ingredient is stored in a numbered slot. Slots are handed out in
+    insertion order so matching can prefer the earliest ingredient in the
+    recipe, the same way a scan of the ingredient list would.
+    """
+
+    def __init__(self, ingredients=()):
+        """
+        constructor class
+
+        Parameters:
+            ingredients: iterable of Ingredient:
+                ingredients to index, in recipe order
+
+        Attributes:
+            self._slots:
+                dict of slot -> Ingredient in insertion order
+
+            self._byKeyword:
+                dict of keyword -> dict of slots whose ingredient has that
+                keyword, used as an insertion ordered set
+        """
+        self._slots = {}
+        self._byKeyword = {}
+        self._nextSlot = 0
+        for ingredient in ingredients:
+            self.add(ingredient)
+
+    def add(self, ingredient) -> int:
+        """
+        indexes ingredient in a new slot after every other slot and returns
+        the slot
+        """
+        slot = self._nextSlot
+        self._nextSlot += 1
+        self._slots[slot] = ingredient
+        self._index_keywords(slot, ingredient)
+        return slot
+
+    def remove(self, slot: int):
+        """
+        removes the ingredient in slot from the index and returns it
+
+        Raises:
+            KeyError:
+                if slot is not in the index
+        """
+        ingredient = self._slots.pop(slot)
+        self._unindex_keywords(slot, ingredient)
+        return ingredient
+
+    def replace(self, slot: int, ingredient):
+        """
+        puts ingredient in slot, keeping the slot's position, and returns the
+        ingredient it replaced
+
+        Raises:
+            KeyError:
+                if slot is not in the index
+        """
+        oldIngredient = self._slots[slot]
+        self._unindex_keywords(slot, oldIngredient)
+        self._slots[slot] = ingredient
+        self._index_keywords(slot, ingredient)
+        return oldIngredient
+
+    def _index_keywords(self, slot: int, ingredient) -> None:
+        """
+        internal method to add slot under every keyword of ingredient
+        """
+        for keyword in ingredient.keywords():
+            self._byKeyword.setdefault(keyword, {})[slot] = None
+
+    def _unindex_keywords(self, slot: int, ingredient) -> None:
+        """
+        internal method to remove slot from every keyword of ingredient,
+        dropping keywords left without a slot
+        """
+        for keyword in ingredient.keywords():
+            slots = self._byKeyword.get(keyword)
+            if slots is not None:
+                slots.pop(slot, None)
+                if not slots:
+                    del self._byKeyword[keyword]
+
+    def slots(self) -> list:
+        """
+        returns the slots of the index in insertion order
+        """
+        return list(self._slots)
+
+    def ingredient(self, slot: int):
+        """
+        returns the ingredient in slot
+        """
+        return self._slots[slot]
+
+    def candidates(self, ingredient) -> set:
+        """
+        returns the set of slots whose ingredient shares at least one
+        keyword with ingredient
+        """
+        result = set()
+        for keyword in ingredient.keywords():
+            slots = self._byKeyword.get(keyword)
+            if slots:
+                result.update(slots)
+        return result
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    def match(self, ingredients, optimal: bool = False) -> list:
+        """
+        pairs each of ingredients with a similar indexed ingredient
+
+        Parameters:
+            ingredients: iterable of Ingredient:
+                ingredients of the other recipe
+
+            optimal: bool:
+                if False, each ingredient takes the earliest unmatched indexed
+                ingredient sharing a keyword. If True, the pairing maximises
+                the total number of shared keywords over all pairs
+
+        Returns:
+            list of (Ingredient or None, Ingredient or None) tuples. Every
+            ingredient appears once in order, paired with its match or None,
+            followed by (None, Ingredient) for each unmatched indexed
+            ingredient in slot order
+        """
+        ingredients = list(ingredients)
+        return self.pairs(ingredients, self.assign(ingredients, optimal))
+
+    def assign(self, ingredients: list, optimal: bool = False,
+               assigned: dict | None = None, start: int = 0) -> dict:
+        """
+        returns a dict of position in ingredients -> slot of the ingredient it
+        is matched with, see match
+
+        Parameters:
+            assigned: dict or None:
+                a greedy assignment made earlier for a list whose first start
+                ingredients are the same as ingredients. Those positions keep
+                their slots and only the ingredients from start on are
+                matched again, which is how a recipe edit is re-compared. Not
+                used when optimal is True, since that pairing is global
+        """
+        if optimal:
+            return self._optimal_assignment(ingredients)
+        if assigned is None:
+            start = 0
+        return self._greedy_assignment(ingredients, assigned, start)
+
+    def pairs(self, ingredients: list, assigned: dict) -> list:
+        """
+        returns the (Ingredient or None, Ingredient or None) pairs of match
+        for an assignment made by assign
+        """
+        pairs = []
+        usedSlots = set()
+        for position, ingredient in enumerate(ingredients):
+            slot = assigned.get(position)
+            if slot is None:
+                pairs.append((ingredient, None))
+            else:
+                usedSlots.add(slot)
+                pairs.append((ingredient, self._slots[slot]))
+
+        for slot, ingredient in self._slots.items():
+            if slot not in usedSlots:
+                pairs.append((None, ingredient))
+        return pairs
+
+    def _greedy_assignment(self, ingredients: list,
+                           previous: dict | None = None,
+                           start: int = 0) -> dict:
+        """
+        internal method that returns a dict of position in ingredients ->
+        slot, taking the earliest unused candidate slot for each ingredient.
+        The positions before start keep their slot of previous
+        """
+        assigned = {}
+        if previous:
+            assigned = {position: slot for position, slot in previous.items()
+                        if position < start}
+        usedSlots = set(assigned.values())
+        for position in range(start, len(ingredients)):
+            ingredient = ingredients[position]
+            available = self.candidates(ingredient) - usedSlots
+            if available:
+                slot = min(available)
+                usedSlots.add(slot)
+                assigned[position] = slot
+        return assigned
+
+    def _optimal_assignment(self, ingredients: list) -> dict:
+        """
+        internal method that returns a dict of position in ingredients ->
+        slot maximising the total keyword overlap of the pairs. Only
+        ingredients and slots with at least one candidate are passed to the
+        assignment solver
+        """
+        overlaps = {}
+        for position, ingredient in enumerate(ingredients):
+            keywords = ingredient.keyword_set()
+            for slot in self.candidates(ingredient):
+                shared = keywords & self._slots[slot].keyword_set()
+                overlaps[(position, slot)] = len(shared)
+        if not overlaps:
+            return {}
+
+        rows = sorted({position for position, slot in overlaps})
+        columns = sorted({slot for position, slot in overlaps})
+        transpose = len(rows) > len(columns)
+        if transpose:
+            rows, columns = columns, rows
+
+        # solver minimises cost, so negate the overlap
+        cost = []
+        for row in rows:
+            costRow = []
+            for column in columns:
+                key = (column, row) if transpose else (row, column)
+                costRow.append(-overlaps.get(key, 0))
+            cost.append(costRow)
+
+        assigned = {}
+        for rowIndex, columnIndex in _min_cost_assignment(cost):
+            row, column = rows[rowIndex], columns[columnIndex]
+            position, slot = (column, row) if transpose else (row, column)
+            if overlaps.get((position, slot), 0) > 0:
+                assigned[position] = slot
+        return assigned
+
+
+def _min_cost_assignment(cost: list) -> list:
+    """
+    internal function implementing the Hungarian algorithm. cost is an n x m
+    list of lists with n <= m. Returns a list of (row, column) pairs that
+    assigns every row to a different column with the lowest total cost
+    """
+    INF = float('inf')
+    n = len(cost)
+    m = len(cost[0])
+    # 1-indexed potentials, p[j] is the row assigned to column j
+    u = [0] * (n + 1)
+    v = [0] * (m + 1)
+    p = [0] * (m + 1)
+    way = [0] * (m + 1)
+
+    for i in range(1, n + 1):
+        p[0] = i
+        j0 = 0
+        minv = [INF] * (m + 1)
+        used = [False] * (m + 1)
+        while True:
+            used[j0] = True
+            i0 = p[j0]
+            costRow = cost[i0 - 1]
+            delta = INF
+            j1 = 0
+            for j in range(1, m + 1):
+                if not used[j]:
+                    current = costRow[j - 1] - u[i0] - v[j]
+                    if current < minv[j]:
+                        minv[j] = current
+                        way[j] = j0
+                    if minv[j] < delta:
+                        delta = minv[j]
+                        j1 = j
+            for j in range(m + 1):
+                if used[j]:
+                    u[p[j]] += delta
+                    v[j] -= delta
+                else:
+                    minv[j] -= delta
+            j0 = j1
+            if p[j0] == 0:
+                break
+        while True:
+            j1 = way[j0]
+            p[j0] = p[j1]
+            j0 = j1
+            if j0 == 0:
+                break
+
+    return [(p[j] - 1, j - 1) for j in range(1, m + 1) if p[j]]
@@ -0,0 +1,105 @@
+"""
+memoized normalization of ingredient names
+
+the same raw names ("all-purpose flour", "unsalted butter") come up again and
+again across a corpus. normalize_name cleans a raw name and splits it into
+keywords once, then hands back the same interned name string, keyword tuple
+and keyword frozenset for every later occurrence, so identical ingredients
+share those objects instead of each holding its own copies.
+"""
+import sys
+from functools import lru_cache
+
+# distinct raw names remembered by normalize_name, and distinct keyword
+# sequences remembered by intern_keywords
+NAME_CACHE_SIZE = 8192
+
+# adjectives that are not keywords, such as 'all' and 'purpose' in
+# 'all purpose flour'
+FILLER_WORDS = frozenset((
+    'all', 'purpose', 'extra', 'large', 'small', 'medium', 'fine', 'coarse',
+    'thick', 'thin', 'melted', 'softened', 'chilled', 'cold', 'room',
+    'temperature', 'sifted', 'packed', 'leveled', 'spooned', 'grated',
+    'minced', 'chopped', 'diced', 'sliced', 'crushed', 'beaten', 'whisked',
+    'organic', 'natural', 'virgin', 'unsalted', 'salted', 'sweetened',
+    'unsweetened', 'light', 'dark'))
+
+# keyword sequences kept as one keyword so white and brown sugar are not
+# the same ingredient
+_MERGED_KEYWORDS = {('white', 'sugar'): ('white sugar',),
+                    ('brown', 'sugar'): ('brown sugar',)}
+
+def clean_name(name:str) -> str:
+    """
+    cleans up the name of an ingredient, removes non-alpha characters and
+    returns a lowercase string
+
+    Raises:
+        TypeError:
+            if name is not a str
+    """
+    if not isinstance(name, str):
+        raise TypeError(f"name must be a str but is a {type(name)}")
+
+    if name.isalpha():
+        return name.lower()
+
+    chars = []
+    for char in name:
+        if char.isalpha() or char == ' ':
+            chars.append(char)
+        elif char == '-' or char == '_':
+            chars.append(' ')
+    return ''.join(chars).lower()
+
+@lru_cache(maxsize=NAME_CACHE_SIZE)
+def _intern_keywords(keywords: tuple) -> tuple:
+    return tuple(sys.intern(keyword) for keyword in keywords)
+
+def intern_keywords(keywords) -> tuple:
+    """
+    returns the shared tuple of interned strings for keywords, so identical
+    ingredients across a corpus reference the same objects
+    """
+    return _intern_keywords(tuple(keywords))
+
+@lru_cache(maxsize=NAME_CACHE_SIZE)
+def _keyword_set(keywords: tuple) -> frozenset:
+    return frozenset(keywords)
+
+def keyword_set(keywords) -> frozenset:
+    """
+    returns the shared frozenset of keywords, the same object for every
+    ingredient with the same keywords
+    """
+    return _keyword_set(intern_keywords(keywords))
+
+@lru_cache(maxsize=NAME_CACHE_SIZE)
+def _normalize(name: str) -> tuple:
+    cleanName = sys.intern(clean_name(name))
+    keywords = tuple(word for word in cleanName.split(' ')
+                     if word not in FILLER_WORDS)
+    keywords = _intern_keywords(_MERGED_KEYWORDS.get(keywords, keywords))
+    return cleanName, keywords, _keyword_set(keywords)
+
+def normalize_name(name: str) -> tuple:
+    """
+    returns (clean name, keywords, keyword set) for the raw name, see
+    clean_name. keywords is a tuple of the words of the clean name that are
+    not FILLER_WORDS, in order. Every call with the same name returns the same
+    objects
+
+    Raises:
+        TypeError:
+            if name is not a str
+    """
+    if not isinstance(name, str):
+        raise TypeError(f"name must be a str but is a {type(name)}")
+    return _normalize(name)
+
+def cache_info() -> dict:
+    """
+    returns the hits, misses and size of the name and keyword caches
+    """
+    return {'names': _normalize.cache_info()._asdict(),
+            'keywords': _intern_keywords.cache_info()._asdict()}
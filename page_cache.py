@@ -0,0 +1,199 @@
+import os
+import json
+import time
+import zlib
+import hashlib
+import tempfile
+from urllib.parse import urlsplit
+
+# headers a 304 Not Modified response may update on the stored page
+REVALIDATED_HEADERS = ('etag', 'last-modified', 'cache-control', 'expires')
+
+
+class CachedPage:
+    """
+    a page read back from the PageCache
+
+    Attributes:
+        url: str:
+            url the page was fetched from
+
+        text: str:
+            decompressed html of the page
+
+        headers: dict:
+            response headers stored with the page
+
+        fetchedAt: float:
+            unix time the page was last fetched or revalidated
+    """
+
+    def __init__(self, url: str, text: str, headers: dict, fetchedAt: float):
+        self.url = url
+        self.text = text
+        self.headers = headers
+        self.fetchedAt = fetchedAt
+
+    def age(self, now: float | None = None) -> float:
+        """
+        returns the number of seconds since the page was fetched or
+        revalidated
+        """
+        return (time.time() if now is None else now) - self.fetchedAt
+
+
+class PageCache:
+    """
+    on-disk cache of fetched html pages
+
+    page bodies are zlib compressed and stored once per distinct content
+    under objects/<sha256 of body>, so mirrors serving the same html share a
+    file. Each url has a small json record under urls/<sha256 of url> with
+    its headers, fetch time and the content hash of its body.
+    """
+
+    def __init__(self, directory: str, ttl: float = 86400,
+                 hostTtls: dict | None = None, offline: bool = False):
+        """
+        constructor class
+
+        Parameters:
+            directory: str:
+                folder the cache is kept in, created if missing
+
+            ttl: float:
+                seconds a page is served without asking the server again
+
+            hostTtls: dict or None:
+                host -> ttl in seconds overriding ttl for that host
+
+            offline: bool:
+                if True pages are only ever served from the cache, whatever
+                their age, and urls not in the cache fail without a request
+
+        Raises:
+            ValueError:
+                if ttl or a value of hostTtls is negative
+        """
+        hostTtls = {} if hostTtls is None else dict(hostTtls)
+        if ttl < 0 or any(value < 0 for value in hostTtls.values()):
+            raise ValueError("ttl must not be negative")
+
+        self._directory = directory
+        self._ttl = ttl
+        self._hostTtls = {host.lower(): value
+                          for host, value in hostTtls.items()}
+        self.offline = offline
+        os.makedirs(os.path.join(directory, 'objects'), exist_ok=True)
+        os.makedirs(os.path.join(directory, 'urls'), exist_ok=True)
+
+    def _url_path(self, url: str) -> str:
+        """
+        internal method that returns the path of the json record for url
+        """
+        digest = hashlib.sha256(url.encode('utf-8')).hexdigest()
+        return os.path.join(self._directory, 'urls', f"{digest}.json")
+
+    def _object_path(self, contentHash: str) -> str:
+        """
+        internal method that returns the path of a compressed body
+        """
+        return os.path.join(self._directory, 'objects', f"{contentHash}.z")
+
+    def _write(self, path: str, data: bytes) -> None:
+        """
+        internal method that writes data to path atomically so concurrent
+        readers never see a partial file
+        """
+        handle, tempPath = tempfile.mkstemp(dir=os.path.dirname(path))
+        try:
+            with os.fdopen(handle, 'wb') as f:
+                f.write(data)
+            os.replace(tempPath, path)
+        except BaseException:
+            os.unlink(tempPath)
+            raise
+
+    def _read_record(self, url: str) -> dict | None:
+        """
+        internal method that returns the json record of url or None
+        """
+        try:
+            with open(self._url_path(url), 'r') as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+    def ttl_for(self, url: str) -> float:
+        """
+        returns the ttl in seconds that applies to url
+        """
+        host = urlsplit(url).netloc.lower()
+        return self._hostTtls.get(host, self._ttl)
+
+    def get(self, url: str) -> CachedPage | None:
+        """
+        returns the CachedPage of url, or None if url is not cached
+        """
+        record = self._read_record(url)
+        if record is None:
+            return None
+        try:
+            with open(self._object_path(record['content']), 'rb') as f:
+                text = zlib.decompress(f.read()).decode('utf-8')
+        except (FileNotFoundError, zlib.error):
+            return None
+        return CachedPage(url, text, record['headers'], record['fetchedAt'])
+
+    def is_fresh(self, page: CachedPage, now: float | None = None) -> bool:
+        """
+        returns True if page is young enough to serve without revalidating
+        """
+        return page.age(now) < self.ttl_for(page.url)
+
+    def put(self, url: str, text: str, headers: dict) -> None:
+        """
+        stores the html and headers of a page fetched from url
+        """
+        body = text.encode('utf-8')
+        contentHash = hashlib.sha256(body).hexdigest()
+        objectPath = self._object_path(contentHash)
+        if not os.path.exists(objectPath):
+            self._write(objectPath, zlib.compress(body, 6))
+
+        record = {'url': url, 'content': contentHash,
+                  'headers': dict(headers), 'fetchedAt': time.time()}
+        self._write(self._url_path(url), json.dumps(record).encode('utf-8'))
+
+    def revalidated(self, url: str, headers: dict) -> CachedPage | None:
+        """
+        records that the server answered 304 Not Modified for url, updating
+        the fetch time and any validators in headers. Returns the refreshed
+        CachedPage or None if url is not cached
+        """
+        record = self._read_record(url)
+        if record is None:
+            return None
+        for key, value in headers.items():
+            if key.lower() not in REVALIDATED_HEADERS:
+                continue
+            for oldKey in [oldKey for oldKey in record['headers']
+                           if oldKey.lower() == key.lower()]:
+                del record['headers'][oldKey]
+            record['headers'][key] = value
+        record['fetchedAt'] = time.time()
+        self._write(self._url_path(url), json.dumps(record).encode('utf-8'))
+        return self.get(url)
+
+    def conditional_headers(self, page: CachedPage) -> dict:
+        """
+        returns the If-None-Match and If-Modified-Since headers to revalidate
+        page with its server
+        """
+        headers = {}
+        for key, value in page.headers.items():
+            if key.lower() == 'etag':
+                headers['If-None-Match'] = value
+            elif key.lower() == 'last-modified':
+                headers['If-Modified-Since'] = value
+        return headers
@@ -0,0 +1,246 @@
+import os
+import atexit
+import pickle
+import sqlite3
+import threading
+import unicodedata
+from collections import OrderedDict
+
+from batch_parser import _load_parser
+
+# environment variable holding the path of the on-disk tier for the shared
+# cache, without it the shared cache only keeps parses in memory
+CACHE_PATH_ENV = 'RECIPE_PARSE_CACHE'
+
+def normalize_line(line: str) -> str:
+    """
+    returns the cache key for a raw ingredient line, the NFC form of line
+    with runs of whitespace collapsed to a single space and no leading or
+    trailing whitespace
+
+    Raises:
+        TypeError:
+            if line is not a str
+    """
+    if not isinstance(line, str):
+        raise TypeError(f"line must be a str but is a {type(line)}")
+    return ' '.join(unicodedata.normalize('NFC', line).split())
+
+def parser_version() -> str:
+    """
+    returns the installed ingredient_parser_nlp version, used to invalidate
+    cached parses when the model changes
+    """
+    from importlib import metadata
+    try:
+        return metadata.version('ingredient_parser_nlp')
+    except metadata.PackageNotFoundError:
+        return 'unknown'
+
+
+class ParseCache:
+    """
+    two tier memoization cache of ParsedIngredient results keyed by the
+    normalized ingredient line. The first tier is a bounded in-memory LRU,
+    the optional second tier is a SQLite file that survives restarts
+    """
+    # number of writes to the SQLite tier before they are committed
+    COMMIT_EVERY = 256
+
+    def __init__(self, path: str | None = None, maxsize: int = 10000,
+                 version: str | None = None):
+        """
+        constructor class
+
+        Parameters:
+            path: str or None:
+                path of the SQLite file for the on-disk tier, None keeps the
+                cache in memory only
+
+            maxsize: int:
+                maximum number of parses kept in the in-memory tier
+
+            version: str or None:
+                invalidation key stored with the on-disk tier, defaults to
+                the ingredient_parser_nlp version. Stored parses are dropped
+                when it does not match
+
+        Attributes:
+            self.memoryHits, self.diskHits, self.misses:
+                int counters of lookups served by each tier or by neither
+
+        Raises:
+            TypeError:
+                if maxsize is not an int
+            ValueError:
+                if maxsize is less than 1
+        """
+        if not isinstance(maxsize, int) or isinstance(maxsize, bool):
+            raise TypeError(f"maxsize must be an int but is a {type(maxsize)}")
+        if maxsize < 1:
+            raise ValueError(f"maxsize must be at least 1 but is {maxsize}")
+
+        self._maxsize = maxsize
+        self._version = version if version is not None else parser_version()
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._connection = None
+        self._pendingWrites = 0
+
+        self.memoryHits = 0
+        self.diskHits = 0
+        self.misses = 0
+
+        if path is not None:
+            self._open_disk_tier(path)
+
+    def _open_disk_tier(self, path: str) -> None:
+        """
+        internal method to open or create the SQLite file and drop its parses
+        if they were made by another parser version
+        """
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.execute("CREATE TABLE IF NOT EXISTS meta "
+                                 "(key TEXT PRIMARY KEY, value TEXT)")
+        self._connection.execute("CREATE TABLE IF NOT EXISTS parses "
+                                 "(line TEXT PRIMARY KEY, parsed BLOB)")
+        row = self._connection.execute(
+            "SELECT value FROM meta WHERE key = 'version'").fetchone()
+        if row is None or row[0] != self._version:
+            self._connection.execute("DELETE FROM parses")
+            self._connection.execute(
+                "INSERT OR REPLACE INTO meta (key, value) "
+                "VALUES ('version', ?)", (self._version,))
+        self._connection.commit()
+
+    def _remember(self, key: str, parsed) -> None:
+        """
+        internal method to add parsed to the in-memory tier, evicting the
+        least recently used parse when full
+        """
+        self._memory[key] = parsed
+        self._memory.move_to_end(key)
+        if len(self._memory) > self._maxsize:
+            self._memory.popitem(last=False)
+
+    def key(self, line: str) -> str:
+        """
+        returns the key line is cached under, see normalize_line
+        """
+        return normalize_line(line)
+
+    def get(self, line: str):
+        """
+        returns the cached ParsedIngredient for line or None if it has not
+        been parsed
+        """
+        key = normalize_line(line)
+        with self._lock:
+            parsed = self._memory.get(key)
+            if parsed is not None:
+                self._memory.move_to_end(key)
+                self.memoryHits += 1
+                return parsed
+
+            if self._connection is not None:
+                row = self._connection.execute(
+                    "SELECT parsed FROM parses WHERE line = ?",
+                    (key,)).fetchone()
+                if row is not None:
+                    parsed = pickle.loads(row[0])
+                    self._remember(key, parsed)
+                    self.diskHits += 1
+                    return parsed
+
+            self.misses += 1
+            return None
+
+    def put(self, line: str, parsed) -> None:
+        """
+        stores parsed as the result for line in both tiers
+        """
+        key = normalize_line(line)
+        with self._lock:
+            self._remember(key, parsed)
+            if self._connection is not None:
+                self._connection.execute(
+                    "INSERT OR REPLACE INTO parses (line, parsed) "
+                    "VALUES (?, ?)",
+                    (key, pickle.dumps(parsed, pickle.HIGHEST_PROTOCOL)))
+                self._pendingWrites += 1
+                if self._pendingWrites >= self.COMMIT_EVERY:
+                    self._connection.commit()
+                    self._pendingWrites = 0
+
+    def parse(self, line: str):
+        """
+        returns the ParsedIngredient for line, running parse_ingredient on the
+        normalized line only if it is not cached
+        """
+        parsed = self.get(line)
+        if parsed is None:
+            parsed = _load_parser()(normalize_line(line))
+            self.put(line, parsed)
+        return parsed
+
+    def stats(self) -> dict:
+        """
+        returns a dict with the hit and miss counters and the number of
+        parses held in memory
+        """
+        with self._lock:
+            return {'memory_hits': self.memoryHits,
+                    'disk_hits': self.diskHits,
+                    'misses': self.misses,
+                    'memory_size': len(self._memory),
+                    'version': self._version}
+
+    def flush(self) -> None:
+        """
+        commits pending writes to the on-disk tier
+        """
+        with self._lock:
+            if self._connection is not None and self._pendingWrites:
+                self._connection.commit()
+                self._pendingWrites = 0
+
+    def clear(self) -> None:
+        """
+        removes every parse from both tiers and resets the counters
+        """
+        with self._lock:
+            self._memory.clear()
+            if self._connection is not None:
+                self._connection.execute("DELETE FROM parses")
+                self._connection.commit()
+                self._pendingWrites = 0
+            self.memoryHits = 0
+            self.diskHits = 0
+            self.misses = 0
+
+    def close(self) -> None:
+        """
+        commits pending writes and closes the on-disk tier
+        """
+        self.flush()
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+    def __len__(self) -> int:
+        return len(self._memory)
+
+
+_sharedCache = None
+
+def get_parse_cache() -> ParseCache:
+    """
+    returns the process-wide ParseCache. Its on-disk tier is the file named by
+    the RECIPE_PARSE_CACHE environment variable, if set
+    """
+    global _sharedCache
+    if _sharedCache is None:
+        _sharedCache = ParseCache(os.environ.get(CACHE_PATH_ENV))
+        atexit.register(_sharedCache.close)
+    return _sharedCache
@@ -0,0 +1,287 @@
+"""
+long-lived pool of warm ingredient parser processes
+
+loading the CRF model and the NLTK tagger takes most of a second, so a pool
+made for one batch of lines spends more time loading than parsing when the
+batch is small. A ParserPool starts its worker processes once: each one
+loads the parser and parses a sample line before taking any work, then takes
+batches of lines from the pool's task queue for as long as the pool lives.
+Workers are replaced after a number of batches so memory held by a long run
+stays bounded. The latency of a small request is then the parse itself.
+
+    with ParserPool(workers=4) as pool:
+        pool.wait_ready()
+        parsed = pool.parse(['1 cup flour', '2 large eggs'])
+"""
+import os
+import atexit
+import threading
+
+from batch_parser import WARM_UP_LINE, _load_parser
+
+# batches a worker process parses before it is replaced by a fresh one
+MAX_TASKS_PER_CHILD = 1000
+
+# most lines sent to a worker in one batch
+MAX_BATCH = 256
+
+# state of the worker process, set by _init_worker
+_parse = None
+_initError = None
+
+def _init_worker(loader, started, ready, warmUpLine: str) -> None:
+    """
+    internal function run once in each worker process, loads the parser with
+    loader and warms it up with a parse of warmUpLine, then counts the
+    worker in the shared started value and notifies ready. A failure is kept
+    and raised by every batch of the worker, so a missing model fails the
+    request instead of restarting workers forever
+    """
+    global _parse, _initError
+    try:
+        parse = loader()
+        parse(warmUpLine)
+    except Exception as e:
+        _parse, _initError = None, e
+    else:
+        _parse, _initError = parse, None
+    with ready:
+        started.value += 1
+        ready.notify_all()
+
+def _parse_batch(lines: list) -> list:
+    """
+    internal function that parses a batch of lines in a worker process
+    """
+    if _initError is not None:
+        raise _initError
+    return [_parse(line) for line in lines]
+
+
+class _PendingParse:
+    """
+    result of ParserPool.parse_async, get returns the parsed lines in order
+    """
+
+    def __init__(self, result):
+        self._result = result
+
+    def ready(self) -> bool:
+        return self._result.ready()
+
+    def get(self, timeout: float | None = None) -> list:
+        """
+        returns the parsed lines, waiting at most timeout seconds
+
+        Raises:
+            multiprocessing.TimeoutError:
+                if the lines are not parsed within timeout
+        """
+        return [parsed for batch in self._result.get(timeout)
+                for parsed in batch]
+
+
+class ParserPool:
+    """
+    pool of worker processes that each load the ingredient parser once
+    """
+
+    def __init__(self, workers: int | None = None,
+                 maxTasksPerChild: int | None = MAX_TASKS_PER_CHILD,
+                 loader=_load_parser, warmUpLine: str = WARM_UP_LINE,
+                 startMethod: str | None = None):
+        """
+        constructor class, the worker processes start loading right away
+
+        Parameters:
+            workers: int or None:
+                number of worker processes, defaults to the number of cpus
+
+            maxTasksPerChild: int or None:
+                batches a worker parses before it is replaced, None to keep
+                workers for the life of the pool
+
+            loader: callable:
+                module level function returning the parse function, called
+                once in each worker
+
+            warmUpLine: str:
+                line parsed by each worker before it takes any work
+
+            startMethod: str or None:
+                multiprocessing start method, None for 'forkserver' where
+                there is one and 'spawn' otherwise. Replacement workers are
+                started while the pool's threads run, which fork is not
+                safe for
+
+        Raises:
+            TypeError:
+                if workers or maxTasksPerChild is not an int
+            ValueError:
+                if workers or maxTasksPerChild is less than 1
+        """
+        if workers is None:
+            workers = os.cpu_count() or 1
+        for label, value in (('workers', workers),
+                             ('maxTasksPerChild', maxTasksPerChild)):
+            if value is None:
+                continue
+            if not isinstance(value, int) or isinstance(value, bool):
+                raise TypeError(f"{label} must be an int but is a {type(value)}")
+            if value < 1:
+                raise ValueError(f"{label} must be at least 1 but is {value}")
+
+        # multiprocessing is only imported once a pool is actually needed
+        import multiprocessing
+        if startMethod is None:
+            startMethod = ('forkserver' if 'forkserver'
+                           in multiprocessing.get_all_start_methods()
+                           else 'spawn')
+        context = multiprocessing.get_context(startMethod)
+        self._workers = workers
+        self._maxTasksPerChild = maxTasksPerChild
+        # workers started so far, a replacement worker adds one instead of
+        # leaving a report nobody may read
+        self._started = context.Value('i', 0)
+        self._ready = context.Condition(self._started.get_lock())
+        self._tasks = 0
+        self._lines = 0
+        self._lock = threading.Lock()
+        self._pool = context.Pool(workers, initializer=_init_worker,
+                                  initargs=(loader, self._started, self._ready,
+                                            warmUpLine),
+                                  maxtasksperchild=maxTasksPerChild)
+        self._closed = False
+
+    def workers(self) -> int:
+        return self._workers
+
+    def wait_ready(self, count: int | None = None,
+                   timeout: float | None = None) -> bool:
+        """
+        waits until count workers, all of them by default, have loaded and
+        warmed up the parser since the pool started, replacements included.
+        Returns False if that did not happen within timeout seconds
+        """
+        if count is None:
+            count = self._workers
+        started = self._started
+        with self._ready:
+            return self._ready.wait_for(lambda: started.value >= count,
+                                        timeout)
+
+    def _batches(self, lines: list, chunksize: int | None) -> list:
+        """
+        internal method that splits lines into batches, by default about four
+        per worker and at most MAX_BATCH lines each
+        """
+        if chunksize is None:
+            chunksize = min(MAX_BATCH,
+                            max(1, -(-len(lines) // (self._workers * 4))))
+        return [lines[start:start + chunksize]
+                for start in range(0, len(lines), chunksize)]
+
+    def parse_async(self, lines, chunksize: int | None = None) -> _PendingParse:
+        """
+        sends lines to the workers in batches of chunksize lines and returns
+        straight away, see _PendingParse.get for the parsed lines
+
+        Raises:
+            TypeError:
+                if a line is not a str
+            ValueError:
+                if the pool is closed or chunksize is less than 1
+        """
+        lines = list(lines)
+        for line in lines:
+            if not isinstance(line, str):
+                raise TypeError(f"each line must be a str but is a {type(line)}")
+        if chunksize is not None and chunksize < 1:
+            raise ValueError(f"chunksize must be at least 1 but is {chunksize}")
+        if self._closed:
+            raise ValueError("the parser pool is closed")
+        batches = self._batches(lines, chunksize)
+        with self._lock:
+            self._tasks += len(batches)
+            self._lines += len(lines)
+        return _PendingParse(self._pool.map_async(_parse_batch, batches,
+                                                  chunksize=1))
+
+    def parse(self, lines, chunksize: int | None = None) -> list:
+        """
+        returns the ParsedIngredient of every line of lines, in order, see
+        parse_async
+        """
+        return self.parse_async(lines, chunksize).get()
+
+    def stats(self) -> dict:
+        """
+        returns the number of workers, the workers started so far including
+        replacements, and the batches and lines sent
+        """
+        started = self._started.value
+        with self._lock:
+            return {'workers': self._workers, 'started': started,
+                    'tasks': self._tasks, 'lines': self._lines,
+                    'maxTasksPerChild': self._maxTasksPerChild}
+
+    def close(self) -> None:
+        """
+        lets the workers finish the batches already sent, then ends them
+        """
+        if not self._closed:
+            self._closed = True
+            self._pool.close()
+            self._pool.join()
+
+    def terminate(self) -> None:
+        """
+        ends the workers straight away, batches not parsed yet are lost
+        """
+        self._closed = True
+        self._pool.terminate()
+        self._pool.join()
+
+    def is_closed(self) -> bool:
+        return self._closed
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *excInfo):
+        self.close()
+        return False
+
+_sharedLock = threading.Lock()
+# number of workers -> process-wide ParserPool
+_sharedPools = {}
+_closeRegistered = False
+
+def get_parser_pool(workers: int | None = None) -> ParserPool:
+    """
+    returns the process-wide ParserPool of workers processes, started on
+    first use and kept until the process exits. Each number of workers gets
+    its own pool, so a caller asking for another size never closes a pool
+    that another thread is parsing with
+    """
+    global _closeRegistered
+    if workers is None:
+        workers = os.cpu_count() or 1
+    with _sharedLock:
+        pool = _sharedPools.get(workers)
+        if pool is None:
+            if not _closeRegistered:
+                atexit.register(close_parser_pool)
+                _closeRegistered = True
+            pool = _sharedPools[workers] = ParserPool(workers)
+        return pool
+
+def close_parser_pool() -> None:
+    """
+    closes every process-wide ParserPool that was started
+    """
+    with _sharedLock:
+        pools = list(_sharedPools.values())
+        _sharedPools.clear()
+    for pool in pools:
+        pool.close()
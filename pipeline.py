@@ -0,0 +1,550 @@
+"""
+streaming scrape -> parse -> normalize -> store pipeline
+
+a Pipeline is a chain of stages connected by bounded queues. Each stage
+takes items from its queue, applies its function and puts the result on the
+next stage's queue, so a whole site's recipe index flows through without
+being held in lists. A full queue blocks the stage feeding it, which stops
+fast fetchers from flooding memory while parsing catches up (backpressure).
+
+network-bound stages run on threads, CPU-bound stages on a process pool, and
+the last stage may run inline in the thread reading the results, which is
+where a RecipeStore must run as its SQLite connection belongs to that
+thread. Every stage keeps its own throughput stats and stop() ends the run
+gracefully: no new source items are read and the ones in flight finish.
+
+    with RecipeFetcher(cache=cache) as fetcher, RecipeStore(path) as store:
+        pipeline = recipe_pipeline(fetcher, store)
+        for recipeId in pipeline.run(urls):
+            ...
+        print(pipeline.stats())
+"""
+import queue
+import threading
+import time
+
+THREAD = 'thread'
+PROCESS = 'process'
+INLINE = 'inline'
+KINDS = (THREAD, PROCESS, INLINE)
+
+# items a stage's queue holds before the stage feeding it blocks
+DEFAULT_QUEUE_SIZE = 64
+
+# seconds a process stage waits for a new item before collecting the results
+# of the items it has in flight
+POLL_INTERVAL = 0.05
+
+# marks the end of the stream on a queue
+_END = object()
+
+def _call(function, item) -> tuple:
+    """
+    internal function that returns (result, seconds, error) of function(item),
+    error is a description of the exception raised or None. Module level so
+    process stages can pickle it
+    """
+    start = time.perf_counter()
+    try:
+        result = function(item)
+    except Exception as e:
+        return None, time.perf_counter() - start, f"{type(e).__name__}: {e}"
+    return result, time.perf_counter() - start, None
+
+
+class Stage:
+    """
+    one step of a Pipeline
+
+    function is called with each item and returns the item for the next
+    stage, or None to drop it, such as a page that failed to fetch. An item
+    whose function raises is counted as an error and dropped so one bad page
+    does not end a long run
+    """
+
+    def __init__(self, name: str, function, kind: str = THREAD,
+                 workers: int = 1, queueSize: int | None = None,
+                 initializer=None):
+        """
+        constructor class
+
+        Parameters:
+            name: str:
+                name of the stage in the stats
+
+            function: callable:
+                called with each item, must be picklable for a process stage
+
+            kind: str:
+                'thread' for network-bound work, 'process' for CPU-bound work
+                in a pool of worker processes, 'inline' to run in the thread
+                reading the results of Pipeline.run, only for the last stage
+
+            workers: int:
+                number of threads or processes, an inline stage has one
+
+            queueSize: int or None:
+                size of the queue feeding this stage, None for the size of the
+                pipeline
+
+            initializer: callable or None:
+                run once in each worker process of a process stage, such as
+                loading a parser model
+
+        Raises:
+            TypeError:
+                if name is not a str or workers is not an int
+            ValueError:
+                if kind is not a correct value or workers or queueSize is less
+                than 1
+        """
+        if not isinstance(name, str):
+            raise TypeError(f"name must be a str but is a {type(name)}")
+        if kind not in KINDS:
+            raise ValueError(f"kind must be 'thread', 'process' or 'inline' "
+                             f"but is {kind}")
+        for label, value in (('workers', workers), ('queueSize', queueSize)):
+            if value is None:
+                continue
+            if not isinstance(value, int) or isinstance(value, bool):
+                raise TypeError(f"{label} must be an int but is a {type(value)}")
+            if value < 1:
+                raise ValueError(f"{label} must be at least 1 but is {value}")
+        self.name = name
+        self.function = function
+        self.kind = kind
+        self.workers = 1 if kind == INLINE else workers
+        self.queueSize = queueSize
+        self.initializer = initializer
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self) -> None:
+        """
+        internal method that clears the stats before a run
+        """
+        self._received = 0
+        self._sent = 0
+        self._dropped = 0
+        self._errors = 0
+        self._lastError = None
+        self._busy = 0.0
+        self._blocked = 0.0
+        self._started = None
+        self._finished = None
+        self._peakQueued = 0
+        self._inbox = None
+
+    def _record(self, seconds: float, error: str | None, dropped: bool) -> None:
+        """
+        internal method that counts one handled item
+        """
+        with self._lock:
+            self._received += 1
+            self._busy += seconds
+            if error is not None:
+                self._errors += 1
+                self._lastError = error
+            elif dropped:
+                self._dropped += 1
+
+    def _put(self, outbox: queue.Queue, item) -> None:
+        """
+        internal method that puts item on the next stage's queue, timing how
+        long a full queue holds this stage back
+        """
+        start = time.perf_counter()
+        outbox.put(item)
+        with self._lock:
+            self._sent += 1
+            self._blocked += time.perf_counter() - start
+            size = outbox.qsize()
+            if size > self._peakQueued:
+                self._peakQueued = size
+
+    def stats(self) -> dict:
+        """
+        returns a dict of the stage's counts and timings so far:
+            received, sent, dropped and errors: numbers of items
+            busy: seconds spent in function, summed over the workers
+            blocked: seconds spent waiting on a full next queue
+            elapsed: seconds since the run started, until the stage finished
+            throughput: items sent per elapsed second
+            queued: items waiting in this stage's queue
+            peakQueued: most items seen waiting in the next stage's queue
+            lastError: description of the last exception raised, or None
+        """
+        with self._lock:
+            if self._started is None:
+                elapsed = 0.0
+            else:
+                end = (self._finished if self._finished is not None
+                       else time.monotonic())
+                elapsed = end - self._started
+            return {'kind': self.kind, 'workers': self.workers,
+                    'received': self._received, 'sent': self._sent,
+                    'dropped': self._dropped, 'errors': self._errors,
+                    'busy': self._busy, 'blocked': self._blocked,
+                    'elapsed': elapsed,
+                    'throughput': self._sent / elapsed if elapsed else 0.0,
+                    'queued': 0 if self._inbox is None else self._inbox.qsize(),
+                    'peakQueued': self._peakQueued,
+                    'lastError': self._lastError}
+
+
+class Pipeline:
+    """
+    chain of stages connected by bounded queues, see the module docstring
+    """
+
+    def __init__(self, stages: list, queueSize: int = DEFAULT_QUEUE_SIZE):
+        """
+        constructor class
+
+        Parameters:
+            stages: list of Stage:
+                the stages in order, each takes the results of the one before
+
+            queueSize: int:
+                default size of the queue feeding each stage, a full queue
+                blocks the stage before it
+
+        Raises:
+            TypeError:
+                if stages contains something other than a Stage
+            ValueError:
+                if stages is empty, names repeat or an inline stage is not
+                the last one
+        """
+        stages = list(stages)
+        if not stages:
+            raise ValueError("a pipeline needs at least one stage")
+        for stage in stages:
+            if not isinstance(stage, Stage):
+                raise TypeError(f"stages must only contain Stage objects but "
+                                f"contains a {type(stage)}")
+        if len({stage.name for stage in stages}) != len(stages):
+            raise ValueError("stage names must be unique")
+        if any(stage.kind == INLINE for stage in stages[:-1]):
+            raise ValueError("only the last stage can be inline")
+        if queueSize < 1:
+            raise ValueError(f"queueSize must be at least 1 but is {queueSize}")
+        self._stages = stages
+        self._queueSize = queueSize
+        self._stopping = threading.Event()
+        self._threads = []
+        self._sourceError = None
+        self._stageError = None
+        self._running = False
+
+    def stages(self) -> list:
+        return list(self._stages)
+
+    def stop(self) -> None:
+        """
+        ends the run gracefully: no more items are read from the source and
+        the items already read finish every stage. Safe to call from another
+        thread or a signal handler
+        """
+        self._stopping.set()
+
+    def is_stopping(self) -> bool:
+        return self._stopping.is_set()
+
+    def stats(self) -> dict:
+        """
+        returns a dict of stage name -> Stage.stats in stage order
+        """
+        return {stage.name: stage.stats() for stage in self._stages}
+
+    def _start(self, thread) -> None:
+        self._threads.append(thread)
+        thread.start()
+
+    def _feed(self, source, outbox: queue.Queue) -> None:
+        """
+        internal method run on its own thread that puts the source items on
+        the first queue until the source ends or the pipeline stops. None
+        items are skipped as a stage returning None drops its item
+        """
+        try:
+            for item in source:
+                if self._stopping.is_set():
+                    break
+                if item is not None:
+                    outbox.put(item)
+        except Exception as e:
+            self._sourceError = e
+        finally:
+            outbox.put(_END)
+
+    def _run_threads(self, stage: Stage, inbox: queue.Queue,
+                     outbox: queue.Queue) -> None:
+        """
+        internal method that starts the worker threads of a thread stage. The
+        worker that takes _END puts it back for the others and the last one to
+        finish passes it on
+        """
+        remaining = [stage.workers]
+
+        def work():
+            while True:
+                item = inbox.get()
+                if item is _END:
+                    inbox.put(_END)
+                    break
+                result, seconds, error = _call(stage.function, item)
+                stage._record(seconds, error, result is None)
+                if result is not None:
+                    stage._put(outbox, result)
+            with stage._lock:
+                remaining[0] -= 1
+                last = remaining[0] == 0
+                if last:
+                    stage._finished = time.monotonic()
+            if last:
+                outbox.put(_END)
+
+        for number in range(stage.workers):
+            self._start(threading.Thread(target=work, daemon=True,
+                                         name=f'{stage.name}-{number}'))
+
+    def _run_processes(self, stage: Stage, inbox: queue.Queue,
+                       outbox: queue.Queue) -> None:
+        """
+        internal method that starts the thread feeding a process stage's
+        pool. At most twice the number of workers items are in flight so the
+        pool never holds more than the queues allow. Workers are spawned
+        rather than forked as the other stages' threads are running
+        """
+        def dispatch():
+            # multiprocessing is only imported once a pool is actually needed
+            import multiprocessing
+            from concurrent.futures import (ProcessPoolExecutor, wait,
+                                            FIRST_COMPLETED)
+
+            def collect(done):
+                for future in done:
+                    result, seconds, error = future.result()
+                    stage._record(seconds, error, result is None)
+                    if result is not None:
+                        stage._put(outbox, result)
+
+            context = multiprocessing.get_context('spawn')
+            pending = set()
+            ended = False
+            try:
+                with ProcessPoolExecutor(
+                        max_workers=stage.workers, mp_context=context,
+                        initializer=stage.initializer) as executor:
+                    while not ended:
+                        try:
+                            item = inbox.get(timeout=POLL_INTERVAL if pending
+                                             else None)
+                        except queue.Empty:
+                            item = None
+                        if item is _END:
+                            ended = True
+                        elif item is not None:
+                            pending.add(executor.submit(_call, stage.function,
+                                                        item))
+                        if len(pending) >= stage.workers * 2:
+                            done, pending = wait(pending,
+                                                 return_when=FIRST_COMPLETED)
+                        else:
+                            done = {future for future in pending
+                                    if future.done()}
+                            pending -= done
+                        collect(done)
+                    done, pending = wait(pending)
+                    collect(done)
+            except Exception as e:
+                # the pool itself broke, such as a failing initializer, a
+                # worker that died or a result that cannot be pickled, so the
+                # run stops and run raises e once the stream has drained
+                with stage._lock:
+                    stage._lastError = f"{type(e).__name__}: {e}"
+                self._stageError = e
+                self.stop()
+                # the stages before keep sending until their end, take it all
+                # so none of them blocks on a full queue
+                if not ended:
+                    while inbox.get() is not _END:
+                        pass
+            finally:
+                with stage._lock:
+                    stage._finished = time.monotonic()
+                outbox.put(_END)
+
+        self._start(threading.Thread(target=dispatch, daemon=True,
+                                     name=f'{stage.name}-dispatch'))
+
+    def run(self, source):
+        """
+        generator that streams the items of source through every stage and
+        yields the results of the last stage as they arrive. If the caller
+        stops iterating early the pipeline is stopped and drained before the
+        generator closes
+
+        Raises:
+            RuntimeError:
+                if the pipeline is already running
+            Exception:
+                the exception raised by source, once the items read before it
+                have finished, or the exception that broke the worker pool of
+                a process stage, such as a failing initializer
+        """
+        if self._running:
+            raise RuntimeError("the pipeline is already running")
+        self._running = True
+        self._stopping.clear()
+        self._sourceError = None
+        self._stageError = None
+        self._threads = []
+
+        started = time.monotonic()
+        queues = []
+        for stage in self._stages:
+            stage._reset()
+            stage._started = started
+            stage._inbox = queue.Queue(stage.queueSize or self._queueSize)
+            queues.append(stage._inbox)
+        # results of the last stage, not used if it is inline
+        results = queue.Queue(self._queueSize)
+        outboxes = queues[1:] + [results]
+
+        self._start(threading.Thread(target=self._feed, daemon=True,
+                                     args=(source, queues[0]),
+                                     name='pipeline-source'))
+        for stage, inbox, outbox in zip(self._stages, queues, outboxes):
+            if stage.kind == THREAD:
+                self._run_threads(stage, inbox, outbox)
+            elif stage.kind == PROCESS:
+                self._run_processes(stage, inbox, outbox)
+
+        last = self._stages[-1]
+        inbox = queues[-1] if last.kind == INLINE else results
+        item = None
+        try:
+            while True:
+                item = inbox.get()
+                if item is _END:
+                    break
+                if last.kind != INLINE:
+                    yield item
+                    continue
+                result, seconds, error = _call(last.function, item)
+                last._record(seconds, error, result is None)
+                if result is not None:
+                    with last._lock:
+                        last._sent += 1
+                    yield result
+        finally:
+            if item is not _END:
+                # closed early, let the items in flight drain
+                self.stop()
+                while inbox.get() is not _END:
+                    pass
+            if last.kind == INLINE:
+                with last._lock:
+                    last._finished = time.monotonic()
+            for thread in self._threads:
+                thread.join()
+            self._running = False
+        if self._sourceError is not None:
+            raise self._sourceError
+        if self._stageError is not None:
+            raise self._stageError
+
+    def run_all(self, source) -> dict:
+        """
+        runs source through the pipeline, discarding the results, and returns
+        the stats
+        """
+        for _ in self.run(source):
+            pass
+        return self.stats()
+
+def _fetch_page(fetcher, url: str):
+    """
+    internal function that returns the FetchResult of url, or None if the
+    fetch failed
+    """
+    result = fetcher.fetch(url)
+    return result if result.ok() else None
+
+def scrape_page(result, supportedOnly: bool = False) -> tuple:
+    """
+    returns (title, source, ingredientList, steps) of the recipe on a fetched
+    page, read with recipe_scrapers, in the order Recipe takes them
+    """
+    from recipe_scrapers import scrape_html
+    scraper = scrape_html(html=result.text, org_url=result.url,
+                          supported_only=supportedOnly)
+    return (scraper.title(), result.url, list(scraper.ingredients()),
+            scraper.instructions())
+
+def parse_recipe_lines(recipe: tuple) -> tuple:
+    """
+    returns (recipe, parsed) with the ParsedIngredient of every ingredient
+    line of a (title, source, ingredientList, steps) recipe. Runs in the
+    worker processes of the parse stage
+    """
+    from batch_parser import _load_parser
+    parse_ingredient = _load_parser()
+    return recipe, [parse_ingredient(line) for line in recipe[2]]
+
+def build_recipe(parsedRecipe: tuple) -> tuple:
+    """
+    returns (content hash, Recipe) built from the lines parsed by
+    parse_recipe_lines, keeping the parses in the shared parse cache. Raises
+    ValueError if a line has no quantity or name
+    """
+    from parse_cache import get_parse_cache
+    from recipe_class import Recipe
+    from recipe_store import content_hash
+
+    (title, source, ingredientList, steps), parsedLines = parsedRecipe
+    cache = get_parse_cache()
+    recipe = Recipe(title, source, [], steps)
+    for line, parsed in zip(ingredientList, parsedLines):
+        cache.put(line, parsed)
+        recipe._add_parsed_ingredient(line, parsed)
+    return content_hash(title, source, ingredientList, steps), recipe
+
+def recipe_pipeline(fetcher, store, fetchWorkers: int = 8,
+                    parseWorkers: int | None = None,
+                    queueSize: int = DEFAULT_QUEUE_SIZE) -> Pipeline:
+    """
+    returns the Pipeline that fetches recipe urls with fetcher, scrapes the
+    pages, parses the ingredient lines in worker processes, builds the
+    normalized Recipe objects and adds them to store. Running it on urls
+    yields the id of each stored recipe, recipes already stored are dropped
+
+    Parameters:
+        fetcher: RecipeFetcher:
+            fetcher of the pages, its per host limits still apply
+
+        store: RecipeStore:
+            store the recipes are added to, in the thread running the pipeline
+
+        fetchWorkers: int:
+            number of threads fetching pages
+
+        parseWorkers: int or None:
+            number of parser processes, defaults to the number of cpus
+    """
+    import os
+    from functools import partial
+    from batch_parser import _init_worker
+
+    if parseWorkers is None:
+        parseWorkers = os.cpu_count() or 1
+    return Pipeline([
+        Stage('fetch', partial(_fetch_page, fetcher), THREAD, fetchWorkers),
+        Stage('scrape', scrape_page, THREAD),
+        Stage('parse', parse_recipe_lines, PROCESS, parseWorkers,
+              initializer=_init_worker),
+        Stage('normalize', build_recipe, THREAD),
+        Stage('store', lambda built: store.add(built[1], built[0]), INLINE),
+    ], queueSize)
@@ -0,0 +1,206 @@
+import fractions
+from functools import lru_cache
+
+Fraction = fractions.Fraction
+
+# cups in one of each kitchen unit
+KITCHEN_TO_CUP = {'cup': Fraction(1),
+                  'tablespoon': Fraction(1, 16),
+                  'teaspoon': Fraction(1, 48)}
+KITCHEN_TO_CUP_FLOAT = {unit: float(factor)
+                        for unit, factor in KITCHEN_TO_CUP.items()}
+
+# metric unit -> (base unit, multiplier into the base unit)
+METRIC_TO_BASE = {'g': ('g', 1), 'ml': ('ml', 1),
+                  'kg': ('g', 1000), 'l': ('ml', 1000)}
+
+# kitchen amounts below a quarter cup are given in tablespoons, and below
+# half a tablespoon in teaspoons
+QUARTER_CUP = Fraction(1, 4)
+HALF_TABLESPOON = Fraction(1, 32)
+
+UNICODE_FRACTIONS = {'¼': Fraction(1, 4), '½': Fraction(1, 2),
+                     '¾': Fraction(3, 4), '⅓': Fraction(1, 3),
+                     '⅔': Fraction(2, 3), '⅛': Fraction(1, 8),
+                     '⅜': Fraction(3, 8)}
+
+# amounts repeat constantly across a corpus, so conversions of the same
+# value are cached instead of re-parsing a decimal string each time
+CACHE_SIZE = 4096
+
+@lru_cache(maxsize=CACHE_SIZE)
+def _float_to_fraction(value: float) -> Fraction:
+    """
+    internal function that returns the Fraction of the shortest decimal
+    representation of value, so 0.545 is 545/1000 and not the binary
+    approximation of 0.545
+    """
+    if value.is_integer():
+        return Fraction(int(value))
+    return Fraction(repr(value))
+
+@lru_cache(maxsize=CACHE_SIZE)
+def _str_to_fraction(value: str) -> Fraction:
+    """
+    internal function that returns the Fraction of a decimal str
+
+    Raises:
+        ValueError:
+            if value does not represent an int or float
+    """
+    try:
+        float(value)
+        return Fraction(value.strip())
+    except ValueError:
+        raise ValueError(f"value: {(value)} be a str that represents a "
+                         f"int or float")
+
+def to_fraction(value: str | int | float | Fraction) -> Fraction:
+    """
+    converts value into a Fraction object. Floats and str are converted from
+    their decimal form
+
+    Precondition:
+        value must be the correct type
+
+    Raises:
+        TypeError:
+            if value not the correct type
+        ValueError:
+            if value is a str that does not represent an int or float
+    """
+    if isinstance(value, Fraction):
+        return value
+    if isinstance(value, int):
+        return Fraction(value)
+    if isinstance(value, float):
+        return _float_to_fraction(value)
+    if isinstance(value, str):
+        return _str_to_fraction(value)
+    raise TypeError(f"value must be a str that can be converted to an "
+                    f"int or float or an int or float")
+
+def parse_amount(amount: str | int | float | Fraction) -> Fraction:
+    """
+    converts an ingredient amount into a Fraction, also accepting a single
+    unicode fraction character such as '½'
+
+    Raises:
+        TypeError:
+            if amount is not a correct type
+        ValueError:
+            if amount is not a recognized amount
+    """
+    if isinstance(amount, str):
+        unicodeAmount = UNICODE_FRACTIONS.get(amount)
+        if unicodeAmount is not None:
+            return unicodeAmount
+        try:
+            return _str_to_fraction(amount)
+        except ValueError:
+            raise ValueError(f"{amount} is not a recognized ingredient "
+                             "amount")
+    if not isinstance(amount, (int, float, Fraction)):
+        raise TypeError("amount must be a float, int, or unicode character"
+                        f" of a fraction but is a {type(amount)}")
+    return to_fraction(amount)
+
+def metric_to_base(amount: Fraction, measure: str) -> tuple:
+    """
+    returns (amount, measure) with kg and l converted to g and ml
+    """
+    baseMeasure, factor = METRIC_TO_BASE[measure]
+    if factor == 1:
+        return amount, baseMeasure
+    return amount * factor, baseMeasure
+
+def kitchen_to_metric(amount: Fraction, measure: str, density: int) -> Fraction:
+    """
+    returns the exact metric amount of amount of a kitchen measure for an
+    ingredient with density in g/cup
+
+    Raises:
+        KeyError:
+            if measure is not 'cup', 'tablespoon' or 'teaspoon'
+    """
+    return amount * density * KITCHEN_TO_CUP[measure]
+
+def metric_to_kitchen(amount: Fraction, density: int) -> tuple:
+    """
+    returns (amount, measure) in cups, tablespoons or teaspoons for a metric
+    amount of an ingredient with density in g/cup. Amounts of a quarter cup
+    or more are given in cups and amounts of half a tablespoon or more in
+    tablespoons
+    """
+    cups = Fraction(amount) / density
+    if cups >= QUARTER_CUP:
+        return cups, 'cup'
+    elif cups >= HALF_TABLESPOON:
+        return cups * 16, 'tablespoon'
+    return cups * 48, 'teaspoon'
+
+def kitchen_to_metric_float(amount: float, measure: str,
+                            density: float) -> float:
+    """
+    float version of kitchen_to_metric for bulk numeric work where an exact
+    rational result is not needed
+    """
+    return amount * density * KITCHEN_TO_CUP_FLOAT[measure]
+
+# US customary cup in ml, the definition Pint uses
+CUP_IN_ML = Fraction('236.5882365')
+
+# unit name -> (dimension, factor), mass factors are in grams and volume
+# factors in cups so the g/cup densities apply directly. Names cover the
+# measures Ingredient accepts, the unit names the parser emits and common
+# abbreviations, anything else is left to Pint
+UNIT_TABLE = {
+    'cup': ('volume', Fraction(1)),
+    'tablespoon': ('volume', Fraction(1, 16)),
+    'tbsp': ('volume', Fraction(1, 16)),
+    'tb': ('volume', Fraction(1, 16)),
+    'teaspoon': ('volume', Fraction(1, 48)),
+    'tsp': ('volume', Fraction(1, 48)),
+    'fluid_ounce': ('volume', Fraction(1, 8)),
+    'fl oz': ('volume', Fraction(1, 8)),
+    'pint': ('volume', Fraction(2)),
+    'quart': ('volume', Fraction(4)),
+    'gallon': ('volume', Fraction(16)),
+    'milliliter': ('volume', 1 / CUP_IN_ML),
+    'ml': ('volume', 1 / CUP_IN_ML),
+    'liter': ('volume', 1000 / CUP_IN_ML),
+    'l': ('volume', 1000 / CUP_IN_ML),
+    'gram': ('mass', Fraction(1)),
+    'g': ('mass', Fraction(1)),
+    'kilogram': ('mass', Fraction(1000)),
+    'kg': ('mass', Fraction(1000)),
+    'milligram': ('mass', Fraction(1, 1000)),
+    'mg': ('mass', Fraction(1, 1000)),
+    'ounce': ('mass', Fraction('28.349523125')),
+    'oz': ('mass', Fraction('28.349523125')),
+    'pound': ('mass', Fraction('453.59237')),
+    'lb': ('mass', Fraction('453.59237')),
+}
+
+def lookup_unit(unit: str) -> tuple | None:
+    """
+    returns the (dimension, factor) entry of UNIT_TABLE for unit, or None if
+    the unit is not in the table
+    """
+    entry = UNIT_TABLE.get(unit)
+    if entry is None:
+        entry = UNIT_TABLE.get(unit.lower())
+    return entry
+
+def to_grams(amount: Fraction, unit: str, density: int) -> Fraction | None:
+    """
+    returns the exact mass in grams of amount of unit, using density in g/cup
+    for volumes. Returns None if the unit is not in UNIT_TABLE
+    """
+    entry = lookup_unit(unit)
+    if entry is None:
+        return None
+    dimension, factor = entry
+    if dimension == 'mass':
+        return amount * factor
+    return amount * factor * density
@@ -1,52 +1,412 @@
-import os
-import nltk
-from ingredient_class import *
-
-project_root = os.path.dirname(os.path.abspath(__file__))
-local_nltk_data = os.path.join(project_root, 'nltk_data')
-os.environ['NLTK_DATA'] = local_nltk_data
-nltk.data.path = [local_nltk_data]
+import fractions
+import weakref
 
-def disabled_download(*args, **kwargs):
-    print("NLTK download blocked - using local project data.")
-    return True
-nltk.download = disabled_download
+from ingredient_class import *
+from batch_parser import parse_lines
+from parse_cache import get_parse_cache
+from keyword_index import KeywordIndex
+from compact_ingredient import CompactIngredient
+import instrumentation
 
-from ingredient_parser import parse_ingredient
+# comparisons with other recipes kept by match_ingredients
+MATCH_CACHE_SIZE = 32
 
 class Recipe:
     """
     this is the recipe class
     """
-    def __init__(self, title:str, source:str, ingredientList:list, steps:str):
+    def __init__(self, title:str, source:str, ingredientList:list, steps:str,
+                 servings:int|float|fractions.Fraction|None=None):
+        """
+        constructor class, the ingredient lines are kept as they are and only
+        parsed by the first method that needs the ingredients, see materialize
+
+        Parameters:
+            servings: int, float, Fraction or None:
+                number of servings the recipe yields, None if it is not known
+
+        Raises:
+            TypeError:
+                if ingredientList is not a list or servings is not a number
+            ValueError:
+                if servings is not positive
+        """
+        if not isinstance(ingredientList, list):
+            raise TypeError("ingredientList must be a list but is a "
+                            f"{type(ingredientList)}")
+        self._servings = self._verify_servings(servings)
         self._title = title
         self._source = source
         self._instructions = steps
         self._ingredients = []
         self._optionalIngredients = []
+        self._keywordIndex = None
+        # slot in self._keywordIndex of each ingredient of self._ingredients
+        self._slots = []
+        # bumped by every ingredient edit, invalidates comparisons with this
+        # recipe held by other recipes
+        self._version = 0
+        # (id of other, optimal) -> _MatchEntry
+        self._matchCache = {}
+        # raw lines not parsed yet, None once the ingredients are built
+        self._pendingLines = list(ingredientList) if ingredientList else None
+
+    @classmethod
+    def from_many(cls, recipes, workers: int | None = None,
+                  chunksize: int | None = None) -> list:
+        """
+        builds a Recipe for each (title, source, ingredientList, steps) tuple
+        in recipes. The ingredient lines of every recipe are parsed together
+        across a pool of worker processes with parse_lines
+
+        Parameters:
+            recipes: iterable of tuple:
+                (title, source, ingredientList, steps) for each recipe, in
+                the same order as the arguments of Recipe
+
+            workers: int or None:
+                number of worker processes, see parse_lines
+
+            chunksize: int or None:
+                number of lines sent to a worker at a time, see parse_lines
+
+        Returns:
+            list of Recipe in the same order as recipes. Lines already in the
+            shared parse cache are not parsed again
 
-        self._parse_ingredients(ingredientList)
+        Raises:
+            TypeError:
+                if an ingredientList is not a list
+            ValueError:
+                if an ingredient line has no quantity or name
+        """
+        recipes = list(recipes)
+        lines = []
+        for title, source, ingredientList, steps in recipes:
+            if not isinstance(ingredientList, list):
+                raise TypeError("ingredientList must be a list but is a "
+                                f"{type(ingredientList)}")
+            lines.extend(ingredientList)
+
+        parsedLines = parse_lines(lines, workers=workers, chunksize=chunksize,
+                                  cache=get_parse_cache())
+
+        result = []
+        position = 0
+        for title, source, ingredientList, steps in recipes:
+            recipe = cls(title, source, [], steps)
+            for ingredient in ingredientList:
+                recipe._add_parsed_ingredient(ingredient,
+                                              parsedLines[position])
+                position += 1
+            result.append(recipe)
+        return result
+
+    @classmethod
+    def from_ingredients(cls, title:str, source:str, ingredients:list,
+                         steps:str, optionalIngredients:list|None=None,
+                         servings:int|float|fractions.Fraction|None=None) -> 'Recipe':
+        """
+        builds a Recipe from Ingredient or CompactIngredient objects that are
+        already made, without parsing any ingredient lines
 
+        Raises:
+            TypeError:
+                if ingredients or optionalIngredients contain something other
+                than an Ingredient
+        """
+        if optionalIngredients is None:
+            optionalIngredients = []
+        for ingredient in list(ingredients) + list(optionalIngredients):
+            if not isinstance(ingredient, (Ingredient, CompactIngredient)):
+                raise TypeError("ingredients must only contain Ingredient "
+                                f"objects but contains a {type(ingredient)}")
+        recipe = cls(title, source, [], steps, servings)
+        recipe._ingredients = list(ingredients)
+        recipe._optionalIngredients = list(optionalIngredients)
+        return recipe
+
+    def to_bytes(self) -> bytes:
+        """
+        returns the recipe in the compact binary format of serialization, see
+        encode_recipes to encode many recipes into one buffer
+        """
+        from serialization import encode_recipes
+        return encode_recipes([self])
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> 'Recipe':
+        """
+        returns the Recipe encoded in data by to_bytes
+
+        Raises:
+            ValueError:
+                if data does not hold exactly one recipe
+        """
+        from serialization import decode_recipes
+        recipes = decode_recipes(data)
+        if len(recipes) != 1:
+            raise ValueError("data must hold one recipe but holds "
+                             f"{len(recipes)}")
+        return recipes[0]
+
+    def materialize(self) -> 'Recipe':
+        """
+        parses the ingredient lines of this recipe if they are not parsed yet
+        and returns the recipe. If a line fails to parse no ingredient is
+        added and the same error is raised again by the next call
+
+        Raises:
+            ValueError:
+                if an ingredient line has no quantity or name
+        """
+        if self._pendingLines is not None:
+            ingredientCount = len(self._ingredients)
+            optionalCount = len(self._optionalIngredients)
+            try:
+                self._parse_ingredients(self._pendingLines)
+            except Exception:
+                del self._ingredients[ingredientCount:]
+                del self._optionalIngredients[optionalCount:]
+                raise
+            self._pendingLines = None
+        return self
+
+    @classmethod
+    def materialize_many(cls, recipes, workers: int | None = None,
+                         chunksize: int | None = None) -> list:
+        """
+        parses the pending ingredient lines of every recipe of recipes
+        together with parse_lines, which fills the shared parse cache, then
+        materializes each recipe. Returns the recipes as a list
+
+        Raises:
+            ValueError:
+                if an ingredient line has no quantity or name
+        """
+        recipes = list(recipes)
+        lines = [line for recipe in recipes
+                 if recipe._pendingLines is not None
+                 for line in recipe._pendingLines]
+        if lines:
+            parse_lines(lines, workers=workers, chunksize=chunksize,
+                        cache=get_parse_cache())
+        for recipe in recipes:
+            recipe.materialize()
+        return recipes
+
+    def is_materialized(self) -> bool:
+        """
+        returns True if the ingredient lines of this recipe are parsed
+        """
+        return self._pendingLines is None
+
+    def compact(self) -> 'Recipe':
+        """
+        returns a copy of this recipe whose ingredients are immutable
+        CompactIngredient objects, for holding large corpora in memory
+        """
+        self.materialize()
+        return Recipe.from_ingredients(
+            self._title, self._source,
+            [ingredient.compact() for ingredient in self._ingredients],
+            self._instructions,
+            [ingredient.compact() for ingredient in self._optionalIngredients],
+            self._servings)
+
+    @instrumentation.timed('recipe.parse_ingredients')
     def _parse_ingredients(self, ingredientList:list):
-        if not isinstance(ingredientList, list):
-            raise TypeError("ingredientList must be a list but is a "
-                            f"{type(ingredientList)}")
+        cache = get_parse_cache()
         for ingredient in ingredientList:
-            parsed = parse_ingredient(ingredient)
+            self._add_parsed_ingredient(ingredient, cache.parse(ingredient))
 
-            if parsed.amount:
-                item = parsed.amount[0]
+    def _add_parsed_ingredient(self, ingredient:str, parsed) -> None:
+        """
+        internal method that adds the Ingredient for the ingredient line from
+        its ParsedIngredient
 
-                qty = item.quantity
-                unit = str(item.unit)
-                ingredientName = parsed.name[0].text
-                self._ingredients.append(Ingredient(ingredientName, qty, unit))
-            elif parsed.name:
-                for optionalIngredient in parsed.name: # no qty available
-                    self._optionalIngredients.append(Ingredient(optionalIngredient.text, 0, 0))
+        Raises:
+            ValueError:
+                if the parsed line has no quantity or name
+        """
+        if parsed.amount:
+            self._ingredients.append(self._parsed_ingredient(parsed))
+        elif parsed.name:
+            for optionalIngredient in parsed.name: # no qty available
+                self._optionalIngredients.append(Ingredient(optionalIngredient.text, 0, 0))
 
-            else:
-                raise ValueError(f"No quantity found: {ingredient}")
+        else:
+            raise ValueError(f"No quantity found: {ingredient}")
+
+    @staticmethod
+    def _parsed_ingredient(parsed) -> Ingredient:
+        """
+        internal method that returns the Ingredient of a ParsedIngredient
+        that has a quantity
+        """
+        item = parsed.amount[0]
+        return Ingredient(parsed.name[0].text, item.quantity, str(item.unit))
+
+    def _as_ingredient(self, ingredient):
+        """
+        internal method that returns ingredient if it is an Ingredient, or
+        parses it if it is a raw ingredient line
+
+        Raises:
+            TypeError:
+                if ingredient is not an Ingredient or a str
+            ValueError:
+                if the ingredient line has no quantity
+        """
+        if isinstance(ingredient, (Ingredient, CompactIngredient)):
+            return ingredient
+        if not isinstance(ingredient, str):
+            raise TypeError("ingredient must be an Ingredient or a str but is "
+                            f"a {type(ingredient)}")
+        parsed = get_parse_cache().parse(ingredient)
+        if not parsed.amount or not parsed.name:
+            raise ValueError(f"No quantity found: {ingredient}")
+        return self._parsed_ingredient(parsed)
+
+    def _check_position(self, position: int) -> int:
+        """
+        internal method that returns position as an index of
+        self._ingredients
+
+        Raises:
+            TypeError:
+                if position is not an int
+            IndexError:
+                if there is no ingredient at position
+        """
+        if not isinstance(position, int) or isinstance(position, bool):
+            raise TypeError(f"position must be an int but is a "
+                            f"{type(position)}")
+        if not -len(self._ingredients) <= position < len(self._ingredients):
+            raise IndexError(f"no ingredient at position {position}")
+        return position % len(self._ingredients)
+
+    def _edited(self, position: int) -> None:
+        """
+        internal method run after the ingredient at position changed, so the
+        cached comparisons of this recipe only match again from position on
+        and comparisons held by other recipes are made again
+        """
+        self._version += 1
+        for entry in self._matchCache.values():
+            entry.start = min(entry.start, position)
+            entry.pairs = None
+
+    def add_ingredient(self, ingredient) -> int:
+        """
+        adds ingredient after the other ingredients and returns its position.
+        Only ingredient is parsed and indexed, the other ingredients are kept
+
+        Parameters:
+            ingredient: Ingredient or str:
+                an Ingredient or a raw ingredient line such as '1 cup flour'
+
+        Raises:
+            TypeError:
+                if ingredient is not an Ingredient or a str
+            ValueError:
+                if the ingredient line has no quantity
+        """
+        self.materialize()
+        ingredient = self._as_ingredient(ingredient)
+        self._ingredients.append(ingredient)
+        if self._keywordIndex is not None:
+            self._slots.append(self._keywordIndex.add(ingredient))
+        position = len(self._ingredients) - 1
+        self._edited(position)
+        return position
+
+    def remove_ingredient(self, position: int):
+        """
+        removes the ingredient at position of ingredients() and returns it
+
+        Raises:
+            TypeError:
+                if position is not an int
+            IndexError:
+                if there is no ingredient at position
+        """
+        self.materialize()
+        position = self._check_position(position)
+        ingredient = self._ingredients.pop(position)
+        if self._keywordIndex is not None:
+            self._keywordIndex.remove(self._slots.pop(position))
+        self._edited(position)
+        return ingredient
+
+    def replace_ingredient(self, position: int, ingredient):
+        """
+        puts ingredient at position of ingredients() and returns the
+        ingredient it replaced. Only ingredient is parsed and indexed
+
+        Parameters:
+            ingredient: Ingredient or str:
+                an Ingredient or a raw ingredient line such as '1 cup flour'
+
+        Raises:
+            TypeError:
+                if position is not an int or ingredient is not an Ingredient
+                or a str
+            IndexError:
+                if there is no ingredient at position
+            ValueError:
+                if the ingredient line has no quantity
+        """
+        self.materialize()
+        position = self._check_position(position)
+        ingredient = self._as_ingredient(ingredient)
+        oldIngredient = self._ingredients[position]
+        self._ingredients[position] = ingredient
+        if self._keywordIndex is not None:
+            self._keywordIndex.replace(self._slots[position], ingredient)
+        self._edited(position)
+        return oldIngredient
+
+    @staticmethod
+    def _verify_servings(servings):
+        """
+        internal method that returns servings if it is None or a positive
+        number
+
+        Raises:
+            TypeError:
+                if servings is not an int, float or Fraction
+            ValueError:
+                if servings is not positive
+        """
+        if servings is None:
+            return None
+        if (not isinstance(servings, (int, float, fractions.Fraction))
+                or isinstance(servings, bool)):
+            raise TypeError("servings must be an int, float or Fraction but is "
+                            f"a {type(servings)}")
+        if not servings > 0:
+            raise ValueError(f"servings must be positive but is {servings}")
+        return servings
+
+    def servings(self) -> int | float | fractions.Fraction | None:
+        """
+        getter, returns the number of servings the recipe yields or None if it
+        is not known
+        """
+        return self._servings
+
+    def set_servings(self, servings) -> None:
+        """
+        sets the number of servings the recipe yields, None if it is not known
+
+        Raises:
+            TypeError:
+                if servings is not an int, float or Fraction
+            ValueError:
+                if servings is not positive
+        """
+        self._servings = self._verify_servings(servings)
 
     def title(self) -> str:
         """
@@ -66,10 +426,25 @@ class Recipe:
         """
         return self._instructions
 
+    def ingredients(self) -> list:
+        """
+        getter, returns a list of the ingredients that have a quantity
+        """
+        self.materialize()
+        return list(self._ingredients)
+
+    def optional_ingredients(self) -> list:
+        """
+        getter, returns a list of the ingredients without a quantity
+        """
+        self.materialize()
+        return list(self._optionalIngredients)
+
     def ingredient_str(self) -> str:
         """
         returns a print friendly string representation of the ingredients
         """
+        self.materialize()
         resultStr = ''
 
         if self._ingredients:
@@ -94,13 +469,91 @@ class Recipe:
         return resultStr
 
     def is_empty(self) -> bool:
+        self.materialize()
         return len(self._ingredients) == 0
 
-    def compare_recipe(self, other:Recipe) -> str:
+    def __iter__(self):
+        """
+        iterates over the ingredients that have a quantity, like ingredients
+        """
+        self.materialize()
+        return iter(list(self._ingredients))
+
+    def _keyword_index(self) -> KeywordIndex:
+        """
+        internal method that returns the KeywordIndex of this recipe's
+        ingredients, building it on the first call
+        """
+        if self._keywordIndex is None:
+            self.materialize()
+            self._keywordIndex = KeywordIndex()
+            self._slots = [self._keywordIndex.add(ingredient)
+                           for ingredient in self._ingredients]
+        return self._keywordIndex
+
+    def match_ingredients(self, other:'Recipe', optimal:bool=False) -> list:
+        """
+        pairs each ingredient of this recipe with a same or similar ingredient
+        of other through other's keyword index. Neither recipe is modified.
+        The result is cached until either recipe is edited, after an edit of
+        this recipe only the ingredients from the first edited position on
+        are matched again
+
+        Parameters:
+            other: Recipe:
+                recipe to match against
+
+            optimal: bool:
+                if False each ingredient takes the first similar ingredient of
+                other that is not matched yet. If True the pairs maximise the
+                total number of shared keywords
+
+        Returns:
+            list of (Ingredient or None, Ingredient or None) tuples, with None
+            where an ingredient has no comparable ingredient
+
+        Raises:
+            TypeError:
+                if other is not the correct type
+        """
+        if not isinstance(other, Recipe):
+            raise TypeError("other must be a Recipe object but is a "
+                            f"{type(other)}")
+        self.materialize()
+        index = other._keyword_index()
+        key = (id(other), optimal)
+        entry = self._matchCache.get(key)
+        if (entry is None or entry.other() is not other
+                or entry.otherVersion != other._version):
+            entry = _MatchEntry(other, index.assign(self._ingredients,
+                                                    optimal))
+            self._matchCache.pop(key, None)
+            if len(self._matchCache) >= MATCH_CACHE_SIZE:
+                # drops the oldest comparison
+                del self._matchCache[next(iter(self._matchCache))]
+            self._matchCache[key] = entry
+        elif entry.pairs is None:
+            entry.assigned = index.assign(self._ingredients, optimal,
+                                          entry.assigned, entry.start)
+        if entry.pairs is None:
+            entry.pairs = index.pairs(self._ingredients, entry.assigned)
+            entry.start = len(self._ingredients)
+        return list(entry.pairs)
+
+    @instrumentation.timed('recipe.compare_recipe')
+    def compare_recipe(self, other:'Recipe', optimal:bool=False) -> str:
         """
         compares this recipe with another recipe by finding all same or similar
         ingredients and returning a string with the ingredients for each recipe
 
+        Parameters:
+            other: Recipe:
+                recipe to compare with
+
+            optimal: bool:
+                pair ingredients to maximise the total keyword overlap instead
+                of taking the first similar ingredient, see match_ingredients
+
         Precondition:
             other must be the correct type
 
@@ -118,34 +571,7 @@ class Recipe:
             raise Exception("self and other must contain a list of "
                             "ingredients")
 
-        ingredientPairs = []
-
-        thisRecipe = self._ingredients
-        thisRecipe.reverse() # reverse more efficient to pop from end in loop
-        otherRecipe = other._ingredients
-
-
-        while len(thisRecipe) and len(otherRecipe):
-            thisIngredient = thisRecipe.pop()
-
-            for i in range(len(otherRecipe)):
-                if thisIngredient.compare_ingredient(otherRecipe[i]):
-                    ingredientPairs.append((thisIngredient,
-                                            otherRecipe.pop(i)))
-                    break
-            else:
-                # if no similar ingredient found, add with None, output will
-                # show no comparable ingredient
-                ingredientPairs.append((thisIngredient, None))
-
-        # if either recipe has remaining ingredients add to list
-        while len(thisRecipe):
-            for ingredient in thisRecipe:
-                ingredientPairs.append((ingredient, None))
-
-        while len(otherRecipe):
-            for ingredient in otherRecipe:
-                ingredientPairs.append((None, ingredient))
+        ingredientPairs = self.match_ingredients(other, optimal)
 
         # format output
         resultStr = ''
@@ -164,3 +590,19 @@ class Recipe:
 
         return resultStr
 
+
+class _MatchEntry:
+    """
+    internal cached result of Recipe.match_ingredients with one other recipe
+    """
+    __slots__ = ('other', 'otherVersion', 'assigned', 'pairs', 'start')
+
+    def __init__(self, other: Recipe, assigned: dict):
+        self.other = weakref.ref(other)
+        self.otherVersion = other._version
+        self.assigned = assigned
+        # None once the recipe is edited, until it is matched again
+        self.pairs = None
+        # first position of the recipe's ingredients that changed since the
+        # last match
+        self.start = 0
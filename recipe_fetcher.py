@@ -0,0 +1,335 @@
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# user-agent to look like real traffic
+DEFAULT_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+}
+
+# responses worth asking for again after a pause
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+
+class FetchResult:
+    """
+    outcome of fetching one url
+
+    Attributes:
+        url: str:
+            the requested url
+
+        status: int or None:
+            HTTP status of the last response, None if no response arrived
+
+        text: str or None:
+            body of the response if the status is 2xx
+
+        headers: dict:
+            headers of the last response
+
+        error: str or None:
+            description of the failure, None when the fetch succeeded
+
+        attempts: int:
+            number of requests made for the url
+
+        elapsed: float:
+            seconds spent on the url including retries
+
+        fromCache: bool:
+            True if text was served by the page cache, either fresh or
+            after the server answered 304 Not Modified
+    """
+
+    def __init__(self, url: str, status: int | None = None,
+                 text: str | None = None, headers: dict | None = None,
+                 error: str | None = None, attempts: int = 0,
+                 elapsed: float = 0.0, fromCache: bool = False):
+        self.url = url
+        self.status = status
+        self.text = text
+        self.headers = headers if headers is not None else {}
+        self.error = error
+        self.attempts = attempts
+        self.elapsed = elapsed
+        self.fromCache = fromCache
+
+    def ok(self) -> bool:
+        return self.error is None
+
+    def __repr__(self) -> str:
+        return (f"FetchResult({self.url!r}, status={self.status}, "
+                f"error={self.error!r}, attempts={self.attempts})")
+
+
+class _HostLimiter:
+    """
+    internal per-host gate that caps concurrent requests and spaces request
+    starts by a minimum interval
+    """
+
+    def __init__(self, concurrency: int, rate: float | None):
+        self._slots = threading.Semaphore(concurrency)
+        self._interval = 1 / rate if rate else 0.0
+        self._lock = threading.Lock()
+        self._nextStart = 0.0
+
+    def __enter__(self):
+        self._slots.acquire()
+        if self._interval:
+            with self._lock:
+                now = time.monotonic()
+                start = max(now, self._nextStart)
+                self._nextStart = start + self._interval
+            if start > now:
+                time.sleep(start - now)
+        return self
+
+    def __exit__(self, *exc):
+        self._slots.release()
+        return False
+
+
+class RecipeFetcher:
+    """
+    concurrent page fetcher for recipe urls
+
+    requests go through one requests.Session so connections to a host are
+    kept alive and reused. A thread pool runs the requests, each host has
+    its own concurrency cap and rate limit, and failed requests are retried
+    with exponential backoff. Results are yielded as they complete.
+    """
+
+    def __init__(self, maxWorkers: int = 16, perHostConcurrency: int = 4,
+                 perHostRate: float | None = None, retries: int = 3,
+                 backoff: float = 0.5, timeout: float = 10,
+                 headers: dict | None = None, cache=None):
+        """
+        constructor class
+
+        Parameters:
+            maxWorkers: int:
+                number of threads making requests
+
+            perHostConcurrency: int:
+                maximum number of requests in flight to the same host
+
+            perHostRate: float or None:
+                maximum number of requests started per second for the same
+                host, None for no limit
+
+            retries: int:
+                number of extra attempts after a connection error, timeout or
+                a 429/5xx response
+
+            backoff: float:
+                seconds to wait before the first retry, doubled for each
+                following retry. A numeric Retry-After header takes priority
+
+            timeout: float:
+                seconds to wait for a response
+
+            headers: dict or None:
+                headers sent with every request, defaults to DEFAULT_HEADERS
+
+            cache: PageCache or None:
+                if given, fresh cached pages are served without a request,
+                stale ones are revalidated with If-None-Match or
+                If-Modified-Since and fetched pages are stored. An offline
+                cache never makes a request
+
+        Raises:
+            ValueError:
+                if maxWorkers or perHostConcurrency is less than 1, or if
+                retries, backoff or perHostRate is negative
+        """
+        if maxWorkers < 1 or perHostConcurrency < 1:
+            raise ValueError("maxWorkers and perHostConcurrency must be at "
+                             "least 1")
+        if retries < 0 or backoff < 0 or (perHostRate is not None
+                                          and perHostRate <= 0):
+            raise ValueError("retries and backoff must not be negative and "
+                             "perHostRate must be positive")
+
+        self._maxWorkers = maxWorkers
+        self._perHostConcurrency = perHostConcurrency
+        self._perHostRate = perHostRate
+        self._retries = retries
+        self._backoff = backoff
+        self._timeout = timeout
+        self._cache = cache
+
+        self._session = requests.Session()
+        self._session.headers.update(DEFAULT_HEADERS if headers is None
+                                     else headers)
+        adapter = HTTPAdapter(pool_connections=maxWorkers,
+                              pool_maxsize=maxWorkers)
+        self._session.mount('http://', adapter)
+        self._session.mount('https://', adapter)
+
+        self._limiters = {}
+        self._limitersLock = threading.Lock()
+
+    def _limiter(self, url: str) -> _HostLimiter:
+        """
+        internal method that returns the limiter of the url's host
+        """
+        host = urlsplit(url).netloc.lower()
+        with self._limitersLock:
+            limiter = self._limiters.get(host)
+            if limiter is None:
+                limiter = _HostLimiter(self._perHostConcurrency,
+                                       self._perHostRate)
+                self._limiters[host] = limiter
+            return limiter
+
+    def _request(self, url: str, headers: dict | None = None):
+        """
+        internal method that makes a single GET request for url inside the
+        host's limiter
+        """
+        with self._limiter(url):
+            return self._session.get(url, headers=headers,
+                                     timeout=self._timeout)
+
+    def _retry_delay(self, attempt: int, response) -> float:
+        """
+        internal method that returns the seconds to wait before the next
+        attempt
+        """
+        if response is not None:
+            retryAfter = response.headers.get('Retry-After', '')
+            if retryAfter.isdigit():
+                return float(retryAfter)
+        return self._backoff * (2 ** attempt)
+
+    def fetch(self, url: str) -> FetchResult:
+        """
+        fetches url, retrying failures, and returns a FetchResult. Never
+        raises for network or HTTP errors, they are reported in the result
+        """
+        started = time.monotonic()
+        result = FetchResult(url)
+        cached = None
+        conditionalHeaders = None
+        if self._cache is not None:
+            cached = self._cache.get(url)
+            if cached is not None and (self._cache.offline
+                                       or self._cache.is_fresh(cached)):
+                return self._cached_result(result, cached, started)
+            if self._cache.offline:
+                result.error = "not in the page cache and the cache is offline"
+                return result
+            if cached is not None:
+                conditionalHeaders = self._cache.conditional_headers(cached)
+
+        for attempt in range(self._retries + 1):
+            result.attempts = attempt + 1
+            response = None
+            try:
+                response = self._request(url, conditionalHeaders)
+                if response.status_code == 304 and cached is not None:
+                    cached = self._cache.revalidated(url,
+                                                     dict(response.headers))
+                    if cached is not None:
+                        return self._cached_result(result, cached, started)
+                    # the page left the cache after it was read, so the 304
+                    # has no body to return: ask again for the whole page
+                    conditionalHeaders = None
+                    response = self._request(url, None)
+            except requests.exceptions.RequestException as e:
+                result.error = f"{type(e).__name__}: {e}"
+            else:
+                result.status = response.status_code
+                result.headers = dict(response.headers)
+                # a 304 is ok but has no body
+                if response.ok and response.status_code != 304:
+                    result.text = response.text
+                    result.error = None
+                    if self._cache is not None:
+                        self._cache.put(url, result.text, result.headers)
+                    break
+                result.error = f"HTTP {response.status_code}"
+                if response.status_code not in RETRY_STATUSES:
+                    break
+
+            if attempt < self._retries:
+                time.sleep(self._retry_delay(attempt, response))
+
+        result.elapsed = time.monotonic() - started
+        return result
+
+    def _cached_result(self, result: FetchResult, cached,
+                       started: float) -> FetchResult:
+        """
+        internal method that fills result from a CachedPage
+        """
+        result.status = 200
+        result.text = cached.text
+        result.headers = cached.headers
+        result.error = None
+        result.fromCache = True
+        result.elapsed = time.monotonic() - started
+        return result
+
+    def fetch_all(self, urls):
+        """
+        generator that fetches every url of urls concurrently and yields a
+        FetchResult for each one as soon as it completes. urls may be any
+        iterable, at most twice maxWorkers urls are taken from it ahead of
+        the results so a long stream of urls is not held in memory
+        """
+        urls = iter(urls)
+        pending = set()
+        with ThreadPoolExecutor(max_workers=self._maxWorkers) as executor:
+            for url in urls:
+                pending.add(executor.submit(self.fetch, url))
+                if len(pending) < self._maxWorkers * 2:
+                    continue
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield future.result()
+
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield future.result()
+
+    def scrape_all(self, urls, supportedOnly: bool = True):
+        """
+        generator that fetches every url of urls and yields
+        (FetchResult, scraper) tuples as pages arrive. scraper is the
+        recipe_scrapers object made by scrape_html, or None if the fetch or
+        the scrape failed, in which case the result's error says why.
+        If supportedOnly is False, pages of sites recipe_scrapers does not
+        know are read from their schema.org markup
+        """
+        from recipe_scrapers import scrape_html
+
+        for result in self.fetch_all(urls):
+            scraper = None
+            if result.ok():
+                try:
+                    scraper = scrape_html(html=result.text, org_url=result.url,
+                                          supported_only=supportedOnly)
+                except Exception as e:
+                    result.error = f"{type(e).__name__}: {e}"
+            yield result, scraper
+
+    def close(self) -> None:
+        """
+        closes the pooled connections
+        """
+        self._session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
@@ -0,0 +1,294 @@
+"""
+SQLite persistence for recipes and their parsed ingredients
+
+each ingredient is stored as a normalized row with its cleaned name, amounts,
+state and density, and its keywords in their own table. Names and keywords
+are indexed so finding every recipe that contains an ingredient is an index
+lookup, and loading a recipe rebuilds its Ingredient objects from the rows
+without parsing anything.
+"""
+import json
+import sqlite3
+import hashlib
+from fractions import Fraction
+
+from ingredient_class import Ingredient, clean_name
+from recipe_class import Recipe
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS recipes (
+    id INTEGER PRIMARY KEY,
+    content_hash TEXT NOT NULL UNIQUE,
+    title TEXT,
+    source TEXT,
+    steps TEXT,
+    servings TEXT
+);
+CREATE TABLE IF NOT EXISTS ingredients (
+    recipe_id INTEGER NOT NULL REFERENCES recipes(id) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    optional INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    kitchen_amount TEXT,
+    kitchen_measure TEXT,
+    metric_amount TEXT,
+    metric_measure TEXT,
+    grams REAL,
+    state TEXT,
+    density INTEGER,
+    PRIMARY KEY (recipe_id, position)
+);
+CREATE TABLE IF NOT EXISTS ingredient_keywords (
+    keyword TEXT NOT NULL,
+    recipe_id INTEGER NOT NULL REFERENCES recipes(id) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    PRIMARY KEY (keyword, recipe_id, position)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS ingredients_name ON ingredients (name, recipe_id);
+"""
+
+# recipes parsed and inserted per transaction by ingest
+INGEST_BATCH = 256
+
+def content_hash(title: str, source: str, ingredientList: list,
+                 steps: str) -> str:
+    """
+    returns the sha256 hex digest identifying a recipe by its raw contents,
+    recipes with the same hash are only stored once
+    """
+    content = json.dumps([title, source, list(ingredientList), steps],
+                         ensure_ascii=False, separators=(',', ':'))
+    return hashlib.sha256(content.encode('utf-8')).hexdigest()
+
+def _amount_text(amount) -> str | None:
+    """
+    internal function that stores a Fraction amount exactly as 'n/d'
+    """
+    if amount is None:
+        return None
+    return str(Fraction(amount))
+
+def _amount_value(text: str | None) -> Fraction | None:
+    if text is None:
+        return None
+    return Fraction(text)
+
+def _servings_value(text: str | None) -> int | Fraction | None:
+    """
+    internal function that reads stored servings back as an int when they
+    are whole, as a recipe saved with 4 servings loads with 4 and not
+    Fraction(4)
+    """
+    servings = _amount_value(text)
+    if servings is not None and servings.denominator == 1:
+        return servings.numerator
+    return servings
+
+
+class RecipeStore:
+    """
+    SQLite store of recipes with indexed, normalized ingredient rows
+    """
+    def __init__(self, path: str = ':memory:'):
+        """
+        constructor class
+
+        Parameters:
+            path: str:
+                path of the SQLite file, ':memory:' for a temporary store
+        """
+        self._connection = sqlite3.connect(path)
+        self._connection.execute("PRAGMA foreign_keys = ON")
+        if path != ':memory:':
+            self._connection.execute("PRAGMA journal_mode = WAL")
+            self._connection.execute("PRAGMA synchronous = NORMAL")
+        self._connection.executescript(SCHEMA)
+        # stores made before servings were kept get the column, empty
+        columns = {row[1] for row in self._connection.execute(
+            "PRAGMA table_info(recipes)")}
+        if 'servings' not in columns:
+            self._connection.execute(
+                "ALTER TABLE recipes ADD COLUMN servings TEXT")
+
+    def close(self) -> None:
+        self._connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *excInfo):
+        self.close()
+        return False
+
+    def __len__(self) -> int:
+        return self._connection.execute(
+            "SELECT COUNT(*) FROM recipes").fetchone()[0]
+
+    def has(self, contentHash: str) -> bool:
+        return self._connection.execute(
+            "SELECT 1 FROM recipes WHERE content_hash = ?",
+            (contentHash,)).fetchone() is not None
+
+    def _stored_hashes(self, hashes: list) -> set:
+        """
+        internal method that returns the hashes of hashes that are stored
+        """
+        stored = set()
+        # stays under SQLite's limit on query parameters
+        for start in range(0, len(hashes), 500):
+            chunk = hashes[start:start + 500]
+            marks = ','.join('?' * len(chunk))
+            stored.update(row[0] for row in self._connection.execute(
+                f"SELECT content_hash FROM recipes "
+                f"WHERE content_hash IN ({marks})", chunk))
+        return stored
+
+    def _insert(self, recipe: Recipe, contentHash: str) -> int:
+        """
+        internal method that inserts recipe and its ingredient and keyword
+        rows, must be called inside a transaction. Returns the recipe id
+        """
+        recipeId = self._connection.execute(
+            "INSERT INTO recipes (content_hash, title, source, steps, "
+            "servings) VALUES (?, ?, ?, ?, ?)",
+            (contentHash, recipe.title(), recipe.source(),
+             recipe.instructions(), _amount_text(recipe.servings()))).lastrowid
+
+        ingredientRows = []
+        keywordRows = set()
+        ingredients = ([(ingredient, 0) for ingredient in recipe.ingredients()]
+                       + [(ingredient, 1)
+                          for ingredient in recipe.optional_ingredients()])
+        for position, (ingredient, optional) in enumerate(ingredients):
+            metricAmount = ingredient.metric_amount()
+            ingredientRows.append(
+                (recipeId, position, optional, ingredient.name(),
+                 _amount_text(ingredient.kitchen_amount()),
+                 ingredient.kitchen_measure(), _amount_text(metricAmount),
+                 ingredient.metric_measure(),
+                 None if metricAmount is None else float(metricAmount),
+                 ingredient.state(), ingredient._density))
+            keywordRows.update((keyword, recipeId, position)
+                               for keyword in ingredient.keywords())
+
+        self._connection.executemany(
+            "INSERT INTO ingredients (recipe_id, position, optional, name, "
+            "kitchen_amount, kitchen_measure, metric_amount, metric_measure, "
+            "grams, state, density) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            ingredientRows)
+        self._connection.executemany(
+            "INSERT INTO ingredient_keywords (keyword, recipe_id, position) "
+            "VALUES (?, ?, ?)", keywordRows)
+        return recipeId
+
+    def add(self, recipe: Recipe, contentHash: str) -> int | None:
+        """
+        stores an already built recipe under contentHash and returns its id,
+        or None if a recipe with that hash is already stored
+        """
+        if self.has(contentHash):
+            return None
+        with self._connection:
+            return self._insert(recipe, contentHash)
+
+    def ingest(self, recipes, workers: int | None = 1,
+               batch: int = INGEST_BATCH) -> int:
+        """
+        parses and stores every (title, source, ingredientList, steps) tuple
+        of recipes that is not stored yet and returns the number stored.
+        Recipes are parsed with Recipe.from_many and inserted in one
+        transaction per batch, recipes already stored are skipped by their
+        content_hash before anything is parsed
+        """
+        inserted = 0
+        pending = []
+        for recipe in recipes:
+            pending.append(tuple(recipe))
+            if len(pending) >= batch:
+                inserted += self._ingest_batch(pending, workers)
+                pending = []
+        if pending:
+            inserted += self._ingest_batch(pending, workers)
+        return inserted
+
+    def _ingest_batch(self, recipes: list, workers: int | None) -> int:
+        """
+        internal method that stores the recipes of one ingest batch
+        """
+        hashes = [content_hash(*recipe) for recipe in recipes]
+        stored = self._stored_hashes(hashes)
+        new = {}
+        for contentHash, recipe in zip(hashes, recipes):
+            # also drops duplicates inside the batch
+            if contentHash not in stored:
+                new.setdefault(contentHash, recipe)
+        if not new:
+            return 0
+
+        built = Recipe.from_many(list(new.values()), workers=workers)
+        with self._connection:
+            for contentHash, recipe in zip(new, built):
+                self._insert(recipe, contentHash)
+        return len(new)
+
+    def load(self, recipeId: int) -> Recipe:
+        """
+        returns the stored recipe recipeId, rebuilt from its rows without
+        parsing
+
+        Raises:
+            KeyError:
+                if no recipe has the id recipeId
+        """
+        row = self._connection.execute(
+            "SELECT title, source, steps, servings FROM recipes WHERE id = ?",
+            (recipeId,)).fetchone()
+        if row is None:
+            raise KeyError(f"no stored recipe has the id {recipeId}")
+        title, source, steps, servings = row
+
+        ingredients = []
+        optionalIngredients = []
+        for (optional, name, kitchenAmount, kitchenMeasure, metricAmount,
+             metricMeasure, state, density) in self._connection.execute(
+                "SELECT optional, name, kitchen_amount, kitchen_measure, "
+                "metric_amount, metric_measure, state, density "
+                "FROM ingredients WHERE recipe_id = ? ORDER BY position",
+                (recipeId,)):
+            ingredient = Ingredient.from_fields(
+                name, _amount_value(kitchenAmount), kitchenMeasure,
+                _amount_value(metricAmount), metricMeasure, state, density)
+            if optional:
+                optionalIngredients.append(ingredient)
+            else:
+                ingredients.append(ingredient)
+        return Recipe.from_ingredients(title, source, ingredients, steps,
+                                       optionalIngredients,
+                                       _servings_value(servings))
+
+    def ids(self) -> list:
+        """
+        returns the id of every stored recipe in insertion order
+        """
+        return [row[0] for row in self._connection.execute(
+            "SELECT id FROM recipes ORDER BY id")]
+
+    def recipes_with_keyword(self, keyword: str) -> list:
+        """
+        returns (id, title) of every stored recipe with an ingredient that has
+        keyword, such as 'buttermilk' or 'flour'
+        """
+        return self._connection.execute(
+            "SELECT id, title FROM recipes WHERE id IN "
+            "(SELECT recipe_id FROM ingredient_keywords WHERE keyword = ?) "
+            "ORDER BY id", (keyword.lower(),)).fetchall()
+
+    def recipes_with_ingredient(self, name: str) -> list:
+        """
+        returns (id, title) of every stored recipe with an ingredient named
+        exactly name once cleaned, such as 'all purpose flour'
+        """
+        return self._connection.execute(
+            "SELECT id, title FROM recipes WHERE id IN "
+            "(SELECT recipe_id FROM ingredients WHERE name = ?) "
+            "ORDER BY id", (clean_name(name),)).fetchall()
@@ -0,0 +1,209 @@
+"""
+yield normalized scaling of many recipes at once
+
+every measured ingredient is converted to grams through its metric amount,
+the same density path Ingredient uses, and the recipes are laid out as a
+dense recipes x ingredients mass matrix in NumPy. Scaling to grams per
+serving or to a common total mass is then one vectorized operation over the
+whole corpus, so a 9x13 pan recipe and an 8-inch square recipe can be
+compared on the same basis.
+
+    masses = MassMatrix.from_recipes(recipes)
+    perServing = masses.scaled('serving')
+    perKilogram = masses.scaled('mass', 1000)
+"""
+import numpy as np
+
+from corpus_index import ingredient_grams, ingredient_term
+
+BASES = ('serving', 'mass')
+
+# total grams each recipe is scaled to by the 'mass' basis by default
+DEFAULT_TOTAL_MASS = 1000.0
+
+
+class MassMatrix:
+    """
+    grams of each ingredient term of many recipes
+
+    rows are recipes and columns are ingredient terms (see
+    corpus_index.ingredient_term) so 'all-purpose flour' and 'flour' share a
+    column. Dimensionless ingredients such as 1 large egg have no mass and
+    are left out
+    """
+
+    def __init__(self, keys: list, terms: list, grams: np.ndarray,
+                 servings: np.ndarray):
+        """
+        constructor class, see from_recipes to build one from Recipe objects
+
+        Parameters:
+            keys: list:
+                key of each row, such as the recipe title
+
+            terms: list of str:
+                ingredient term of each column
+
+            grams: np.ndarray:
+                len(keys) x len(terms) array of grams
+
+            servings: np.ndarray:
+                servings of each row, NaN where the yield is not known
+
+        Raises:
+            ValueError:
+                if the shapes of grams and servings do not match keys and terms
+        """
+        grams = np.asarray(grams, dtype=np.float64)
+        servings = np.asarray(servings, dtype=np.float64)
+        if grams.shape != (len(keys), len(terms)):
+            raise ValueError(f"grams must have the shape ({len(keys)}, "
+                             f"{len(terms)}) but has {grams.shape}")
+        if servings.shape != (len(keys),):
+            raise ValueError(f"servings must have {len(keys)} values but has "
+                             f"{servings.shape}")
+        self._keys = list(keys)
+        self._terms = list(terms)
+        self._columns = {term: column for column, term in enumerate(terms)}
+        self._grams = grams
+        self._servings = servings
+
+    @classmethod
+    def from_recipes(cls, recipes, keys=None) -> 'MassMatrix':
+        """
+        builds the mass matrix of recipes in one pass over their ingredients.
+        keys defaults to the recipe titles
+        """
+        recipes = list(recipes)
+        if keys is None:
+            keys = [recipe.title() for recipe in recipes]
+        vocabulary = {}
+        rows = []
+        columns = []
+        amounts = []
+        for row, recipe in enumerate(recipes):
+            for ingredient in recipe.ingredients():
+                grams = ingredient_grams(ingredient)
+                if grams is None:
+                    continue
+                term = ingredient_term(ingredient)
+                rows.append(row)
+                columns.append(vocabulary.setdefault(term, len(vocabulary)))
+                amounts.append(grams)
+
+        matrix = np.zeros((len(recipes), len(vocabulary)))
+        # add.at sums ingredients that share a term in the same recipe
+        np.add.at(matrix, (np.asarray(rows, dtype=np.int64),
+                           np.asarray(columns, dtype=np.int64)),
+                  np.asarray(amounts, dtype=np.float64))
+        servings = np.array([np.nan if recipe.servings() is None
+                             else float(recipe.servings())
+                             for recipe in recipes], dtype=np.float64)
+        return cls(keys, list(vocabulary), matrix, servings)
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def keys(self) -> list:
+        return list(self._keys)
+
+    def terms(self) -> list:
+        """
+        returns the ingredient term of each column
+        """
+        return list(self._terms)
+
+    def grams(self) -> np.ndarray:
+        """
+        returns a copy of the recipes x terms array of grams as written
+        """
+        return self._grams.copy()
+
+    def servings(self) -> np.ndarray:
+        """
+        returns a copy of the servings of each recipe, NaN where not known
+        """
+        return self._servings.copy()
+
+    def totals(self) -> np.ndarray:
+        """
+        returns the total grams of each recipe
+        """
+        return self._grams.sum(axis=1)
+
+    def factors(self, basis: str = 'serving',
+                total: float = DEFAULT_TOTAL_MASS) -> np.ndarray:
+        """
+        returns the factor each recipe's grams are multiplied by for basis.
+        The factor is NaN for a recipe that cannot be scaled: without a yield
+        for 'serving' or without any mass for 'mass'
+
+        Parameters:
+            basis: str:
+                'serving' for grams per serving or 'mass' for grams when the
+                recipe is scaled to total grams
+
+        Raises:
+            ValueError:
+                if basis is not a correct value or total is not positive
+        """
+        if basis not in BASES:
+            raise ValueError(f"basis must be 'serving' or 'mass' but is {basis}")
+        if basis == 'serving':
+            return 1.0 / self._servings
+        if not total > 0:
+            raise ValueError(f"total must be positive but is {total}")
+        totals = self.totals()
+        factors = np.full(len(totals), np.nan)
+        np.divide(total, totals, out=factors, where=totals > 0)
+        return factors
+
+    def scaled(self, basis: str = 'serving',
+               total: float = DEFAULT_TOTAL_MASS) -> np.ndarray:
+        """
+        returns the recipes x terms array of grams scaled to basis, see
+        factors. Rows that cannot be scaled are NaN
+        """
+        return self._grams * self.factors(basis, total)[:, np.newaxis]
+
+    def row(self, key, basis: str | None = None,
+            total: float = DEFAULT_TOTAL_MASS) -> dict:
+        """
+        returns a dict of term -> grams of the recipe key, scaled to basis
+        unless basis is None. Terms the recipe does not have are left out
+
+        Raises:
+            KeyError:
+                if no recipe has the key
+        """
+        try:
+            row = self._keys.index(key)
+        except ValueError:
+            raise KeyError(f"no recipe has the key {key}")
+        values = self._grams[row]
+        if basis is not None:
+            values = values * self.factors(basis, total)[row]
+        return {self._terms[column]: float(values[column])
+                for column in np.flatnonzero(self._grams[row])}
+
+    def compare(self, first, second, basis: str = 'serving',
+                total: float = DEFAULT_TOTAL_MASS) -> dict:
+        """
+        returns a dict of term -> (grams in first, grams in second) for every
+        term of either recipe, both scaled to basis so recipes with different
+        yields are compared fairly. A term one recipe does not have is 0.0
+        """
+        firstRow = self.row(first, basis, total)
+        secondRow = self.row(second, basis, total)
+        return {term: (firstRow.get(term, 0.0), secondRow.get(term, 0.0))
+                for term in list(firstRow) + [term for term in secondRow
+                                              if term not in firstRow]}
+
+def scale_recipes(recipes, basis: str = 'serving',
+                  total: float = DEFAULT_TOTAL_MASS) -> tuple:
+    """
+    returns (terms, array) with the recipes x terms grams of recipes scaled to
+    basis, see MassMatrix.scaled
+    """
+    masses = MassMatrix.from_recipes(recipes)
+    return masses.terms(), masses.scaled(basis, total)
@@ -0,0 +1,450 @@
+"""
+compact, versioned binary format for Recipe and Ingredient
+
+a buffer starts with MAGIC, the format VERSION and its kind, then a table of
+every distinct string and a table of every distinct amount in it, followed
+by a body of fixed width integers. Ingredients refer to their name and
+amounts by index so values shared by many recipes are stored once, and units
+and states are small codes. Keywords are not stored, they come from the
+memoized names.normalize_name. Every table is a packed array read with one
+copy, the strings are one utf-8 text sliced by their lengths, each distinct
+ingredient row is decoded once and reused for its repeats, and the encoding
+only depends on the values, so it is the same in every process.
+
+on the synthetic benchmark corpus a buffer is about 3x smaller than a pickle
+of the same recipes, encoding takes about 0.75x and decoding 0.65x the time
+of pickle. When recipes repeat ingredient lines as scraped corpora do, a
+buffer is 4x smaller, encoding takes about 0.6x and decoding 0.4x the time of
+pickle, see benchmarks/bench_serialization.py.
+
+layout, where ints are a varint count, an array typecode byte and the values
+as little-endian unsigned ints of that width, or as unsigned LEB128 varints
+for the typecode 'V' when a value does not fit in 64 bits:
+
+    MAGIC VERSION kind (b'R' for recipes, b'I' for ingredients)
+    ints: length of each string in characters
+    varint byte length, then the utf-8 bytes of every string in order
+    ints: zigzag numerator of each amount
+    ints: denominator of each amount
+    ints: body
+
+a recipe body is the recipe count followed for each recipe by title, source,
+steps, servings (an amount), ingredient count and optional ingredient count,
+then its ingredients. An ingredient body is the ingredient count followed by
+the ingredients. Each ingredient is INGREDIENT_FIELDS ints:
+
+    name, kitchen unit, metric unit, state, kitchen amount, metric amount,
+    density + 1
+
+index 0 of both tables and a density of 0 stand for None. Ingredients and
+CompactIngredients are encoded alike and decoded as Ingredients.
+"""
+import sys
+from array import array
+from fractions import Fraction
+
+from compact_ingredient import (CompactIngredient, Unit, State, UNITS,
+                                UNIT_NAMES, STATES, STATE_NAMES)
+from names import normalize_name
+
+MAGIC = b'RCP'
+VERSION = 3
+RECIPES = ord('R')
+INGREDIENTS = ord('I')
+
+INGREDIENT_FIELDS = 7
+# smallest array typecode that holds every value of an ints field
+_WIDTHS = (('B', 0xff), ('H', 0xffff), ('I', 0xffffffff),
+           ('Q', 0xffffffffffffffff))
+# typecode of an ints field written as varints
+_VARINTS = 'V'
+
+# unit and state codes of their names, as plain ints
+_UNIT_CODES = {name: int(unit) for name, unit in UNITS.items()}
+_STATE_CODES = {name: int(state) for name, state in STATES.items()}
+# unit and state names indexed by their code
+_UNIT_BY_CODE = [UNIT_NAMES[unit] for unit in Unit]
+_STATE_BY_CODE = [STATE_NAMES[state] for state in State]
+
+
+def _write_varint(out: bytearray, value: int) -> None:
+    while value > 0x7f:
+        out.append((value & 0x7f) | 0x80)
+        value >>= 7
+    out.append(value)
+
+def _write_ints(out: bytearray, values: list) -> None:
+    """
+    internal function that writes values as an ints field, see the module
+    docstring
+    """
+    _write_varint(out, len(values))
+    largest = max(values, default=0)
+    for typecode, limit in _WIDTHS:
+        if largest <= limit:
+            packed = array(typecode, values)
+            if sys.byteorder == 'big':
+                packed.byteswap()
+            out.append(ord(typecode))
+            out += packed
+            return
+    out.append(ord(_VARINTS))
+    for value in values:
+        _write_varint(out, value)
+
+
+class _Reader:
+    """
+    internal cursor over an encoded buffer
+    """
+    __slots__ = ('_data', '_position')
+
+    def __init__(self, data: bytes, position: int = 0):
+        self._data = data
+        self._position = position
+
+    def byte(self) -> int:
+        try:
+            value = self._data[self._position]
+        except IndexError:
+            raise ValueError("encoded data is truncated")
+        self._position += 1
+        return value
+
+    def varint(self) -> int:
+        data = self._data
+        position = self._position
+        result = 0
+        shift = 0
+        try:
+            while True:
+                byte = data[position]
+                position += 1
+                result |= (byte & 0x7f) << shift
+                if byte < 0x80:
+                    break
+                shift += 7
+        except IndexError:
+            raise ValueError("encoded data is truncated")
+        self._position = position
+        return result
+
+    def raw(self, size: int) -> bytes:
+        end = self._position + size
+        if end > len(self._data):
+            raise ValueError("encoded data is truncated")
+        value = self._data[self._position:end]
+        self._position = end
+        return value
+
+    def ints(self) -> list:
+        """
+        reads an ints field, see the module docstring
+        """
+        count = self.varint()
+        typecode = chr(self.byte())
+        if typecode == _VARINTS:
+            return [self.varint() for _ in range(count)]
+        if typecode not in dict(_WIDTHS):
+            raise ValueError(f"encoded ints have an unknown width {typecode}")
+        values = array(typecode)
+        values.frombytes(self.raw(count * values.itemsize))
+        if sys.byteorder == 'big':
+            values.byteswap()
+        return values.tolist()
+
+    def at_end(self) -> bool:
+        return self._position == len(self._data)
+
+
+class _Encoder:
+    """
+    internal builder of one buffer, holds its tables and body
+    """
+    def __init__(self, kind: int):
+        self._kind = kind
+        # value -> index, 0 is None
+        self._strings = {}
+        # (numerator, denominator) -> index, 0 is None
+        self._amounts = {}
+        # id -> index of the amounts already seen, hashing a Fraction is
+        # much slower than hashing its id
+        self._amountIds = {}
+        self.body = []
+
+    def string(self, value: str | None) -> int:
+        if value is None:
+            return 0
+        index = self._strings.get(value)
+        if index is None:
+            index = self._strings[value] = len(self._strings) + 1
+        return index
+
+    def amount(self, value) -> int:
+        if value is None:
+            return 0
+        return self._amountIds.get(id(value)) or self._new_amount(value)
+
+    def _new_amount(self, value) -> int:
+        """
+        returns the index of an amount whose id was not seen yet
+        """
+        ratio = value.as_integer_ratio()
+        index = self._amounts.get(ratio)
+        if index is None:
+            index = self._amounts[ratio] = len(self._amounts) + 1
+        self._amountIds[id(value)] = index
+        return index
+
+    def ingredients(self, ingredients) -> None:
+        strings = self._strings
+        amountIds = self._amountIds
+        newAmount = self._new_amount
+        extend = self.body.extend
+        # the lookups of string and amount are inlined, this loop is most of
+        # the encoding time
+        for ingredient in ingredients:
+            if type(ingredient) is CompactIngredient:
+                kitchenUnit = ingredient._kitchenUnit
+                metricUnit = ingredient._metricUnit
+                state = ingredient._state
+            else:
+                kitchenUnit = _UNIT_CODES[ingredient._kitchenMeasure]
+                metricUnit = _UNIT_CODES[ingredient._metricMeasure]
+                state = _STATE_CODES[ingredient._state]
+            name = ingredient._name
+            nameIndex = strings.get(name)
+            if nameIndex is None:
+                nameIndex = strings[name] = len(strings) + 1
+            kitchenAmount = ingredient._kitchenAmount
+            metricAmount = ingredient._metricAmount
+            density = ingredient._density
+            # indexes start at 1, so a miss falls back to _new_amount
+            extend((nameIndex, kitchenUnit, metricUnit, state,
+                    0 if kitchenAmount is None else
+                    amountIds.get(id(kitchenAmount)) or newAmount(kitchenAmount),
+                    0 if metricAmount is None else
+                    amountIds.get(id(metricAmount)) or newAmount(metricAmount),
+                    0 if density is None else density + 1))
+
+    def to_bytes(self) -> bytes:
+        out = bytearray(MAGIC)
+        out.append(VERSION)
+        out.append(self._kind)
+
+        strings = list(self._strings)
+        _write_ints(out, [len(value) for value in strings])
+        text = ''.join(strings).encode('utf-8')
+        _write_varint(out, len(text))
+        out += text
+
+        ratios = list(self._amounts)
+        # zigzag so small negative numerators stay small
+        _write_ints(out, [numerator << 1 if numerator >= 0
+                          else ((-numerator) << 1) - 1
+                          for numerator, _ in ratios])
+        _write_ints(out, [denominator for _, denominator in ratios])
+
+        _write_ints(out, self.body)
+        return bytes(out)
+
+
+class _Decoder:
+    """
+    internal reader of one buffer, reads its tables and body
+    """
+    def __init__(self, data: bytes, kind: int):
+        """
+        Raises:
+            TypeError:
+                if data is not bytes
+            ValueError:
+                if data is not a buffer of kind in this format or was written
+                by another version
+        """
+        if not isinstance(data, (bytes, bytearray, memoryview)):
+            raise TypeError(f"data must be bytes but is a {type(data)}")
+        data = bytes(data)
+        if data[:len(MAGIC)] != MAGIC:
+            raise ValueError("data is not an encoded recipe buffer")
+        reader = _Reader(data, len(MAGIC))
+        version = reader.byte()
+        if version != VERSION:
+            raise ValueError(f"encoded data has format version {version} but "
+                             f"only version {VERSION} can be read")
+        if reader.byte() != kind:
+            raise ValueError(f"encoded data does not hold {chr(kind)} records")
+
+        lengths = reader.ints()
+        text = reader.raw(reader.varint()).decode('utf-8')
+        self.strings = strings = [None]
+        start = 0
+        for length in lengths:
+            end = start + length
+            strings.append(text[start:end])
+            start = end
+        if start != len(text):
+            raise ValueError("encoded strings do not match their lengths")
+
+        numerators = reader.ints()
+        denominators = reader.ints()
+        if len(numerators) != len(denominators):
+            raise ValueError("encoded amounts do not match their denominators")
+        self.amounts = amounts = [None]
+        for zigzag, denominator in zip(numerators, denominators):
+            if denominator == 0:
+                raise ValueError("encoded amount has a zero denominator")
+            numerator = zigzag >> 1 if not zigzag & 1 else -((zigzag + 1) >> 1)
+            amounts.append(Fraction(numerator) if denominator == 1
+                           else Fraction(numerator, denominator))
+
+        self.body = reader.ints()
+        if not reader.at_end():
+            raise ValueError("encoded data has trailing bytes")
+        self.position = 0
+        # ingredient row -> tuple of its fields, each distinct row is decoded
+        # once and its fields reused for the repeats
+        self.rows = {}
+        # string index -> normalize_name of the string
+        self.names = {}
+
+    def next(self) -> int:
+        try:
+            value = self.body[self.position]
+        except IndexError:
+            raise ValueError("encoded data is truncated")
+        self.position += 1
+        return value
+
+    def ingredients(self, count: int) -> list:
+        from ingredient_class import Ingredient
+        start = self.position
+        end = start + count * INGREDIENT_FIELDS
+        if end > len(self.body):
+            raise ValueError("encoded data is truncated")
+        self.position = end
+
+        strings = self.strings
+        amounts = self.amounts
+        rows = self.rows
+        names = self.names
+        newIngredient = Ingredient.__new__
+        ingredients = []
+        append = ingredients.append
+        values = iter(self.body[start:end])
+        try:
+            # zip of one iterator repeated gives the rows as tuples
+            for row in zip(*[values] * INGREDIENT_FIELDS):
+                fields = rows.get(row)
+                if fields is None:
+                    (name, kitchenUnit, metricUnit, state, kitchenAmount,
+                     metricAmount, density) = row
+                    normalized = names.get(name)
+                    if normalized is None:
+                        normalized = names[name] = normalize_name(strings[name])
+                    name, keywords, keywordSet = normalized
+                    fields = rows[row] = (
+                        name, amounts[kitchenAmount],
+                        _UNIT_BY_CODE[kitchenUnit], amounts[metricAmount],
+                        _UNIT_BY_CODE[metricUnit],
+                        density - 1 if density else None,
+                        _STATE_BY_CODE[state], keywords, keywordSet)
+                # same fields as Ingredient.from_fields, set one by one as
+                # that is faster than building or copying a dict of them
+                ingredient = newIngredient(Ingredient)
+                (ingredient._name, ingredient._kitchenAmount,
+                 ingredient._kitchenMeasure, ingredient._metricAmount,
+                 ingredient._metricMeasure, ingredient._density,
+                 ingredient._state, ingredient._keywords,
+                 ingredient._keywordSet) = fields
+                append(ingredient)
+        except IndexError:
+            raise ValueError("encoded data refers to a missing string or code")
+        return ingredients
+
+    def finish(self) -> None:
+        if self.position != len(self.body):
+            raise ValueError("encoded data has trailing values")
+
+
+def encode_recipes(recipes) -> bytes:
+    """
+    returns a single buffer holding every Recipe of recipes
+    """
+    recipes = list(recipes)
+    encoder = _Encoder(RECIPES)
+    encoder.body.append(len(recipes))
+    for recipe in recipes:
+        recipe.materialize()
+        ingredients = recipe._ingredients
+        optionalIngredients = recipe._optionalIngredients
+        encoder.body += (encoder.string(recipe.title()),
+                         encoder.string(recipe.source()),
+                         encoder.string(recipe.instructions()),
+                         encoder.amount(recipe.servings()),
+                         len(ingredients), len(optionalIngredients))
+        encoder.ingredients(ingredients)
+        encoder.ingredients(optionalIngredients)
+    return encoder.to_bytes()
+
+def decode_recipes(data: bytes) -> list:
+    """
+    returns the list of Recipe encoded in data by encode_recipes
+
+    Raises:
+        TypeError:
+            if data is not bytes
+        ValueError:
+            if data is not a valid buffer of this format version
+    """
+    from recipe_class import Recipe
+    decoder = _Decoder(data, RECIPES)
+    strings = decoder.strings
+    amounts = decoder.amounts
+    recipes = []
+    try:
+        for _ in range(decoder.next()):
+            title = strings[decoder.next()]
+            source = strings[decoder.next()]
+            steps = strings[decoder.next()]
+            servings = amounts[decoder.next()]
+            if servings is not None and servings.denominator == 1:
+                # whole servings were given as an int
+                servings = servings.numerator
+            count = decoder.next()
+            optionalCount = decoder.next()
+            # the decoded ingredients need none of the checks of
+            # Recipe.from_ingredients
+            recipe = Recipe(title, source, [], steps, servings)
+            recipe._ingredients = decoder.ingredients(count)
+            recipe._optionalIngredients = decoder.ingredients(optionalCount)
+            recipes.append(recipe)
+    except IndexError:
+        raise ValueError("encoded data refers to a missing string or amount")
+    decoder.finish()
+    return recipes
+
+def encode_ingredients(ingredients) -> bytes:
+    """
+    returns a single buffer holding every Ingredient of ingredients
+    """
+    ingredients = list(ingredients)
+    encoder = _Encoder(INGREDIENTS)
+    encoder.body.append(len(ingredients))
+    encoder.ingredients(ingredients)
+    return encoder.to_bytes()
+
+def decode_ingredients(data: bytes) -> list:
+    """
+    returns the list of Ingredient encoded in data by encode_ingredients
+
+    Raises:
+        TypeError:
+            if data is not bytes
+        ValueError:
+            if data is not a valid buffer of this format version
+    """
+    decoder = _Decoder(data, INGREDIENTS)
+    ingredients = decoder.ingredients(decoder.next())
+    decoder.finish()
+    return ingredients
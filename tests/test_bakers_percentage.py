@@ -0,0 +1,114 @@
+import unittest
+
+import numpy as np
+
+from bakers_percentage import RatioClusters, bakers_percentages
+from ingredient_class import Ingredient
+from recipe_class import Recipe
+
+
+def make_recipe(title, ingredients):
+    return Recipe.from_ingredients(title, 'test', [Ingredient(*args) for args in ingredients], '')
+
+def sweet(title, scale=1.0):
+    # cakey cornbread, about as much sugar as base
+    return make_recipe(title, [('cornmeal', 1 * scale, 'cup'), ('flour', 1 * scale, 'cup'),
+                               ('white sugar', 1 * scale, 'cup'), ('butter', 0.5 * scale, 'cup')])
+
+def savory(title, scale=1.0):
+    # southern cornbread, no sugar and mostly cornmeal
+    return make_recipe(title, [('cornmeal', 2 * scale, 'cup'), ('buttermilk', 1.5 * scale, 'cup'),
+                               ('salt', 1 * scale, 'teaspoon')])
+
+
+class TestBakersPercentages(unittest.TestCase):
+    def test_base_is_flour_and_cornmeal(self):
+        percentages = bakers_percentages(sweet('sweet').ingredients())
+        base = percentages['cornmeal'] + percentages['flour']
+        self.assertAlmostEqual(base, 100.0)
+        self.assertGreater(percentages['white sugar'], 0)
+
+    def test_scale_invariant(self):
+        first = bakers_percentages(sweet('one').ingredients())
+        second = bakers_percentages(sweet('three', 3).ingredients())
+        self.assertEqual(first.keys(), second.keys())
+        for term in first:
+            self.assertAlmostEqual(first[term], second[term], msg=term)
+
+    def test_no_base(self):
+        recipe = make_recipe('milk', [('milk', 1, 'cup')])
+        self.assertEqual(bakers_percentages(recipe.ingredients()), {})
+
+
+class TestRatioClusters(unittest.TestCase):
+    def setUp(self):
+        self.recipes = ([sweet(f'sweet {i}', 1 + i / 4) for i in range(6)]
+                        + [savory(f'savory {i}', 1 + i / 4) for i in range(6)])
+
+    def test_matrix_grows(self):
+        clusters = RatioClusters(k=2)
+        rows = clusters.add_many(self.recipes * 3 + [make_recipe('milk', [('milk', 1, 'cup')])])
+        self.assertEqual(rows, list(range(36)))
+        self.assertEqual(len(clusters), 36)
+        matrix = clusters.matrix()
+        self.assertEqual(matrix.shape, (36, len(clusters.vocabulary())))
+        np.testing.assert_allclose(matrix[0], matrix[1])
+        self.assertRaises(ValueError, clusters.add, make_recipe('milk', [('milk', 1, 'cup')]))
+
+    def test_fit_separates_families(self):
+        clusters = RatioClusters(k=2, batchSize=4, seed=3)
+        self.assertRaises(ValueError, clusters.fit)
+        clusters.add_many(self.recipes)
+        clusters.fit()
+        labels = clusters.labels()
+        self.assertEqual(len(set(labels[:6])), 1)
+        self.assertEqual(len(set(labels[6:])), 1)
+        self.assertNotEqual(labels[0], labels[6])
+        self.assertEqual(clusters.assign(sweet('new sweet', 5)), labels[0])
+        self.assertEqual(clusters.assign(savory('new savory', 5)), labels[6])
+        self.assertEqual(sorted(map(len, clusters.clusters())), [6, 6])
+        terms = [term for term, _ in clusters.describe(int(labels[0]), top=3)]
+        self.assertIn('white sugar', terms)
+        self.assertNotIn('white sugar', [term for term, _ in clusters.describe(int(labels[6]))])
+
+    def test_partial_fit(self):
+        clusters = RatioClusters(k=2, seed=1)
+        self.assertRaises(ValueError, clusters.labels)
+        self.assertEqual(clusters.partial_fit(self.recipes[:1]), [0])
+        self.assertRaises(ValueError, clusters.assign, sweet('sweet'))
+        # the centroids start here, only the added row is returned
+        self.assertEqual(clusters.partial_fit([self.recipes[6]]), [1])
+        # started from one recipe of each family
+        sweetCluster = clusters.assign(sweet('sweet'))
+        self.assertNotEqual(sweetCluster, clusters.assign(savory('savory')))
+        before = clusters.centroids()
+
+        # a new ingredient adds a column the centroids are padded for
+        spiced = make_recipe('spiced', [('cornmeal', 1, 'cup'), ('flour', 1, 'cup'),
+                                        ('white sugar', 1, 'cup'), ('butter', 0.5, 'cup'),
+                                        ('honey', 1, 'tablespoon')])
+        self.assertEqual(clusters.partial_fit(self.recipes[1:6] + [spiced]), [2, 3, 4, 5, 6, 7])
+        after = clusters.centroids()
+        self.assertEqual(after.shape, (2, len(clusters.vocabulary())))
+        # scaled variants share their ratios, only the honey column moves
+        np.testing.assert_allclose(after[:, :before.shape[1]], before)
+        honey = clusters.vocabulary().index('honey')
+        self.assertGreater(after[sweetCluster, honey], 0)
+        self.assertEqual(after[1 - sweetCluster, honey], 0)
+        self.assertEqual(clusters.assign(spiced), sweetCluster)
+
+    def test_running_mean(self):
+        # batches move a centroid to the mean of every recipe it absorbed
+        clusters = RatioClusters(k=1)
+        clusters.partial_fit(self.recipes[:3])
+        clusters.partial_fit(self.recipes[3:6])
+        np.testing.assert_allclose(clusters.centroids()[0], clusters.matrix().mean(axis=0))
+
+    def test_errors(self):
+        self.assertRaises(TypeError, RatioClusters, 2.0)
+        self.assertRaises(TypeError, RatioClusters, 2, True)
+        self.assertRaises(ValueError, RatioClusters, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,38 @@
+import os
+import unittest
+
+from batch_parser import parse_lines, local_nltk_data
+
+TAGGER_WEIGHTS = os.path.join(local_nltk_data, 'taggers',
+                              'averaged_perceptron_tagger_eng',
+                              'averaged_perceptron_tagger_eng.weights.json')
+
+
+class TestParseLines(unittest.TestCase):
+    def setUp(self):
+        self.lines = ['2 ½ cups flour', '1 cup cornmeal', '1 cup sugar',
+                      '1 ½ tablespoons baking powder', '1 teaspoon salt',
+                      '½ cup oil', '1 ¼ cups milk', '3 large eggs']
+
+    def test_parse_lines_validation(self):
+        self.assertEqual(parse_lines([]), [])
+        with self.assertRaises(TypeError):
+            parse_lines(['1 cup flour', 1])
+        with self.assertRaises(TypeError):
+            parse_lines(self.lines, workers='2')
+        with self.assertRaises(ValueError):
+            parse_lines(self.lines, workers=0)
+        with self.assertRaises(ValueError):
+            parse_lines(self.lines, workers=2, chunksize=0)
+
+    @unittest.skipUnless(os.path.exists(TAGGER_WEIGHTS),
+                         "NLTK tagger weights are not in nltk_data")
+    def test_parse_lines_keeps_order(self):
+        serial = parse_lines(self.lines, workers=1)
+        pooled = parse_lines(self.lines * 3, workers=2, chunksize=2)
+
+        self.assertEqual(len(pooled), len(self.lines) * 3)
+        for i, parsed in enumerate(pooled):
+            self.assertEqual(parsed.sentence, serial[i % len(self.lines)].sentence)
+            self.assertEqual(parsed.name[0].text,
+                             serial[i % len(self.lines)].name[0].text)
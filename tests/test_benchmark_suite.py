@@ -0,0 +1,51 @@
+import unittest
+
+from benchmarks import suite
+from benchmarks.corpora import load_corpus, SAMPLE_RECIPES
+
+
+class TestBenchmarkSuite(unittest.TestCase):
+    def test_corpora(self):
+        samples = load_corpus('samples')
+        self.assertEqual(len(samples['lines']), 28)
+        self.assertEqual(len(samples['ingredients']),
+                         sum(len(recipe['ingredients']) for recipe in SAMPLE_RECIPES))
+        self.assertGreater(len(load_corpus('synthetic')['ingredients']), 500)
+
+    def test_run_suite(self):
+        results = suite.run_suite(['samples'], ['construct', 'compare_recipe'], repeat=1)
+        self.assertEqual(list(results), ['samples/construct', 'samples/compare_recipe'])
+        self.assertEqual(results['samples/construct']['ops'], 24)
+        self.assertGreater(results['samples/construct']['seconds_per_op'], 0)
+        with self.assertRaises(ValueError):
+            suite.run_suite(['samples'], ['nothing'])
+
+    def test_stages_do_not_time_cache_hits(self):
+        corpus = load_corpus('samples')
+        prepared = suite._prepare(corpus)
+        suite.bench_compare_recipe(corpus, prepared)
+        recipe = prepared['recipes'][0]
+        other = prepared['recipes'][1]
+        cached = recipe._matchCache[(id(other), False)]
+        suite.bench_compare_recipe(corpus, prepared)
+        self.assertIsNot(recipe._matchCache[(id(other), False)], cached)
+
+        from density_table import get_density_table
+        suite.bench_density(corpus, prepared)
+        name = prepared['ingredients'][0].name()
+        cached = get_density_table().match(name)
+        suite.bench_density(corpus, prepared)
+        self.assertIsNot(get_density_table().match(name), cached)
+
+    def test_compare_results(self):
+        baseline = {'a/construct': {'seconds_per_op': 1.0, 'ops': 1},
+                    'a/density': {'seconds_per_op': 1.0, 'ops': 1},
+                    'a/parse': {'skipped': 'LookupError'}}
+        current = {'a/construct': {'seconds_per_op': 1.2, 'ops': 1},
+                   'a/density': {'seconds_per_op': 1.5, 'ops': 1},
+                   'a/parse': {'seconds_per_op': 9.0, 'ops': 1},
+                   'a/convert': {'seconds_per_op': 9.0, 'ops': 1}}
+        regressions = suite.compare_results(baseline, current, threshold=0.25)
+        self.assertEqual([key for key, *_ in regressions], ['a/density'])
+        self.assertEqual(suite.compare_results(baseline, current, threshold=0.1)[0][0],
+                         'a/construct')
@@ -0,0 +1,75 @@
+import io
+import json
+import os
+import subprocess
+import sys
+import unittest
+
+import cli
+from ingredient_class import Ingredient
+from recipe_class import Recipe
+from batch_parser import local_nltk_data
+from benchmarks.bench_import import PROJECT_ROOT
+
+TAGGER_WEIGHTS = os.path.join(local_nltk_data, 'taggers',
+                              'averaged_perceptron_tagger_eng',
+                              'averaged_perceptron_tagger_eng.weights.json')
+
+
+def make_recipe(title, names):
+    return Recipe.from_ingredients(title, '', [Ingredient(name, 1, 'cup') for name in names], '')
+
+
+class TestCli(unittest.TestCase):
+    def test_read_records(self):
+        stream = io.StringIO('{"title": "a", "ingredients": ["1 cup flour"]}\n'
+                             '\n'
+                             'not json\n'
+                             '{"title": "b"}\n'
+                             '{"title": "c", "ingredients": "1 cup flour"}\n'
+                             '[1]\n')
+        records = list(cli.read_records(stream))
+        self.assertEqual([number for number, _ in records], [1, 3, 4, 5, 6])
+        self.assertEqual(records[0][1]['title'], 'a')
+        for _, error in records[1:]:
+            self.assertIsInstance(error, cli.RecordError)
+        self.assertIn('ingredients', str(records[2][1]))
+
+    def test_iter_recipes_passes_errors_through(self):
+        error = cli.RecordError('bad')
+        self.assertEqual(list(cli.iter_recipes(iter([(1, error)]))), [(1, error)])
+
+    def test_compare_stream_reference(self):
+        recipes = [(1, make_recipe('base', ['flour', 'sugar'])),
+                   (2, cli.RecordError('bad')),
+                   (3, make_recipe('other', ['bread flour', 'milk']))]
+        results = list(cli.compare_stream(iter(recipes)))
+        self.assertEqual(results[0], {'line': 2, 'error': 'bad'})
+        self.assertEqual(results[1]['recipe'], 'other')
+        self.assertEqual(results[1]['other'], 'base')
+        self.assertEqual(results[1]['matched'], [['bread flour', 'flour']])
+        self.assertEqual(results[1]['only_recipe'], ['milk'])
+        self.assertEqual(results[1]['only_other'], ['sugar'])
+        self.assertAlmostEqual(results[1]['similarity'], 1 / 3)
+        json.dumps(results)
+
+    def test_compare_stream_pairs(self):
+        recipes = [(line, make_recipe(str(line), ['flour'])) for line in range(1, 4)]
+        results = list(cli.compare_stream(iter(recipes), mode='pairs'))
+        self.assertEqual([(r.get('recipe'), r.get('other')) for r in results],
+                         [('1', '2'), ('3', None)])
+        self.assertEqual(results[1]['error'], 'recipe has no pair')
+        with self.assertRaises(ValueError):
+            list(cli.compare_stream(iter(recipes), mode='nothing'))
+
+    @unittest.skipUnless(os.path.exists(TAGGER_WEIGHTS), 'NLTK tagger data not installed')
+    def test_main_streams_jsonl(self):
+        lines = [json.dumps({'title': title, 'source': '', 'steps': '',
+                             'ingredients': ['1 cup flour', '1 cup sugar']})
+                 for title in ('a', 'b', 'c')]
+        completed = subprocess.run([sys.executable, 'cli.py'], cwd=PROJECT_ROOT,
+                                   input='\n'.join(lines), capture_output=True,
+                                   text=True, check=True)
+        results = [json.loads(line) for line in completed.stdout.splitlines()]
+        self.assertEqual([result['recipe'] for result in results], ['b', 'c'])
+        self.assertEqual(results[0]['similarity'], 1.0)
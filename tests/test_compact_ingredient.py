@@ -0,0 +1,64 @@
+import pickle
+import unittest
+
+from ingredient_class import Ingredient
+from compact_ingredient import CompactIngredient, Unit, State, memory_report
+
+
+class TestCompactIngredient(unittest.TestCase):
+    def setUp(self):
+        self.flour = Ingredient('all-purpose Flour', 1, 'cup')
+        self.oil = Ingredient('extra-virgin Olive Oil', 100, 'ml')
+        self.compactFlour = self.flour.compact()
+        self.compactOil = self.oil.compact()
+
+    def test_accessors(self):
+        self.assertEqual(self.compactFlour.name(), 'all purpose flour')
+        self.assertEqual(self.compactFlour.kitchen_amount(), 1.0)
+        self.assertEqual(self.compactFlour.kitchen_measure(), 'cup')
+        self.assertEqual(self.compactFlour.metric_amount(), 125.0)
+        self.assertEqual(self.compactFlour.metric_measure(), 'g')
+        self.assertEqual(self.compactFlour.state(), 'solid')
+        self.assertEqual(self.compactFlour.keywords(), ('flour',))
+        self.assertEqual(self.compactFlour._kitchenUnit, Unit.CUP)
+        self.assertEqual(self.compactOil._state, State.LIQUID)
+        self.assertEqual(self.compactOil.metric_amount(), 100.0)
+        self.assertEqual(self.compactOil.metric_measure(), 'ml')
+        self.assertEqual(str(self.compactFlour), '1 cup all purpose flour')
+
+    def test_immutable(self):
+        with self.assertRaises(AttributeError):
+            self.compactFlour._name = 'sugar'
+        with self.assertRaises(AttributeError):
+            self.compactFlour.extra = 1
+        with self.assertRaises(AttributeError):
+            del self.compactFlour._name
+
+    def test_interned_and_equal(self):
+        other = Ingredient('flour', 2, 'cup').compact()
+        self.assertIs(other.keywords(), self.compactFlour.keywords())
+        self.assertEqual(Ingredient('all-purpose Flour', 1, 'cup').compact(), self.compactFlour)
+        self.assertNotEqual(other, self.compactFlour)
+        self.assertEqual(len({self.compactFlour, self.flour.compact()}), 1)
+        self.assertEqual(pickle.loads(pickle.dumps(self.compactFlour)), self.compactFlour)
+
+    def test_compare_ingredient(self):
+        self.assertTrue(self.compactFlour.compare_ingredient(Ingredient('bread flour', 1, 'cup')))
+        self.assertTrue(self.compactOil.compare_ingredient(Ingredient('vegetable oil', 1, 'cup').compact()))
+        self.assertFalse(self.compactOil.compare_ingredient(self.compactFlour))
+        # and the other way around, as both can be in one recipe
+        self.assertTrue(Ingredient('bread flour', 1, 'cup').compare_ingredient(self.compactFlour))
+        self.assertFalse(Ingredient('vegetable oil', 1, 'cup').compare_ingredient(self.compactFlour))
+        self.assertIs(self.compactFlour.keyword_set(),
+                      Ingredient('flour', 1, 'cup').keyword_set())
+        with self.assertRaises(TypeError):
+            Ingredient('flour', 1, 'cup').compare_ingredient('flour')
+
+    def test_memory_report(self):
+        full = [Ingredient('all-purpose Flour', 1, 'cup') for _ in range(100)]
+        compact = [ingredient.compact() for ingredient in full]
+        fullReport = memory_report(full)
+        compactReport = memory_report(compact)
+        self.assertEqual(fullReport['count'], 100)
+        self.assertLess(compactReport['bytes'], fullReport['bytes'] / 2)
+        self.assertEqual(memory_report([])['bytes_per_ingredient'], 0.0)
@@ -0,0 +1,27 @@
+import unittest
+from fractions import Fraction
+
+import comparisons
+from benchmarks.bench_normalize import SAMPLE_AMOUNTS
+
+
+class TestNormalize(unittest.TestCase):
+    def test_density_lookup(self):
+        self.assertEqual(comparisons.get_density_for_ingredient('Bread Flour'), 136)
+        self.assertIsNone(comparisons.get_density_for_ingredient('xyzzy'))
+
+    def test_fast_path_matches_pint(self):
+        for name, qty, unit in SAMPLE_AMOUNTS:
+            fast = comparisons.fast_normalize_amount(name, qty, unit)
+            if fast is None:
+                continue
+            self.assertEqual(fast, comparisons.pint_normalize_amount(name, qty, unit))
+        for unit in ('fluid_ounce', 'pint', 'quart', 'ounce', 'pound', 'liter', 'kilogram'):
+            self.assertEqual(comparisons.fast_normalize_amount('honey', Fraction(3, 2), unit),
+                             comparisons.pint_normalize_amount('honey', Fraction(3, 2), unit))
+
+    def test_fallback(self):
+        self.assertIsNone(comparisons.fast_normalize_amount('egg', Fraction(1), 'large'))
+        self.assertIsNone(comparisons.fast_normalize_amount('flour', '1-2', 'cup'))
+        self.assertEqual(comparisons.fast_normalize_amount('flour', Fraction(2), 'cup'),
+                         ('flour', '250.0 gram'))
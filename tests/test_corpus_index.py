@@ -0,0 +1,59 @@
+import unittest
+
+from ingredient_class import Ingredient
+from recipe_class import Recipe
+from corpus_index import RecipeCorpusIndex, ingredient_grams, mass_terms
+
+
+def make_recipe(title, ingredients):
+    return Recipe.from_ingredients(title, 'test', [Ingredient(*args) for args in ingredients], '')
+
+
+class TestRecipeCorpusIndex(unittest.TestCase):
+    def setUp(self):
+        self.sweet = make_recipe('sweet cornbread', [('flour', 1, 'cup'), ('cornmeal', 1, 'cup'),
+                                                     ('white sugar', 1, 'cup'), ('milk', 1, 'cup')])
+        self.savory = make_recipe('savory cornbread', [('cornmeal', 2, 'cup'), ('buttermilk', 1, 'cup'),
+                                                       ('butter', 4, 'tablespoon'), ('salt', 1, 'teaspoon')])
+        self.bread = make_recipe('bread', [('bread flour', 4, 'cup'), ('water', 1.5, 'cup'),
+                                           ('salt', 2, 'teaspoon')])
+        self.doubleSweet = make_recipe('double sweet cornbread', [('all-purpose flour', 2, 'cup'),
+                                                                  ('cornmeal', 2, 'cup'),
+                                                                  ('white sugar', 2, 'cup'),
+                                                                  ('milk', 2, 'cup')])
+        self.index = RecipeCorpusIndex()
+        self.index.add_many([self.sweet, self.savory, self.bread])
+
+    def test_mass_terms(self):
+        self.assertEqual(ingredient_grams(Ingredient('flour', 1, 'cup')), 125.0)
+        self.assertEqual(mass_terms(self.sweet.ingredients()),
+                         {'flour': 125.0, 'cornmeal': 140.0, 'white sugar': 200.0, 'milk': 240.0})
+
+    def test_top_k_cosine(self):
+        result = self.index.top_k(self.doubleSweet, k=2)
+        self.assertEqual([key for key, score in result], ['sweet cornbread', 'savory cornbread'])
+        # same proportions as sweet cornbread
+        self.assertAlmostEqual(result[0][1], 1.0)
+        self.assertLess(result[1][1], 1.0)
+
+    def test_top_k_l1(self):
+        result = self.index.top_k(self.doubleSweet, k=3, metric='l1')
+        self.assertEqual(result[0][0], 'sweet cornbread')
+        self.assertAlmostEqual(result[0][1], 1.0)
+        self.assertAlmostEqual(result[2][1], 0.0)
+
+    def test_top_k_many(self):
+        results = self.index.top_k_many([self.bread, self.savory], k=1)
+        self.assertEqual([result[0][0] for result in results], ['bread', 'savory cornbread'])
+        for result in results:
+            self.assertAlmostEqual(result[0][1], 1.0)
+
+        # the matrix is rebuilt after adding a recipe
+        self.index.add(self.doubleSweet)
+        self.assertEqual(len(self.index), 4)
+        self.assertEqual(len(self.index.top_k(self.sweet, k=10)), 4)
+
+        with self.assertRaises(ValueError):
+            self.index.top_k(self.sweet, metric='euclidean')
+        with self.assertRaises(ValueError):
+            self.index.top_k(self.sweet, k=0)
@@ -0,0 +1,120 @@
+import hashlib
+import unittest
+from fractions import Fraction
+
+import numpy as np
+
+from dedup import (DuplicateIndex, MinHasher, PRIME, choose_bands, deduplicate,
+                   estimate_jaccard, recipe_tokens, token_hash)
+from ingredient_class import Ingredient
+from recipe_class import Recipe
+
+
+def make_recipe(title, ingredients):
+    return Recipe.from_ingredients(title, 'test', [Ingredient(*args) for args in ingredients], '')
+
+CORNBREAD = [('cornmeal', 1, 'cup'), ('flour', 1, 'cup'), ('white sugar', 0.5, 'cup'),
+             ('butter', 0.5, 'cup'), ('milk', 1, 'cup'), ('baking powder', 1, 'tablespoon'),
+             ('salt', 1, 'teaspoon')]
+PANCAKES = [('flour', 1.5, 'cup'), ('milk', 1.25, 'cup'), ('butter', 3, 'tablespoon'),
+            ('white sugar', 1, 'tablespoon'), ('baking powder', 3.5, 'teaspoon'),
+            ('salt', 0.25, 'teaspoon')]
+
+
+class TestMinHash(unittest.TestCase):
+    def test_token_hash_is_stable(self):
+        self.assertEqual(token_hash('flour'), token_hash('flour'))
+        self.assertNotEqual(token_hash('flour'), token_hash('floor'))
+        digest = hashlib.blake2b(b'flour', digest_size=8).digest()
+        self.assertEqual(token_hash('flour'), int.from_bytes(digest, 'little'))
+
+    def test_signature(self):
+        hasher = MinHasher(64, seed=2)
+        self.assertEqual(len(hasher), 64)
+        first = hasher.signature({'a', 'b', 'c', 'd'})
+        self.assertEqual(first.shape, (64,))
+        self.assertTrue((first < PRIME).all())
+        np.testing.assert_array_equal(first, MinHasher(64, seed=2).signature(['d', 'c', 'b', 'a']))
+        self.assertEqual(estimate_jaccard(first, first), 1.0)
+        self.assertTrue((hasher.signature(()) == PRIME).all())
+        self.assertRaises(TypeError, MinHasher, 64.0)
+        self.assertRaises(ValueError, MinHasher, 0)
+
+    def test_estimate(self):
+        hasher = MinHasher(256)
+        first = {f'token {i}' for i in range(100)}
+        second = {f'token {i}' for i in range(25, 125)}
+        estimate = estimate_jaccard(hasher.signature(first), hasher.signature(second))
+        self.assertAlmostEqual(estimate, 75 / 125, delta=0.1)
+
+    def test_choose_bands(self):
+        bands, rows = choose_bands(0.8, 128)
+        self.assertEqual(bands * rows, 128)
+        self.assertLessEqual((1 / bands) ** (1 / rows), 0.8)
+        self.assertEqual(choose_bands(1.0, 128), (1, 128))
+        self.assertEqual(choose_bands(0.01, 128), (128, 1))
+        # no split reaches down to the threshold
+        self.assertEqual(choose_bands(0.5, 1), (1, 1))
+        self.assertEqual(choose_bands(0.005, 128), (128, 1))
+        self.assertEqual(DuplicateIndex(threshold=0.5, permutations=1).bands(),
+                         (1, 1))
+
+
+class TestDuplicateIndex(unittest.TestCase):
+    def test_tokens(self):
+        tokens = recipe_tokens(make_recipe('cornbread', CORNBREAD))
+        self.assertIn('cornmeal', tokens)
+        self.assertEqual(len(tokens), 2 * len(CORNBREAD))
+        # the same recipe written in other units
+        tablespoons = make_recipe('tablespoons', CORNBREAD[:2] + [('white sugar', 8, 'tablespoon')]
+                                  + CORNBREAD[3:])
+        self.assertEqual(recipe_tokens(tablespoons), tokens)
+
+    def test_count_tokens(self):
+        # counts such as 3 eggs come from rebuilt ingredients, a stored row
+        # or a decoded buffer
+        def with_eggs(count):
+            eggs = Ingredient.from_fields('egg', count, None, None, None,
+                                          'thing', None)
+            return Recipe.from_ingredients(
+                'cornbread', 'test',
+                [Ingredient(*args) for args in CORNBREAD] + [eggs], '')
+        three = recipe_tokens(with_eggs(Fraction(3)))
+        self.assertEqual(len(three), 2 * len(CORNBREAD) + 2)
+        self.assertIn('egg#6', three)
+        self.assertIn('egg#0', recipe_tokens(with_eggs(Fraction(1))))
+        self.assertEqual(three - recipe_tokens(with_eggs(None)), {'egg#6'})
+
+    def test_streaming(self):
+        index = DuplicateIndex(threshold=0.7)
+        self.assertEqual(index.add(make_recipe('cornbread', CORNBREAD)), [])
+        self.assertEqual(index.add(make_recipe('pancakes', PANCAKES)), [])
+        # trivial edit: salt left out and all-purpose flour
+        copy = make_recipe('cornbread copy', [('cornmeal', 1, 'cup'), ('all-purpose flour', 1, 'cup')]
+                           + CORNBREAD[2:-1])
+        matches = index.add(copy)
+        self.assertEqual([key for key, _ in matches], ['cornbread'])
+        self.assertGreaterEqual(matches[0][1], 0.7)
+        self.assertEqual([key for key, _ in index.query(make_recipe('again', CORNBREAD))],
+                         ['cornbread', 'cornbread copy'])
+        self.assertEqual(len(index), 3)
+        self.assertEqual(index.keys(), ['cornbread', 'pancakes', 'cornbread copy'])
+        self.assertEqual([pair[:2] for pair in index.duplicate_pairs()],
+                         [('cornbread', 'cornbread copy')])
+        self.assertIn((0, 2), index.candidate_pairs())
+
+    def test_deduplicate(self):
+        recipes = [make_recipe('cornbread', CORNBREAD), make_recipe('pancakes', PANCAKES),
+                   make_recipe('cornbread', CORNBREAD),
+                   make_recipe('pancakes copy', PANCAKES[:-1])]
+        self.assertEqual([recipe.title() for recipe in deduplicate(recipes)],
+                         ['cornbread', 'pancakes'])
+
+    def test_errors(self):
+        self.assertRaises(TypeError, DuplicateIndex, '0.8')
+        self.assertRaises(ValueError, DuplicateIndex, 0)
+        self.assertRaises(ValueError, DuplicateIndex, 1.5)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,115 @@
+import json
+import unittest
+
+from density_table import (DensityTable, get_density_table, DENSITY_FILE,
+                           MATCH_PATHS)
+
+
+class TestDensityTable(unittest.TestCase):
+    def setUp(self):
+        with open(DENSITY_FILE, 'r') as f:
+            self.densities = json.load(f)
+        self.table = DensityTable(self.densities)
+
+    def _linear_lookup(self, name):
+        # the original per-ingredient lookup, used as the reference result
+        try:
+            return self.densities[name]
+        except KeyError:
+            for key in sorted(self.densities.keys(), key=len, reverse=True):
+                if key in name:
+                    return self.densities[key]
+            return None
+
+    def test_exact_match(self):
+        self.assertEqual(self.table.lookup('flour'), {'density': 125, 'state': 'solid'})
+        self.assertEqual(self.table.lookup('bread flour')['density'], 136)
+        self.assertIn('buttermilk', self.table)
+        self.assertNotIn('_comment', self.table)
+
+    def test_longest_substring_match(self):
+        self.assertEqual(self.table.lookup('extra dark brown sugar')['density'], 230)
+        self.assertEqual(self.table.lookup('all purpose flour'), self.densities['flour'])
+        self.assertEqual(self.table.lookup('cold buttermilk'), self.densities['buttermilk'])
+        self.assertIsNone(self.table.lookup('large eggs'))
+        self.assertIsNone(self.table.lookup(''))
+
+    def test_matches_linear_scan(self):
+        names = ['fine cornmeal', 'unsalted butter melted and slightly cooled',
+                 'packed light or dark brown sugar', 'honey', 'baking soda',
+                 'yellow cornmeal', 'white sugar', 'vegetable oil', 'oil',
+                 'semisweet chocolate chips', 'chopped toasted pecans',
+                 'whole milk', 'kosher salt', 'egg']
+        names += [f"extra {key} to taste" for key in self.densities if key != '_comment']
+        for name in names:
+            self.assertEqual(self.table.lookup(name), self._linear_lookup(name), name)
+
+    def test_match_paths(self):
+        exact = self.table.match('buttermilk')
+        self.assertEqual((exact.key, exact.path, exact.score),
+                         ('buttermilk', 'exact', 1.0))
+        self.assertIs(exact.details, self.densities['buttermilk'])
+
+        # a misspelling finds buttermilk, not the substring butter
+        fuzzy = self.table.match('buttermik')
+        self.assertEqual((fuzzy.key, fuzzy.path), ('buttermilk', 'fuzzy'))
+        self.assertGreater(fuzzy.score, 0.6)
+        self.assertEqual(self.table.lookup('buttermik'), self.densities['butter'])
+        # a key that only adds words to the name is another ingredient
+        for name in ('cream', 'pepper', 'rice', 'onion', 'oats'):
+            self.assertEqual(self.table.match(name).path, 'miss', name)
+
+        # a key made of whole words of the name is not overridden by a
+        # similar key
+        for name, key in (('chopped kale', 'kale'),
+                          ('salted milk powder', 'milk powder'),
+                          ('nonfat flour', 'flour'),
+                          ('chopped applesauce', 'applesauce'),
+                          ('chopped packed spinach', 'packed spinach'),
+                          ('chopped hazelnuts', 'hazelnuts'),
+                          ('whole oat flour', 'oat flour'),
+                          ('light or dark brown sugar', 'dark brown sugar'),
+                          ('shredded cheddar cheese', 'cheddar cheese')):
+            result = self.table.match(name)
+            self.assertEqual((result.key, result.path), (key, 'word'), name)
+
+        reordered = self.table.match('flour, all purpose')
+        self.assertEqual((reordered.key, reordered.path, reordered.score),
+                         ('all-purpose flour', 'fuzzy', 1.0))
+
+        word = self.table.match('unsalted butter, melted')
+        self.assertEqual((word.key, word.path), ('butter', 'word'))
+        self.assertEqual(self.table.match('fine bread flour').key, 'bread flour')
+
+        substring = self.table.match('sugarcane')
+        self.assertEqual((substring.key, substring.path), ('sugar', 'substring'))
+
+        miss = self.table.match('large eggs')
+        self.assertEqual((miss.key, miss.details, miss.path, miss.score),
+                         (None, None, 'miss', 0.0))
+        for result in (exact, fuzzy, word, substring, miss):
+            self.assertIn(result.path, MATCH_PATHS)
+
+    def test_match_threshold(self):
+        self.assertEqual(self.table.match('buttermik', threshold=0.9).path,
+                         'substring')
+        self.assertIs(self.table.match('buttermik'),
+                      self.table.match('buttermik'))
+        self.assertEqual(self.table.similar('brwn sugar', limit=1)[0][1],
+                         'brown sugar')
+        with self.assertRaises(TypeError):
+            self.table.match(None)
+
+    def test_shared_table(self):
+        self.assertIs(get_density_table(), get_density_table())
+        self.assertEqual(len(get_density_table()), len(self.densities) - 1)
+
+    def test_missing_file(self):
+        table = DensityTable.from_file('does_not_exist.json')
+        self.assertEqual(len(table), 0)
+        self.assertIsNone(table.lookup('flour'))
+
+        with self.assertRaises(TypeError):
+            self.table.lookup(None)
+        with self.assertRaises(TypeError):
+            DensityTable(['flour'])
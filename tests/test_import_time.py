@@ -0,0 +1,28 @@
+import unittest
+
+from benchmarks.bench_import import import_times, MODULES, HEAVY_MODULES
+
+# generous so a slow machine does not fail, importing the parser alone takes
+# several times longer
+IMPORT_BUDGET_MS = 150
+
+
+class TestImportTime(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.times = import_times()
+
+    def test_heavy_modules_are_lazy(self):
+        for module in HEAVY_MODULES:
+            self.assertNotIn(module, self.times)
+
+    def test_import_budget(self):
+        total = sum(self.times[module] for module in MODULES
+                    if module in self.times)
+        self.assertLess(total / 1000, IMPORT_BUDGET_MS)
+
+    def test_bootstrap_loads_on_use(self):
+        import bootstrap
+        import comparisons
+        self.assertIs(bootstrap.get_unit_registry(), bootstrap.get_unit_registry())
+        self.assertEqual(comparisons.get_density_for_ingredient('Flour'), 125)
@@ -69,12 +69,12 @@ class TestIngredient(unittest.TestCase):
         self.assertEqual(litreWater.kitchen_measure(), 'cup')
 
         # test keywords
-        self.assertEqual(self.extraDarkBrownSugar.keywords(), ['brown sugar'])
-        self.assertEqual(self.flour.keywords(), ['flour'])
-        self.assertEqual(self.extraVirginOliveOil.keywords(), ['olive', 'oil'])
-        self.assertEqual(self.whiteSugar.keywords(), ['white sugar'])
-        self.assertEqual(self.icingSugar.keywords(), ['icing', 'sugar'])
-        self.assertEqual(self.allPurposeFlour.keywords(), ['flour'])
+        self.assertEqual(self.extraDarkBrownSugar.keywords(), ('brown sugar',))
+        self.assertEqual(self.flour.keywords(), ('flour',))
+        self.assertEqual(self.extraVirginOliveOil.keywords(), ('olive', 'oil'))
+        self.assertEqual(self.whiteSugar.keywords(), ('white sugar',))
+        self.assertEqual(self.icingSugar.keywords(), ('icing', 'sugar'))
+        self.assertEqual(self.allPurposeFlour.keywords(), ('flour',))
 
 
     def test_verify_amount(self):
@@ -163,6 +163,9 @@ class TestIngredient(unittest.TestCase):
         self.assertEqual(self.flour._density, 125)
         flour4 = Ingredient('bread flour', 1, 'cup', 'solid')
         self.assertEqual(flour4._density, 136)
+        # misspelled names still find their density
+        self.assertEqual(Ingredient('buttermik', 1, 'cup')._density, 240)
+        self.assertEqual(Ingredient('vegtable oil', 1, 'cup')._state, 'liquid')
 
     def test_convert_to_metric(self):
         # solid conversion
@@ -0,0 +1,66 @@
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+
+import instrumentation
+from ingredient_class import Ingredient
+from recipe_class import Recipe
+from density_table import get_density_table
+from benchmarks.bench_import import PROJECT_ROOT
+
+
+class TestInstrumentation(unittest.TestCase):
+    def setUp(self):
+        instrumentation.reset()
+        instrumentation.enable()
+
+    def tearDown(self):
+        instrumentation.disable()
+        instrumentation.reset()
+
+    def test_disabled_records_nothing(self):
+        instrumentation.disable()
+        Ingredient('flour', 1, 'cup')
+        instrumentation.count('anything')
+        with instrumentation.span('block'):
+            pass
+        self.assertEqual(instrumentation.stats(), {'spans': {}, 'counters': {}})
+
+    def test_spans_and_counters(self):
+        flour = Ingredient('bread flour', 1, 'cup')
+        Ingredient('fine bread flour', 100, 'g')
+        get_density_table().lookup('mystery dust')
+        flour._convert_to_kitchen()
+        with instrumentation.span('block'):
+            pass
+        recipe = Recipe.from_ingredients('a', '', [flour], '')
+        with self.assertRaises(Exception):
+            recipe.compare_recipe(Recipe.from_ingredients('b', '', [], ''))
+
+        stats = instrumentation.stats()
+        self.assertEqual(stats['counters'], {'density.exact': 1, 'density.miss': 1,
+                                             'density.word': 1})
+        spans = stats['spans']
+        self.assertEqual(spans['ingredient.density_and_state']['calls'], 2)
+        self.assertEqual(spans['ingredient.convert_to_kitchen']['calls'], 2)
+        self.assertEqual(spans['ingredient.convert_to_metric']['calls'], 1)
+        self.assertEqual(spans['block']['calls'], 1)
+        # a call that raises is still timed
+        self.assertEqual(spans['recipe.compare_recipe']['calls'], 1)
+        self.assertGreaterEqual(spans['block']['max'], 0)
+
+    def test_dump_at_exit(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'stats.json')
+            environment = dict(os.environ, RECIPE_INSTRUMENT_DUMP=path)
+            subprocess.run([sys.executable, '-c',
+                            "from ingredient_class import Ingredient; "
+                            "Ingredient('flour', 1, 'cup')"],
+                           cwd=PROJECT_ROOT, env=environment, check=True)
+            with open(path) as file:
+                stats = json.load(file)
+        self.assertEqual(stats['counters'], {'density.exact': 1})
+        self.assertEqual(stats['spans']['ingredient.convert_to_metric']['calls'], 1)
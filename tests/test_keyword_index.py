@@ -0,0 +1,90 @@
+import unittest
+
+from ingredient_class import Ingredient
+from keyword_index import KeywordIndex
+
+
+class TestKeywordIndex(unittest.TestCase):
+    def setUp(self):
+        self.flour = Ingredient('flour', 1, 'cup')
+        self.cornmeal = Ingredient('yellow cornmeal', 1, 'cup')
+        self.whiteSugar = Ingredient('white sugar', 1, 'cup')
+        self.milk = Ingredient('milk', 1, 'cup')
+        self.vegOil = Ingredient('vegetable oil', '½', 'cup')
+        self.bakingPowder = Ingredient('baking powder', 3.5, 'teaspoon')
+
+        self.oliveOil = Ingredient('extra-virgin olive oil', 100, 'ml')
+        self.breadFlour = Ingredient('bread flour', 2, 'cup')
+        self.buttermilk = Ingredient('buttermilk', 1, 'cup')
+        self.oilPowder = Ingredient('coconut oil powder', 1, 'tablespoon')
+
+        self.index = KeywordIndex([self.flour, self.cornmeal, self.whiteSugar,
+                                   self.milk, self.vegOil, self.bakingPowder])
+
+    def _nested_scan(self, ingredients, others):
+        # reference greedy matching by scanning the other list
+        others = list(others)
+        pairs = []
+        for ingredient in ingredients:
+            for i in range(len(others)):
+                if ingredient.compare_ingredient(others[i]):
+                    pairs.append((ingredient, others.pop(i)))
+                    break
+            else:
+                pairs.append((ingredient, None))
+        return pairs + [(None, other) for other in others]
+
+    def test_candidates(self):
+        self.assertEqual(self.index.candidates(self.breadFlour), {0})
+        self.assertEqual(self.index.candidates(self.oliveOil), {4})
+        self.assertEqual(self.index.candidates(self.buttermilk), set())
+        self.assertEqual(len(self.index), 6)
+
+    def test_greedy_match_same_as_scan(self):
+        ingredients = [self.oilPowder, self.oliveOil, self.breadFlour,
+                       self.buttermilk, self.flour]
+        others = [self.flour, self.cornmeal, self.whiteSugar, self.milk,
+                  self.vegOil, self.bakingPowder]
+        self.assertEqual(self.index.match(ingredients),
+                         self._nested_scan(ingredients, others))
+
+    def test_optimal_match(self):
+        # greedy gives vegetable oil to the powder, leaving olive oil unmatched
+        index = KeywordIndex([self.vegOil, self.bakingPowder])
+        greedy = index.match([self.oilPowder, self.oliveOil])
+        self.assertEqual(greedy, [(self.oilPowder, self.vegOil),
+                                  (self.oliveOil, None),
+                                  (None, self.bakingPowder)])
+
+        optimal = index.match([self.oilPowder, self.oliveOil], optimal=True)
+        self.assertEqual(optimal, [(self.oilPowder, self.bakingPowder),
+                                   (self.oliveOil, self.vegOil)])
+
+        self.assertEqual(index.match([self.buttermilk], optimal=True),
+                         [(self.buttermilk, None), (None, self.vegOil),
+                          (None, self.bakingPowder)])
+
+    def test_remove_and_replace(self):
+        self.assertIs(self.index.remove(0), self.flour)
+        self.assertEqual(self.index.candidates(self.breadFlour), set())
+
+        self.assertIs(self.index.replace(3, self.buttermilk), self.milk)
+        self.assertEqual(self.index.candidates(self.buttermilk), {3})
+        self.assertEqual(self.index.slots(), [1, 2, 3, 4, 5])
+
+        self.assertEqual(self.index.add(self.breadFlour), 6)
+        self.assertEqual(self.index.candidates(self.flour), {6})
+
+        with self.assertRaises(KeyError):
+            self.index.remove(0)
+
+    def test_assign_from_start(self):
+        ingredients = [self.breadFlour, self.oliveOil, self.buttermilk]
+        assigned = self.index.assign(ingredients)
+        self.assertEqual(assigned, {0: 0, 1: 4})
+        # only the ingredients from start on are matched again
+        edited = [self.breadFlour, self.milk, self.flour]
+        self.assertEqual(self.index.assign(edited, assigned=assigned, start=1),
+                         self.index.assign(edited))
+        self.assertEqual(self.index.pairs(edited, {0: 0, 1: 3}),
+                         self.index.match(edited))
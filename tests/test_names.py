@@ -0,0 +1,58 @@
+import unittest
+
+import names
+from names import clean_name, normalize_name, intern_keywords, FILLER_WORDS
+from ingredient_class import Ingredient
+from compact_ingredient import CompactIngredient
+
+
+class TestNames(unittest.TestCase):
+    def test_clean_name(self):
+        self.assertEqual(clean_name('All-Purpose Flour'), 'all purpose flour')
+        self.assertEqual(clean_name('Flour'), 'flour')
+        self.assertEqual(clean_name('extra_virgin olive oil!'), 'extra virgin olive oil')
+        with self.assertRaises(TypeError):
+            clean_name(None)
+
+    def test_normalize_name(self):
+        name, keywords, keywordSet = normalize_name('All-Purpose Flour')
+        self.assertEqual(name, 'all purpose flour')
+        self.assertEqual(keywords, ('flour',))
+        self.assertEqual(keywordSet, frozenset(['flour']))
+        self.assertEqual(normalize_name('light brown sugar')[1], ('brown sugar',))
+        self.assertEqual(normalize_name('white sugar')[1], ('white sugar',))
+        self.assertEqual(normalize_name('icing sugar')[1], ('icing', 'sugar'))
+        self.assertIsInstance(FILLER_WORDS, frozenset)
+        with self.assertRaises(TypeError):
+            normalize_name(['flour'])
+
+    def test_shared_objects(self):
+        first = normalize_name('unsalted butter')
+        second = normalize_name('unsalted butter')
+        for a, b in zip(first, second):
+            self.assertIs(a, b)
+        # a different raw name with the same keywords shares the keywords
+        self.assertIs(normalize_name('Butter, melted')[1], first[1])
+        self.assertIs(intern_keywords(['butter']), first[1])
+
+        flour = Ingredient('all-purpose Flour', 1, 'cup')
+        otherFlour = Ingredient('All-Purpose flour', 2, 'cup')
+        self.assertIs(flour._name, otherFlour._name)
+        self.assertIs(flour._keywords, otherFlour._keywords)
+        self.assertIs(flour._keywordSet, otherFlour._keywordSet)
+        self.assertIs(CompactIngredient.from_ingredient(flour).keywords(),
+                      flour._keywords)
+
+    def test_keywords_are_shared(self):
+        flour = Ingredient('flour', 1, 'cup')
+        self.assertEqual(flour.keywords(), ('flour',))
+        self.assertIs(flour.keywords(), Ingredient('flour', 2, 'cup').keywords())
+
+    def test_cache_info(self):
+        normalize_name('bread flour')
+        info = names.cache_info()
+        self.assertGreater(info['names']['hits'] + info['names']['misses'], 0)
+        self.assertEqual(info['names']['maxsize'], names.NAME_CACHE_SIZE)
+
+if __name__ == '__main__':
+    unittest.main()
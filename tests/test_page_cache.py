@@ -0,0 +1,127 @@
+import os
+import tempfile
+import threading
+import unittest
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+from page_cache import PageCache
+from recipe_fetcher import RecipeFetcher
+
+PAGE = "<html><body>" + "cornbread " * 500 + "</body></html>"
+ETAG = '"cornbread-v1"'
+
+
+class ETagHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        self.server.requests.append((self.path, self.headers.get('If-None-Match')))
+        if self.headers.get('If-None-Match') == ETAG:
+            self.send_response(304)
+            self.send_header('ETag', ETAG)
+            self.end_headers()
+            return
+        data = PAGE.encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(data)))
+        self.send_header('ETag', ETAG)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+
+class EvictingCache(PageCache):
+    """
+    cache whose pages are removed between the read and the revalidation
+    """
+    def revalidated(self, url, headers):
+        os.remove(self._url_path(url))
+        return super().revalidated(url, headers)
+
+
+class TestPageCache(unittest.TestCase):
+    def setUp(self):
+        self.tempDir = tempfile.TemporaryDirectory()
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), ETagHandler)
+        self.server.requests = []
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.base = f"http://127.0.0.1:{self.server.server_address[1]}"
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        self.tempDir.cleanup()
+
+    def test_put_and_get(self):
+        cache = PageCache(self.tempDir.name)
+        self.assertIsNone(cache.get('https://example.com/a'))
+        cache.put('https://example.com/a', PAGE, {'ETag': ETAG})
+        cache.put('https://example.com/b', PAGE, {})
+
+        page = cache.get('https://example.com/a')
+        self.assertEqual(page.text, PAGE)
+        self.assertTrue(cache.is_fresh(page))
+        self.assertEqual(cache.conditional_headers(page), {'If-None-Match': ETAG})
+
+        # both urls share one compressed body
+        objects = os.listdir(os.path.join(self.tempDir.name, 'objects'))
+        self.assertEqual(len(objects), 1)
+        size = os.path.getsize(os.path.join(self.tempDir.name, 'objects', objects[0]))
+        self.assertLess(size, len(PAGE) / 10)
+
+        with self.assertRaises(ValueError):
+            PageCache(self.tempDir.name, ttl=-1)
+
+    def test_host_ttl(self):
+        cache = PageCache(self.tempDir.name, ttl=100, hostTtls={'Example.com': 0})
+        self.assertEqual(cache.ttl_for('https://example.com/a'), 0)
+        self.assertEqual(cache.ttl_for('https://other.com/a'), 100)
+
+    def test_fetch_through_cache(self):
+        url = f"{self.base}/recipe"
+        cache = PageCache(self.tempDir.name, ttl=3600)
+        with RecipeFetcher(cache=cache) as fetcher:
+            first = fetcher.fetch(url)
+            second = fetcher.fetch(url)
+        self.assertFalse(first.fromCache)
+        self.assertTrue(second.fromCache)
+        self.assertEqual(second.text, PAGE)
+        self.assertEqual(len(self.server.requests), 1)
+
+    def test_revalidation(self):
+        url = f"{self.base}/recipe"
+        cache = PageCache(self.tempDir.name, ttl=0)
+        with RecipeFetcher(cache=cache) as fetcher:
+            fetcher.fetch(url)
+            result = fetcher.fetch(url)
+        self.assertTrue(result.fromCache)
+        self.assertEqual(result.text, PAGE)
+        self.assertEqual(self.server.requests, [('/recipe', None), ('/recipe', ETAG)])
+
+    def test_revalidation_after_eviction(self):
+        url = f"{self.base}/recipe"
+        cache = EvictingCache(self.tempDir.name, ttl=0)
+        with RecipeFetcher(cache=cache) as fetcher:
+            fetcher.fetch(url)
+            result = fetcher.fetch(url)
+        self.assertTrue(result.ok())
+        self.assertFalse(result.fromCache)
+        self.assertEqual((result.status, result.text), (200, PAGE))
+        self.assertEqual(cache.get(url).text, PAGE)
+        self.assertEqual(self.server.requests, [('/recipe', None), ('/recipe', ETAG),
+                                                ('/recipe', None)])
+
+    def test_offline(self):
+        url = f"{self.base}/recipe"
+        with RecipeFetcher(cache=PageCache(self.tempDir.name, ttl=0)) as fetcher:
+            fetcher.fetch(url)
+
+        offline = PageCache(self.tempDir.name, ttl=0, offline=True)
+        with RecipeFetcher(cache=offline) as fetcher:
+            results = list(fetcher.fetch_all([url, f"{self.base}/other"]))
+        results = {result.url: result for result in results}
+        self.assertEqual(results[url].text, PAGE)
+        self.assertFalse(results[f"{self.base}/other"].ok())
+        self.assertEqual(results[f"{self.base}/other"].attempts, 0)
+        self.assertEqual(len(self.server.requests), 1)
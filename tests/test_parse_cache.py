@@ -0,0 +1,74 @@
+import os
+import tempfile
+import unittest
+
+from parse_cache import ParseCache, normalize_line
+
+
+class TestParseCache(unittest.TestCase):
+    def setUp(self):
+        self.tempDir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tempDir.name, 'parses.sqlite3')
+
+    def tearDown(self):
+        self.tempDir.cleanup()
+
+    def test_normalize_line(self):
+        self.assertEqual(normalize_line('  1 teaspoon\tsalt '), '1 teaspoon salt')
+        self.assertEqual(normalize_line('1 large  egg'), '1 large egg')
+        # decomposed and composed accents share a key
+        self.assertEqual(normalize_line('1 cup créme fraiche'),
+                         normalize_line('1 cup créme fraiche'))
+        with self.assertRaises(TypeError):
+            normalize_line(None)
+
+    def test_memory_tier(self):
+        cache = ParseCache(maxsize=2)
+        self.assertIsNone(cache.get('1 cup milk'))
+        cache.put('1 cup milk', {'name': 'milk'})
+        self.assertEqual(cache.get(' 1  cup milk'), {'name': 'milk'})
+
+        # least recently used line is evicted
+        cache.put('1 teaspoon salt', {'name': 'salt'})
+        cache.get('1 cup milk')
+        cache.put('1 large egg', {'name': 'egg'})
+        self.assertEqual(len(cache), 2)
+        self.assertIsNone(cache.get('1 teaspoon salt'))
+        self.assertEqual(cache.get('1 large egg'), {'name': 'egg'})
+
+        stats = cache.stats()
+        self.assertEqual(stats['memory_hits'], 3)
+        self.assertEqual(stats['misses'], 2)
+        self.assertEqual(stats['disk_hits'], 0)
+
+        with self.assertRaises(ValueError):
+            ParseCache(maxsize=0)
+
+    def test_disk_tier_survives_restart(self):
+        cache = ParseCache(self.path, version='1.0')
+        cache.put('1 cup milk', {'name': 'milk'})
+        cache.close()
+
+        cache = ParseCache(self.path, version='1.0')
+        self.assertEqual(cache.get('1 cup milk'), {'name': 'milk'})
+        self.assertEqual(cache.get('1 cup milk'), {'name': 'milk'})
+        self.assertEqual(cache.stats()['disk_hits'], 1)
+        self.assertEqual(cache.stats()['memory_hits'], 1)
+        cache.close()
+
+    def test_version_invalidates_disk_tier(self):
+        cache = ParseCache(self.path, version='1.0')
+        cache.put('1 cup milk', {'name': 'milk'})
+        cache.close()
+
+        cache = ParseCache(self.path, version='2.0')
+        self.assertIsNone(cache.get('1 cup milk'))
+        cache.close()
+
+    def test_clear(self):
+        cache = ParseCache(self.path, version='1.0')
+        cache.put('1 cup milk', {'name': 'milk'})
+        cache.clear()
+        self.assertIsNone(cache.get('1 cup milk'))
+        self.assertEqual(cache.stats()['misses'], 1)
+        cache.close()
@@ -0,0 +1,85 @@
+import multiprocessing
+import os
+import unittest
+
+import parser_pool
+from parser_pool import ParserPool, close_parser_pool, get_parser_pool
+
+
+def _shout(line):
+    return (line.upper(), os.getpid())
+
+def _shout_loader():
+    return _shout
+
+def _missing_loader():
+    raise LookupError('averaged_perceptron_tagger_eng not found')
+
+
+class TestParserPool(unittest.TestCase):
+    def test_parse_keeps_order(self):
+        lines = [f'{number} cup flour' for number in range(50)]
+        with ParserPool(workers=2, loader=_shout_loader) as pool:
+            self.assertTrue(pool.wait_ready(timeout=30))
+            parsed = pool.parse(lines)
+            self.assertEqual([text for text, _ in parsed], [line.upper() for line in lines])
+            self.assertEqual(pool.parse([]), [])
+            pending = pool.parse_async(lines[:3], chunksize=1)
+            self.assertEqual([text for text, _ in pending.get(30)],
+                             ['0 CUP FLOUR', '1 CUP FLOUR', '2 CUP FLOUR'])
+            self.assertTrue(pending.ready())
+            stats = pool.stats()
+            self.assertEqual(stats['workers'], 2)
+            self.assertEqual(stats['started'], 2)
+            self.assertEqual(stats['lines'], 53)
+            # 50 lines are about four batches per worker, no lines no batch
+            self.assertEqual(stats['tasks'], 8 + 0 + 3)
+        self.assertTrue(pool.is_closed())
+        self.assertRaises(ValueError, pool.parse, lines)
+
+    def test_workers_are_reused_and_recycled(self):
+        lines = ['1 cup flour'] * 6
+        with ParserPool(workers=1, maxTasksPerChild=None, loader=_shout_loader) as pool:
+            pids = {pid for _, pid in pool.parse(lines, chunksize=1)}
+            self.assertEqual(len(pids), 1)
+        with ParserPool(workers=1, maxTasksPerChild=2, loader=_shout_loader) as pool:
+            pids = {pid for _, pid in pool.parse(lines, chunksize=1)}
+            self.assertEqual(len(pids), 3)
+            # the replacements loaded the parser again
+            self.assertTrue(pool.wait_ready(3, timeout=30))
+            self.assertGreaterEqual(pool.stats()['started'], 3)
+            self.assertFalse(pool.wait_ready(100, timeout=0.1))
+
+    def test_load_failure(self):
+        with ParserPool(workers=2, loader=_missing_loader) as pool:
+            self.assertTrue(pool.wait_ready(timeout=30))
+            with self.assertRaises(LookupError):
+                pool.parse_async(['1 cup flour']).get(30)
+
+    def test_errors(self):
+        self.assertRaises(TypeError, ParserPool, 2.0)
+        self.assertRaises(ValueError, ParserPool, 0)
+        self.assertRaises(ValueError, ParserPool, 1, 0)
+        with ParserPool(workers=1, loader=_shout_loader) as pool:
+            self.assertRaises(TypeError, pool.parse, ['1 cup flour', 1])
+            self.assertRaises(ValueError, pool.parse, ['1 cup flour'], 0)
+            self.assertRaises(multiprocessing.TimeoutError,
+                              pool.parse_async(['1 cup flour'] * 10000).get, 0)
+
+    def test_shared_pool(self):
+        self.addCleanup(close_parser_pool)
+        pool = get_parser_pool(2)
+        self.assertIs(get_parser_pool(2), pool)
+        # another size gets its own pool and leaves the first one running
+        other = get_parser_pool(1)
+        self.assertIsNot(other, pool)
+        self.assertFalse(pool.is_closed())
+        self.assertIs(get_parser_pool(2), pool)
+        close_parser_pool()
+        self.assertTrue(pool.is_closed())
+        self.assertTrue(other.is_closed())
+        self.assertEqual(parser_pool._sharedPools, {})
+
+
+if __name__ == '__main__':
+    unittest.main()
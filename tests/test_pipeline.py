@@ -0,0 +1,181 @@
+import threading
+import time
+import unittest
+from concurrent.futures.process import BrokenProcessPool
+
+import parse_cache
+from parse_cache import ParseCache
+from pipeline import INLINE, PROCESS, Pipeline, Stage, build_recipe
+
+
+def double(item):
+    return item * 2
+
+def odd_only(item):
+    return item if item % 2 else None
+
+def fail_on_three(item):
+    if item == 3:
+        raise ValueError('three')
+    return item
+
+def broken_initializer():
+    raise RuntimeError('no parser model')
+
+
+class _Amount:
+    def __init__(self, quantity, unit):
+        self.quantity = quantity
+        self.unit = unit
+
+class _Text:
+    def __init__(self, text):
+        self.text = text
+
+class _Parsed:
+    def __init__(self, name, quantity, unit):
+        self.name = [_Text(name)]
+        self.amount = [_Amount(quantity, unit)] if quantity else []
+
+
+class TestStage(unittest.TestCase):
+    def test_errors(self):
+        self.assertRaises(TypeError, Stage, 1, double)
+        self.assertRaises(ValueError, Stage, 'double', double, 'coroutine')
+        self.assertRaises(TypeError, Stage, 'double', double, workers=1.0)
+        self.assertRaises(ValueError, Stage, 'double', double, workers=0)
+        self.assertRaises(ValueError, Stage, 'double', double, queueSize=0)
+        self.assertEqual(Stage('store', double, INLINE, workers=4).workers, 1)
+
+
+class TestPipeline(unittest.TestCase):
+    def test_errors(self):
+        self.assertRaises(ValueError, Pipeline, [])
+        self.assertRaises(TypeError, Pipeline, [double])
+        self.assertRaises(ValueError, Pipeline, [Stage('a', double), Stage('a', double)])
+        self.assertRaises(ValueError, Pipeline, [Stage('a', double, INLINE), Stage('b', double)])
+
+    def test_threads(self):
+        pipeline = Pipeline([Stage('check', fail_on_three, workers=3), Stage('odd', odd_only)],
+                            queueSize=2)
+        # None source items are skipped
+        self.assertEqual(sorted(pipeline.run(list(range(10)) + [None])), [1, 5, 7, 9])
+        stats = pipeline.stats()
+        self.assertEqual(list(stats), ['check', 'odd'])
+        self.assertEqual(stats['check']['received'], 10)
+        self.assertEqual(stats['check']['errors'], 1)
+        self.assertEqual(stats['check']['lastError'], 'ValueError: three')
+        self.assertEqual(stats['check']['sent'], 9)
+        self.assertEqual(stats['odd']['dropped'], 5)
+        self.assertEqual(stats['odd']['sent'], 4)
+        self.assertGreater(stats['odd']['throughput'], 0)
+
+    def test_inline_last_stage(self):
+        seen = []
+        stored = []
+
+        def store(item):
+            seen.append(threading.get_ident())
+            stored.append(item)
+            return item
+
+        pipeline = Pipeline([Stage('double', double, workers=2), Stage('store', store, INLINE)])
+        self.assertEqual(sorted(pipeline.run(range(5))), [0, 2, 4, 6, 8])
+        self.assertEqual(set(seen), {threading.get_ident()})
+        self.assertEqual(pipeline.stats()['store']['sent'], 5)
+
+    def test_backpressure(self):
+        # a slow last stage keeps the source at most a few queues ahead
+        read = []
+
+        def source():
+            for item in range(200):
+                read.append(item)
+                yield item
+
+        pipeline = Pipeline([Stage('first', double), Stage('second', double)], queueSize=2)
+        results = pipeline.run(source())
+        next(results)
+        time.sleep(0.1)
+        self.assertLess(len(read), 12)
+        self.assertEqual(len(list(results)), 199)
+        self.assertEqual(pipeline.stats()['second']['peakQueued'], 2)
+        self.assertGreater(pipeline.stats()['first']['blocked'], 0)
+
+    def test_stop(self):
+        pipeline = Pipeline([Stage('double', double)], queueSize=2)
+        results = []
+        for item in pipeline.run(range(1000)):
+            results.append(item)
+            if len(results) == 3:
+                pipeline.stop()
+        self.assertTrue(pipeline.is_stopping())
+        # items already read still come out, in order with one worker
+        self.assertLess(len(results), 20)
+        self.assertEqual(results, [2 * item for item in range(len(results))])
+
+        # closing the generator early drains the stages
+        results = pipeline.run(range(1000))
+        self.assertEqual(next(results), 0)
+        results.close()
+        self.assertFalse(any(thread.is_alive() for thread in pipeline._threads))
+        self.assertEqual(list(pipeline.run(range(3))), [0, 2, 4])
+
+    def test_source_error(self):
+        def source():
+            yield 1
+            raise OSError('index page gone')
+
+        pipeline = Pipeline([Stage('double', double)])
+        results = []
+        with self.assertRaises(OSError):
+            for item in pipeline.run(source()):
+                results.append(item)
+        self.assertEqual(results, [2])
+
+    def test_process_stage(self):
+        pipeline = Pipeline([Stage('double', double, PROCESS, workers=2),
+                             Stage('check', fail_on_three, PROCESS)], queueSize=4)
+        self.assertEqual(sorted(pipeline.run(range(20))), [2 * item for item in range(20)])
+        stats = pipeline.stats()
+        self.assertEqual(stats['double']['received'], 20)
+        self.assertEqual(stats['check']['errors'], 0)
+
+    def test_process_stage_broken_pool(self):
+        # more items than the queues hold, the stage before must not block
+        pipeline = Pipeline([Stage('double', double),
+                             Stage('check', fail_on_three, PROCESS,
+                                   initializer=broken_initializer)], queueSize=2)
+        with self.assertRaises(BrokenProcessPool):
+            list(pipeline.run(range(50)))
+        self.assertIn('BrokenProcessPool', pipeline.stats()['check']['lastError'])
+        self.assertFalse(any(thread.is_alive() for thread in pipeline._threads))
+
+
+class TestRecipePipeline(unittest.TestCase):
+    def setUp(self):
+        # the parses are kept in a fresh shared cache, not the one of the
+        # other tests
+        self.sharedCache = parse_cache._sharedCache
+        self.cache = parse_cache._sharedCache = ParseCache()
+
+    def tearDown(self):
+        parse_cache._sharedCache = self.sharedCache
+
+    def test_build_recipe(self):
+        raw = ('cornbread', 'example.com', ['1 cup flour', '2 tbsp sugar'], 'bake')
+        parsed = [_Parsed('flour', 1, 'cup'), _Parsed('white sugar', 2, 'tablespoon')]
+        contentHash, recipe = build_recipe((raw, parsed))
+        self.assertEqual(len(contentHash), 64)
+        self.assertTrue(recipe.is_materialized())
+        self.assertIs(self.cache.get('1 cup flour'), parsed[0])
+        self.assertEqual([ingredient.name() for ingredient in recipe.ingredients()],
+                         ['flour', 'white sugar'])
+        unparsed = _Parsed('?', None, None)
+        unparsed.name = []
+        with self.assertRaises(ValueError):
+            build_recipe((raw, [parsed[0], unparsed]))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,39 @@
+import fractions
+import unittest
+
+import quantity
+
+Fraction = fractions.Fraction
+
+
+class TestQuantity(unittest.TestCase):
+    def test_to_fraction(self):
+        self.assertEqual(quantity.to_fraction(0.32223), Fraction(32223, 100000))
+        self.assertEqual(quantity.to_fraction('0.545'), Fraction(545, 1000))
+        self.assertEqual(quantity.to_fraction(3), Fraction(3))
+        self.assertEqual(quantity.to_fraction(2.0), Fraction(2))
+        with self.assertRaises(ValueError):
+            quantity.to_fraction('one')
+        with self.assertRaises(TypeError):
+            quantity.to_fraction([1])
+
+    def test_parse_amount(self):
+        self.assertEqual(quantity.parse_amount('½'), Fraction(1, 2))
+        self.assertEqual(quantity.parse_amount('⅓'), Fraction(1, 3))
+        self.assertEqual(quantity.parse_amount('1.5'), Fraction(3, 2))
+        with self.assertRaises(ValueError):
+            quantity.parse_amount('a pinch')
+        with self.assertRaises(TypeError):
+            quantity.parse_amount(None)
+
+    def test_conversions_are_exact(self):
+        self.assertEqual(quantity.kitchen_to_metric(Fraction(1, 3), 'teaspoon', 125),
+                         Fraction(125, 144))
+        self.assertEqual(quantity.metric_to_kitchen(Fraction(125), 125), (1, 'cup'))
+        self.assertEqual(quantity.metric_to_kitchen(Fraction(125, 16), 125),
+                         (1, 'tablespoon'))
+        self.assertEqual(quantity.metric_to_kitchen(Fraction(125, 48), 125),
+                         (1, 'teaspoon'))
+        self.assertEqual(quantity.metric_to_base(Fraction(2), 'kg'), (2000, 'g'))
+        self.assertEqual(quantity.metric_to_base(Fraction(2), 'ml'), (2, 'ml'))
+        self.assertAlmostEqual(quantity.kitchen_to_metric_float(1.0, 'tablespoon', 240), 15.0)
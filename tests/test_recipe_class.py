@@ -1,7 +1,17 @@
+import os
 import unittest
+from fractions import Fraction
 
+import parse_cache
+from batch_parser import local_nltk_data
+from parse_cache import ParseCache
+from ingredient_class import Ingredient
 from recipe_class import Recipe
 
+TAGGER_WEIGHTS = os.path.join(local_nltk_data, 'taggers',
+                              'averaged_perceptron_tagger_eng',
+                              'averaged_perceptron_tagger_eng.weights.json')
+
 class TestRecipe(unittest.TestCase):
     def setUp(self):
         # ingredients
@@ -24,6 +34,7 @@ class TestRecipe(unittest.TestCase):
                         '3.5 teaspoons baking powder', '1 teaspoon salt',
                         '1 cup milk', '0.33333334326744 cup vegetable oil',
                         '1 large egg']
+        self.ingredients3 = ingredients3
         self.steps1 = """Preheat oven to 400°F (204°C). Grease and lightly flour a 9-inch square baking pan. Set aside.
 Whisk the cornmeal, flour, baking powder, baking soda, and salt together in a large bowl. Set aside. In a medium bowl, whisk the melted butter, brown sugar, and honey together until completely smooth and thick. Then, whisk in the egg until combined. Finally, whisk in the buttermilk. Pour the wet ingredients into the dry ingredients and whisk until combined. Avoid over-mixing.
 Pour batter into prepared baking pan. Bake for 20 minutes or until golden brown on top and the center is cooked through. Use a toothpick to test. Edges should be crispy at this point. Allow to slightly cool before slicing and serving. Serve cornbread with butter, honey, jam, or whatever you like.
@@ -61,5 +72,206 @@ Slice and enjoy!
         self.assertEqual(self.cornbread2.instructions(), self.steps2)
         self.assertEqual(self.cornbread3.instructions(), self.steps3)
 
+    @unittest.skipUnless(os.path.exists(TAGGER_WEIGHTS),
+                         "NLTK tagger weights are not in nltk_data")
+    def test_from_many(self):
+        recipes = Recipe.from_many(
+            [("Golden Sweet Cornbread", "allrecipes", self.ingredients3, self.steps3),
+             ("Golden Sweet Cornbread 2", "allrecipes", self.ingredients3, self.steps3)],
+            workers=2)
+        self.assertEqual([recipe.title() for recipe in recipes],
+                         ["Golden Sweet Cornbread", "Golden Sweet Cornbread 2"])
+        for recipe in recipes:
+            self.assertEqual(recipe.instructions(), self.steps3)
+            self.assertEqual([ingredient.name() for ingredient in recipe._ingredients],
+                             [ingredient.name() for ingredient in self.cornbread3._ingredients])
+
+
+class _Text:
+    def __init__(self, text):
+        self.text = text
+
+
+class _Amount:
+    def __init__(self, quantity, unit):
+        self.quantity = quantity
+        self.unit = unit
+
+
+class _Parsed:
+    """
+    stands in for a ParsedIngredient so the lazy parsing can be tested
+    without the parser model
+    """
+    def __init__(self, name, quantity=None, unit=''):
+        self.name = [_Text(name)] if name else []
+        self.amount = [_Amount(quantity, unit)] if quantity else []
+
+
+class TestLazyRecipe(unittest.TestCase):
+    def setUp(self):
+        # every line used here is answered by this cache, nothing is parsed
+        self.sharedCache = parse_cache._sharedCache
+        self.cache = parse_cache._sharedCache = ParseCache()
+        self.cache.put('1 cup flour', _Parsed('flour', Fraction(1), 'cup'))
+        self.cache.put('2 cups milk', _Parsed('milk', Fraction(2), 'cup'))
+        self.cache.put('1 cup sugar', _Parsed('sugar', Fraction(1), 'cup'))
+        self.cache.put('a pinch of', _Parsed(None))
+
+    def tearDown(self):
+        parse_cache._sharedCache = self.sharedCache
+
+    def test_parses_on_first_use(self):
+        recipe = Recipe('pancakes', 'a', ['1 cup flour', '2 cups milk'], 'fry')
+        self.assertFalse(recipe.is_materialized())
+        self.assertEqual(recipe.title(), 'pancakes')
+        self.assertEqual(recipe.instructions(), 'fry')
+        self.assertFalse(recipe.is_materialized())
+        self.assertEqual([ingredient.name() for ingredient in recipe],
+                         ['flour', 'milk'])
+        self.assertTrue(recipe.is_materialized())
+        self.assertFalse(recipe.is_empty())
+
+    def test_materialize(self):
+        recipe = Recipe('pancakes', 'a', ['1 cup flour'], 'fry')
+        self.assertIs(recipe.materialize(), recipe)
+        self.assertTrue(recipe.is_materialized())
+        # a second call does not parse or add anything again
+        recipe.materialize()
+        self.assertEqual(len(recipe.ingredients()), 1)
+
+    def test_materialize_many(self):
+        recipes = [Recipe('a', '', ['1 cup flour', '1 cup sugar'], ''),
+                   Recipe('b', '', ['2 cups milk'], '')]
+        self.assertEqual(Recipe.materialize_many(recipes, workers=1), recipes)
+        self.assertTrue(all(recipe.is_materialized() for recipe in recipes))
+        self.assertEqual([len(recipe.ingredients()) for recipe in recipes],
+                         [2, 1])
+
+    def test_parse_error_is_raised_again(self):
+        recipe = Recipe('bad', '', ['1 cup flour', 'a pinch of'], '')
+        self.assertEqual(recipe.title(), 'bad')
+        for _ in range(2):
+            with self.assertRaises(ValueError):
+                recipe.materialize()
+            self.assertFalse(recipe.is_materialized())
+            self.assertEqual(recipe._ingredients, [])
+        with self.assertRaises(ValueError):
+            recipe.ingredients()
+
+    def test_type_error_is_eager(self):
+        with self.assertRaises(TypeError):
+            Recipe('bad', '', '1 cup flour', '')
+
+    def test_edit_with_line(self):
+        recipe = Recipe('a', '', ['1 cup flour'], '')
+        self.assertEqual(recipe.add_ingredient('2 cups milk'), 1)
+        recipe.replace_ingredient(0, '1 cup sugar')
+        self.assertEqual([ingredient.name() for ingredient in recipe],
+                         ['sugar', 'milk'])
+        with self.assertRaises(ValueError):
+            recipe.add_ingredient('a pinch of')
+
+    def test_compare_materializes_both(self):
+        first = Recipe('a', '', ['1 cup flour', '1 cup sugar'], '')
+        second = Recipe('b', '', ['1 cup flour'], '')
+        pairs = first.match_ingredients(second)
+        self.assertTrue(first.is_materialized())
+        self.assertTrue(second.is_materialized())
+        self.assertEqual([(a.name() if a else None, b.name() if b else None)
+                          for a, b in pairs],
+                         [('flour', 'flour'), ('sugar', None)])
+
+
+class TestRecipeEdits(unittest.TestCase):
+    def setUp(self):
+        self.names = ['flour', 'yellow cornmeal', 'white sugar', 'milk',
+                      'vegetable oil', 'baking powder']
+        self.recipe = Recipe.from_ingredients(
+            'cornbread', '', [Ingredient(name, 1, 'cup')
+                              for name in self.names], '')
+        self.references = [
+            Recipe.from_ingredients('a', '', [
+                Ingredient(name, 1, 'cup') for name in
+                ['bread flour', 'cornmeal', 'brown sugar', 'buttermilk']], ''),
+            Recipe.from_ingredients('b', '', [
+                Ingredient(name, 1, 'cup') for name in
+                ['extra-virgin olive oil', 'milk', 'sugar', 'flour']], '')]
+
+    def _names(self, pairs):
+        return [(first.name() if first else None,
+                 second.name() if second else None)
+                for first, second in pairs]
+
+    def assertMatchesFresh(self, recipe):
+        # the cached and incrementally updated comparisons must be the same
+        # as those of a recipe built from scratch
+        fresh = Recipe.from_ingredients('fresh', '', recipe.ingredients(), '')
+        for reference in self.references:
+            for optimal in (False, True):
+                self.assertEqual(
+                    self._names(recipe.match_ingredients(reference, optimal)),
+                    self._names(fresh.match_ingredients(reference, optimal)))
+                self.assertEqual(
+                    self._names(reference.match_ingredients(recipe, optimal)),
+                    self._names(reference.match_ingredients(fresh, optimal)))
+
+    def test_add_ingredient(self):
+        self.assertMatchesFresh(self.recipe)
+        index = self.recipe._keyword_index()
+        self.assertEqual(self.recipe.add_ingredient(
+            Ingredient('brown sugar', 1, 'cup')), 6)
+        self.assertIs(self.recipe._keyword_index(), index)
+        self.assertEqual(self.recipe.ingredients()[-1].name(), 'brown sugar')
+        self.assertMatchesFresh(self.recipe)
+
+    def test_remove_ingredient(self):
+        self.assertMatchesFresh(self.recipe)
+        removed = self.recipe.remove_ingredient(0)
+        self.assertEqual(removed.name(), 'flour')
+        self.assertMatchesFresh(self.recipe)
+        self.recipe.remove_ingredient(-1)
+        self.assertEqual(len(self.recipe.ingredients()), 4)
+        self.assertMatchesFresh(self.recipe)
+
+    def test_replace_ingredient(self):
+        self.assertMatchesFresh(self.recipe)
+        old = self.recipe.replace_ingredient(
+            3, Ingredient('buttermilk', 1, 'cup'))
+        self.assertEqual(old.name(), 'milk')
+        self.assertEqual(self.recipe.ingredients()[3].name(), 'buttermilk')
+        self.assertMatchesFresh(self.recipe)
+
+    def test_many_edits(self):
+        extra = ['sugar', 'bread flour', 'olive oil', 'milk', 'cornmeal']
+        for step, name in enumerate(extra):
+            self.recipe.replace_ingredient(step, Ingredient(name, 1, 'cup'))
+            self.assertMatchesFresh(self.recipe)
+            self.recipe.add_ingredient(Ingredient(name, 2, 'cup'))
+            self.assertMatchesFresh(self.recipe)
+            self.recipe.remove_ingredient(len(self.recipe.ingredients()) // 2)
+            self.assertMatchesFresh(self.recipe)
+
+    def test_edit_reference(self):
+        self.assertMatchesFresh(self.recipe)
+        self.references[0].replace_ingredient(
+            0, Ingredient('flour', 1, 'cup'))
+        self.assertMatchesFresh(self.recipe)
 
+    def test_cached_comparison(self):
+        first = self.recipe.match_ingredients(self.references[0])
+        second = self.recipe.match_ingredients(self.references[0])
+        self.assertEqual(first, second)
+        # callers get their own list
+        second.clear()
+        self.assertEqual(self.recipe.match_ingredients(self.references[0]),
+                         first)
 
+    def test_invalid_edits(self):
+        with self.assertRaises(IndexError):
+            self.recipe.remove_ingredient(6)
+        with self.assertRaises(TypeError):
+            self.recipe.remove_ingredient('flour')
+        with self.assertRaises(TypeError):
+            self.recipe.add_ingredient(1)
+        self.assertEqual(len(self.recipe.ingredients()), 6)
@@ -0,0 +1,119 @@
+import time
+import threading
+import unittest
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+from recipe_fetcher import RecipeFetcher
+
+RECIPE_PAGE = """<html><head><title>Cornbread</title>
+<script type="application/ld+json">
+{"@context": "https://schema.org", "@type": "Recipe", "name": "Test Cornbread",
+ "recipeIngredient": ["1 cup cornmeal", "1 cup flour"],
+ "recipeInstructions": "Mix and bake."}
+</script></head><body></body></html>"""
+
+
+class RecipeHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        server = self.server
+        with server.lock:
+            server.requests.append(self.path)
+            server.active += 1
+            server.maxActive = max(server.maxActive, server.active)
+        try:
+            if self.path.startswith('/slow'):
+                time.sleep(0.05)
+            if self.path == '/flaky' and server.requests.count('/flaky') < 3:
+                self._send(503, 'try again')
+            elif self.path == '/missing':
+                self._send(404, 'not found')
+            else:
+                self._send(200, RECIPE_PAGE)
+        finally:
+            with server.lock:
+                server.active -= 1
+
+    def _send(self, status, body):
+        data = body.encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+
+class TestRecipeFetcher(unittest.TestCase):
+    def setUp(self):
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), RecipeHandler)
+        self.server.lock = threading.Lock()
+        self.server.requests = []
+        self.server.active = 0
+        self.server.maxActive = 0
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        self.base = f"http://127.0.0.1:{self.server.server_address[1]}"
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_fetch_all(self):
+        urls = [f"{self.base}/recipe/{i}" for i in range(20)]
+        with RecipeFetcher(maxWorkers=8) as fetcher:
+            results = list(fetcher.fetch_all(urls))
+        self.assertEqual(sorted(result.url for result in results), sorted(urls))
+        for result in results:
+            self.assertTrue(result.ok())
+            self.assertEqual(result.status, 200)
+            self.assertIn('Test Cornbread', result.text)
+
+    def test_retries(self):
+        with RecipeFetcher(retries=3, backoff=0.01) as fetcher:
+            result = fetcher.fetch(f"{self.base}/flaky")
+            self.assertTrue(result.ok())
+            self.assertEqual(result.attempts, 3)
+
+            # client errors are not retried
+            result = fetcher.fetch(f"{self.base}/missing")
+            self.assertFalse(result.ok())
+            self.assertEqual(result.status, 404)
+            self.assertEqual(result.attempts, 1)
+
+        with RecipeFetcher(retries=1, backoff=0.01, timeout=1) as fetcher:
+            result = fetcher.fetch("http://127.0.0.1:1/closed")
+            self.assertIsNone(result.status)
+            self.assertEqual(result.attempts, 2)
+            self.assertIn('ConnectionError', result.error)
+
+    def test_per_host_limits(self):
+        urls = [f"{self.base}/slow/{i}" for i in range(12)]
+        with RecipeFetcher(maxWorkers=8, perHostConcurrency=2) as fetcher:
+            self.assertEqual(len(list(fetcher.fetch_all(urls))), 12)
+        self.assertLessEqual(self.server.maxActive, 2)
+
+        started = time.monotonic()
+        with RecipeFetcher(maxWorkers=4, perHostRate=50) as fetcher:
+            list(fetcher.fetch_all(f"{self.base}/recipe/{i}" for i in range(6)))
+        self.assertGreaterEqual(time.monotonic() - started, 5 / 50)
+
+    def test_scrape_all(self):
+        urls = [f"{self.base}/recipe/1", f"{self.base}/missing"]
+        with RecipeFetcher(retries=0) as fetcher:
+            results = {result.url: scraper
+                       for result, scraper in fetcher.scrape_all(urls, supportedOnly=False)}
+        self.assertIsNone(results[f"{self.base}/missing"])
+        scraper = results[f"{self.base}/recipe/1"]
+        self.assertEqual(scraper.title(), 'Test Cornbread')
+        self.assertEqual(scraper.ingredients(), ['1 cup cornmeal', '1 cup flour'])
+
+        # the local server is not a supported site
+        with RecipeFetcher(retries=0) as fetcher:
+            result, scraper = next(fetcher.scrape_all(urls[:1]))
+        self.assertIsNone(scraper)
+        self.assertIsNotNone(result.error)
+
+        with self.assertRaises(ValueError):
+            RecipeFetcher(perHostConcurrency=0)
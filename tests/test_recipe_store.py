@@ -0,0 +1,118 @@
+import os
+import tempfile
+import unittest
+from fractions import Fraction
+
+from ingredient_class import Ingredient
+from recipe_class import Recipe
+from recipe_store import RecipeStore, content_hash
+from batch_parser import local_nltk_data
+
+TAGGER_WEIGHTS = os.path.join(local_nltk_data, 'taggers',
+                              'averaged_perceptron_tagger_eng',
+                              'averaged_perceptron_tagger_eng.weights.json')
+
+
+class TestRecipeStore(unittest.TestCase):
+    def setUp(self):
+        self.store = RecipeStore()
+        self.cornbread = Recipe.from_ingredients(
+            'cornbread', 'a', [Ingredient('all-purpose Flour', 1, 'cup'),
+                               Ingredient('buttermilk', 250, 'ml'),
+                               Ingredient('white sugar', '⅓', 'cup')], 'bake',
+            servings=Fraction(9, 2))
+        self.pancakes = Recipe.from_ingredients(
+            'pancakes', 'b', [Ingredient('bread flour', 2, 'cup'),
+                              Ingredient('milk', 1, 'cup')], 'fry')
+        self.cornbreadId = self.store.add(self.cornbread, 'hash1')
+        self.pancakesId = self.store.add(self.pancakes, 'hash2')
+
+    def tearDown(self):
+        self.store.close()
+
+    def test_add_skips_stored(self):
+        self.assertEqual(len(self.store), 2)
+        self.assertTrue(self.store.has('hash1'))
+        self.assertIsNone(self.store.add(self.pancakes, 'hash2'))
+        self.assertEqual(len(self.store), 2)
+        self.assertEqual(self.store.ids(), [self.cornbreadId, self.pancakesId])
+
+    def test_load_round_trip(self):
+        loaded = self.store.load(self.cornbreadId)
+        self.assertEqual((loaded.title(), loaded.source(), loaded.instructions()),
+                         ('cornbread', 'a', 'bake'))
+        for original, restored in zip(self.cornbread.ingredients(), loaded.ingredients()):
+            self.assertEqual(restored.name(), original.name())
+            self.assertEqual(restored.kitchen_amount(), original.kitchen_amount())
+            self.assertEqual(restored.metric_amount(), original.metric_amount())
+            self.assertEqual(restored.kitchen_measure(), original.kitchen_measure())
+            self.assertEqual(restored.metric_measure(), original.metric_measure())
+            self.assertEqual(restored.state(), original.state())
+            self.assertEqual(restored.keywords(), original.keywords())
+        self.assertEqual(loaded.ingredients()[2].kitchen_amount(), Fraction(1, 3))
+        self.assertEqual(loaded.servings(), Fraction(9, 2))
+        self.assertIsNone(self.store.load(self.pancakesId).servings())
+        with self.assertRaises(KeyError):
+            self.store.load(99)
+
+    def test_whole_servings_round_trip(self):
+        self.pancakes.set_servings(4)
+        loaded = self.store.load(self.store.add(self.pancakes, 'hash3'))
+        self.assertEqual(loaded.servings(), 4)
+        self.assertIs(type(loaded.servings()), int)
+        self.assertIs(type(self.store.load(self.cornbreadId).servings()),
+                      Fraction)
+
+    def test_queries(self):
+        self.assertEqual(self.store.recipes_with_keyword('buttermilk'),
+                         [(self.cornbreadId, 'cornbread')])
+        self.assertEqual(self.store.recipes_with_keyword('Flour'),
+                         [(self.cornbreadId, 'cornbread'), (self.pancakesId, 'pancakes')])
+        self.assertEqual(self.store.recipes_with_keyword('white sugar'),
+                         [(self.cornbreadId, 'cornbread')])
+        self.assertEqual(self.store.recipes_with_ingredient('Bread Flour'),
+                         [(self.pancakesId, 'pancakes')])
+        self.assertEqual(self.store.recipes_with_ingredient('flour'), [])
+
+    def test_queries_use_indexes(self):
+        plan = ' '.join(row[-1] for row in self.store._connection.execute(
+            "EXPLAIN QUERY PLAN SELECT recipe_id FROM ingredient_keywords "
+            "WHERE keyword = ?", ('milk',)))
+        self.assertIn('USING PRIMARY KEY', plan)
+        plan = ' '.join(row[-1] for row in self.store._connection.execute(
+            "EXPLAIN QUERY PLAN SELECT recipe_id FROM ingredients WHERE name = ?",
+            ('milk',)))
+        self.assertIn('ingredients_name', plan)
+
+    def test_ingest_skips_stored_without_parsing(self):
+        recipe = ('cornbread', 'a', ['1 cup flour'], 'bake')
+        self.store.add(self.cornbread, content_hash(*recipe))
+        # nothing left to parse, so this works without the parser model
+        self.assertEqual(self.store.ingest([recipe, recipe]), 0)
+
+    def test_file_store(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'recipes.db')
+            with RecipeStore(path) as store:
+                recipeId = store.add(self.pancakes, 'hash')
+            with RecipeStore(path) as store:
+                self.assertEqual(store.load(recipeId).ingredients()[1].name(), 'milk')
+
+    def test_store_without_servings_column(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'recipes.db')
+            with RecipeStore(path) as store:
+                store._connection.execute(
+                    "ALTER TABLE recipes DROP COLUMN servings")
+            with RecipeStore(path) as store:
+                recipeId = store.add(self.cornbread, 'hash')
+                self.assertEqual(store.load(recipeId).servings(), Fraction(9, 2))
+
+    @unittest.skipUnless(os.path.exists(TAGGER_WEIGHTS), 'NLTK tagger data not installed')
+    def test_ingest(self):
+        recipes = [('a', '', ['1 cup flour', '1 cup buttermilk'], ''),
+                   ('b', '', ['2 cups sugar'], '')]
+        self.assertEqual(self.store.ingest(recipes + recipes[:1]), 2)
+        self.assertEqual(self.store.ingest(recipes), 0)
+        self.assertEqual([title for _, title in self.store.recipes_with_keyword('buttermilk')],
+                         ['a'])
@@ -0,0 +1,92 @@
+import unittest
+
+import numpy as np
+
+from ingredient_class import Ingredient
+from recipe_class import Recipe
+from scaling import MassMatrix, scale_recipes
+
+
+def make_ingredient(name, amount, measure):
+    if not measure:
+        # dimensionless, such as 3 eggs
+        return Ingredient.from_fields(name, amount, None, None, None, 'thing', None)
+    return Ingredient(name, amount, measure)
+
+def make_recipe(title, ingredients, servings=None):
+    return Recipe.from_ingredients(title, 'test', [make_ingredient(*args) for args in ingredients],
+                                   '', servings=servings)
+
+
+class TestScaling(unittest.TestCase):
+    def setUp(self):
+        # a 9x13 pan of 24 and an 8 inch square pan of 9 with the same
+        # proportions per serving
+        self.large = make_recipe('9x13', [('flour', 3, 'cup'), ('white sugar', 1.5, 'cup'),
+                                          ('butter', 1, 'cup'), ('eggs', 3, '')], servings=24)
+        self.small = make_recipe('8 inch', [('all-purpose flour', 1.125, 'cup'),
+                                            ('white sugar', 0.5625, 'cup'),
+                                            ('butter', 6, 'tablespoon')], servings=9)
+        self.unknown = make_recipe('no yield', [('milk', 1, 'cup'), ('milk', 0.5, 'cup')])
+        self.masses = MassMatrix.from_recipes([self.large, self.small, self.unknown])
+
+    def test_matrix(self):
+        self.assertEqual(self.masses.keys(), ['9x13', '8 inch', 'no yield'])
+        self.assertEqual(self.masses.terms(), ['flour', 'white sugar', 'butter', 'milk'])
+        grams = self.masses.grams()
+        self.assertEqual(grams.shape, (3, 4))
+        self.assertAlmostEqual(grams[0, 0], 375.0)
+        # ingredients with the same term are summed, eggs have no mass
+        self.assertAlmostEqual(grams[2, 3], 360.0)
+        np.testing.assert_allclose(self.masses.totals(), [375 + 300 + 227, 140.625 + 112.5 + 85.125, 360])
+        self.assertTrue(np.isnan(self.masses.servings()[2]))
+
+    def test_per_serving(self):
+        perServing = self.masses.scaled('serving')
+        np.testing.assert_allclose(perServing[0], perServing[1])
+        self.assertAlmostEqual(perServing[0, 0], 375 / 24)
+        self.assertTrue(np.isnan(perServing[2]).all())
+
+        comparison = self.masses.compare('9x13', '8 inch')
+        for term, (first, second) in comparison.items():
+            self.assertAlmostEqual(first, second, msg=term)
+
+    def test_per_total_mass(self):
+        perKilogram = self.masses.scaled('mass', 1000)
+        np.testing.assert_allclose(perKilogram.sum(axis=1), [1000, 1000, 1000])
+        self.assertEqual(self.masses.row('no yield', 'mass', 500), {'milk': 500.0})
+        self.assertEqual(self.masses.row('no yield'), {'milk': 360.0})
+
+    def test_empty_and_errors(self):
+        empty = MassMatrix.from_recipes([make_recipe('eggs', [('eggs', 2, '')], 2)])
+        self.assertEqual(empty.terms(), [])
+        self.assertTrue(np.isnan(empty.factors('mass')).all())
+        with self.assertRaises(ValueError):
+            self.masses.scaled('pan')
+        with self.assertRaises(ValueError):
+            self.masses.scaled('mass', 0)
+        with self.assertRaises(KeyError):
+            self.masses.row('missing')
+        with self.assertRaises(ValueError):
+            MassMatrix(['a'], ['flour'], np.zeros((2, 1)), np.ones(1))
+
+    def test_scale_recipes(self):
+        terms, scaled = scale_recipes([self.large, self.small], 'mass', 100)
+        self.assertEqual(terms, ['flour', 'white sugar', 'butter'])
+        np.testing.assert_allclose(scaled[0], scaled[1])
+
+    def test_recipe_servings(self):
+        self.assertEqual(self.large.servings(), 24)
+        self.assertIsNone(self.unknown.servings())
+        self.unknown.set_servings(2)
+        self.assertEqual(self.unknown.servings(), 2)
+        self.assertEqual(self.large.compact().servings(), 24)
+        with self.assertRaises(ValueError):
+            self.unknown.set_servings(0)
+        with self.assertRaises(TypeError):
+            self.unknown.set_servings('4')
+        with self.assertRaises(TypeError):
+            Recipe('a', '', [], '', servings=True)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,145 @@
+import pickle
+import unittest
+from fractions import Fraction
+
+import serialization
+from compact_ingredient import CompactIngredient
+from ingredient_class import Ingredient
+from recipe_class import Recipe
+
+
+class TestSerialization(unittest.TestCase):
+    def setUp(self):
+        self.flour = Ingredient('all-purpose Flour', 1, 'cup')
+        self.sugar = Ingredient('white sugar', '⅓', 'cup')
+        self.milk = Ingredient('buttermilk', 250, 'ml')
+        self.cornbread = Recipe.from_ingredients(
+            'cornbread', 'a', [self.flour, self.milk, self.sugar], 'bake',
+            [Ingredient('honey', 2, 'tbsp')], 8)
+        self.pancakes = Recipe.from_ingredients(
+            'pancakes', None, [Ingredient('bread flour', 2, 'cup'),
+                               Ingredient('milk', 1, 'cup')], 'fry')
+
+    def assertIngredientEqual(self, first, second):
+        self.assertEqual(first.name(), second.name())
+        self.assertEqual(first.kitchen_amount(), second.kitchen_amount())
+        self.assertEqual(first.kitchen_measure(), second.kitchen_measure())
+        self.assertEqual(first.metric_amount(), second.metric_amount())
+        self.assertEqual(first.metric_measure(), second.metric_measure())
+        self.assertEqual(first.state(), second.state())
+        self.assertEqual(first._density, second._density)
+        self.assertEqual(first.keywords(), second.keywords())
+
+    def assertRecipeEqual(self, first, second):
+        self.assertEqual(first.title(), second.title())
+        self.assertEqual(first.source(), second.source())
+        self.assertEqual(first.instructions(), second.instructions())
+        self.assertEqual(first.servings(), second.servings())
+        self.assertEqual(len(first.ingredients()), len(second.ingredients()))
+        for a, b in zip(first.ingredients(), second.ingredients()):
+            self.assertIngredientEqual(a, b)
+        self.assertEqual(len(first.optional_ingredients()),
+                         len(second.optional_ingredients()))
+        for a, b in zip(first.optional_ingredients(),
+                        second.optional_ingredients()):
+            self.assertIngredientEqual(a, b)
+
+    def test_ingredient_round_trip(self):
+        for ingredient in (self.flour, self.sugar, self.milk):
+            decoded = Ingredient.from_bytes(ingredient.to_bytes())
+            self.assertIngredientEqual(decoded, ingredient)
+        self.assertIsInstance(Ingredient.from_bytes(
+            self.sugar.to_bytes()).kitchen_amount(), Fraction)
+
+    def test_recipe_round_trip(self):
+        decoded = Recipe.from_bytes(self.cornbread.to_bytes())
+        self.assertRecipeEqual(decoded, self.cornbread)
+
+    def test_batch_round_trip(self):
+        recipes = [self.cornbread, self.pancakes, self.cornbread]
+        decoded = serialization.decode_recipes(
+            serialization.encode_recipes(recipes))
+        self.assertEqual(len(decoded), 3)
+        self.assertEqual([recipe.servings() for recipe in decoded],
+                         [8, None, 8])
+        self.assertIs(type(decoded[0].servings()), int)
+        for first, second in zip(decoded, recipes):
+            self.assertRecipeEqual(first, second)
+        # a repeated row is decoded once but gives separate ingredients
+        self.assertIsNot(decoded[0].ingredients()[0],
+                         decoded[2].ingredients()[0])
+        # decoded ingredients share the interned keywords
+        self.assertIs(decoded[0].ingredients()[0].keywords(),
+                      decoded[2].ingredients()[0].keywords())
+
+    def test_compact_round_trip(self):
+        compact = [CompactIngredient.from_ingredient(ingredient)
+                   for ingredient in (self.flour, self.milk, self.sugar)]
+        recipe = Recipe.from_ingredients('cornbread', 'a', compact, 'bake',
+                                         servings=8)
+        decoded = Recipe.from_bytes(recipe.to_bytes())
+        self.assertRecipeEqual(decoded, recipe)
+        # compact float amounts come back exactly, as Fractions
+        self.assertEqual(decoded.ingredients()[2].kitchen_amount(),
+                         compact[2].kitchen_amount())
+        self.assertEqual(serialization.encode_ingredients(compact),
+                         serialization.encode_ingredients(
+                             decoded.ingredients()))
+
+    def test_wide_values(self):
+        # amounts past 64 bits are written as varints
+        ingredient = Ingredient.from_fields(
+            'salt', Fraction(1, 3 ** 50), 'teaspoon', Fraction(-7, 2 ** 70),
+            'g', 'solid', None)
+        self.assertIngredientEqual(
+            Ingredient.from_bytes(ingredient.to_bytes()), ingredient)
+
+    def test_empty(self):
+        self.assertEqual(serialization.decode_recipes(
+            serialization.encode_recipes([])), [])
+        self.assertEqual(serialization.decode_ingredients(
+            serialization.encode_ingredients([])), [])
+
+    def test_stable_bytes(self):
+        recipes = [self.cornbread, self.pancakes]
+        encoded = serialization.encode_recipes(recipes)
+        self.assertEqual(encoded, serialization.encode_recipes(recipes))
+        self.assertEqual(encoded, serialization.encode_recipes(
+            serialization.decode_recipes(encoded)))
+
+    def test_smaller_than_pickle(self):
+        # distinct objects, pickle stores a repeated object once
+        recipes = [Recipe.from_ingredients(
+            f'recipe {number}', 'a', [Ingredient('white sugar', number, 'cup'),
+                                      Ingredient('buttermilk', 250, 'ml')],
+            'bake') for number in range(1, 41)]
+        encoded = serialization.encode_recipes(recipes)
+        pickled = pickle.dumps(recipes, pickle.HIGHEST_PROTOCOL)
+        self.assertLess(len(encoded) * 3, len(pickled))
+
+    def test_invalid_data(self):
+        encoded = self.cornbread.to_bytes()
+        with self.assertRaises(TypeError):
+            Recipe.from_bytes('not bytes')
+        with self.assertRaises(ValueError):
+            Recipe.from_bytes(b'XYZ' + encoded[3:])
+        with self.assertRaises(ValueError):
+            Recipe.from_bytes(encoded[:3] + bytes([serialization.VERSION + 1])
+                              + encoded[4:])
+        with self.assertRaises(ValueError):
+            Ingredient.from_bytes(encoded)
+        with self.assertRaises(ValueError):
+            Recipe.from_bytes(encoded + b'\x00')
+        for end in range(len(encoded)):
+            with self.assertRaises(ValueError):
+                Recipe.from_bytes(encoded[:end])
+
+    def test_one_record(self):
+        with self.assertRaises(ValueError):
+            Recipe.from_bytes(serialization.encode_recipes(
+                [self.cornbread, self.pancakes]))
+        with self.assertRaises(ValueError):
+            Ingredient.from_bytes(serialization.encode_ingredients([]))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,50 @@
+import unittest
+
+from trigram_index import TrigramIndex, normalize, similarity, trigrams
+
+
+class TestTrigramIndex(unittest.TestCase):
+    def setUp(self):
+        self.index = TrigramIndex(['buttermilk', 'butter', 'milk',
+                                   'all-purpose flour', 'bread flour'])
+
+    def test_trigrams(self):
+        self.assertEqual(normalize(' All-Purpose  flour,'), 'all purpose flour')
+        self.assertEqual(trigrams('milk'), {' mi', 'mil', 'ilk', 'lk '})
+        self.assertEqual(trigrams(''), frozenset())
+        self.assertEqual(similarity('flour, all purpose', 'all-purpose flour'), 1.0)
+        self.assertEqual(similarity('milk', 'milk'), 1.0)
+        self.assertEqual(similarity('milk', 'oat'), 0.0)
+        self.assertEqual(similarity('', ''), 0.0)
+
+    def test_search(self):
+        results = self.index.search('buttermik')
+        self.assertEqual(results[0][1], 'buttermilk')
+        self.assertEqual(results[1][1], 'butter')
+        self.assertEqual([score for score, _ in results],
+                         sorted((score for score, _ in results), reverse=True))
+        self.assertEqual(self.index.search('buttermik', threshold=0.7),
+                         results[:1])
+        self.assertEqual(len(self.index.search('flour', limit=1)), 1)
+        self.assertEqual(self.index.search('zzz'), [])
+
+    def test_best(self):
+        self.assertEqual(self.index.best('flour, all purpose'),
+                         (1.0, 'all-purpose flour'))
+        self.assertIsNone(self.index.best('rice', threshold=0.5))
+        self.assertEqual(self.index.name(2), 'milk')
+        self.assertEqual(len(self.index), 5)
+
+    def test_scores_match_similarity(self):
+        for position, score in self.index.scores('bred flour').items():
+            self.assertAlmostEqual(
+                score, similarity('bred flour', self.index.name(position)))
+
+    def test_type_errors(self):
+        with self.assertRaises(TypeError):
+            self.index.add(1)
+        with self.assertRaises(TypeError):
+            self.index.search(None)
+
+if __name__ == '__main__':
+    unittest.main()
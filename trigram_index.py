@@ -0,0 +1,155 @@
+"""
+character trigram index for fuzzy lookup of ingredient names
+
+names are lower cased and split into words on anything that is not a letter
+or a digit, and each word is padded with a space on both sides before it is
+cut into trigrams. Padding makes the first and last letters of a word count,
+and working per word means reordered names ("flour, all purpose") share
+almost every trigram with the original. Two names are scored by the Dice
+coefficient of their trigram sets, 1.0 for the same set and 0.0 for none in
+common.
+"""
+import re
+from collections import Counter
+from itertools import chain
+
+_NOT_WORD = re.compile(r'[^0-9a-z]+')
+
+def normalize(name: str) -> str:
+    """
+    returns name lower cased with every run of punctuation or spaces replaced
+    by a single space, such as 'all purpose flour' for 'All-Purpose  flour,'
+    """
+    return _NOT_WORD.sub(' ', name.lower()).strip()
+
+def trigrams(name: str) -> frozenset:
+    """
+    returns the set of padded word trigrams of name, see the module docstring
+    """
+    result = set()
+    for word in normalize(name).split():
+        padded = f" {word} "
+        for start in range(len(padded) - 2):
+            result.add(padded[start:start + 3])
+    return frozenset(result)
+
+def similarity(first: str, second: str) -> float:
+    """
+    returns the Dice coefficient of the trigrams of first and second
+    """
+    firstTrigrams = trigrams(first)
+    secondTrigrams = trigrams(second)
+    total = len(firstTrigrams) + len(secondTrigrams)
+    if not total:
+        return 0.0
+    return 2 * len(firstTrigrams & secondTrigrams) / total
+
+
+class TrigramIndex:
+    """
+    inverted index from trigrams to a fixed vocabulary of names
+
+    a search only visits the names that share at least one trigram with the
+    query, so its cost depends on how common the query's trigrams are and not
+    on the size of the vocabulary
+    """
+
+    def __init__(self, names=()):
+        """
+        constructor class
+
+        Parameters:
+            names: iterable of str:
+                vocabulary to index, the position of a name breaks ties
+                between names with the same score
+
+        Attributes:
+            self._names:
+                list of the indexed names in insertion order
+
+            self._sizes:
+                list of the number of trigrams of each name
+
+            self._postings:
+                dict of trigram -> list of positions of the names that have it
+        """
+        self._names = []
+        self._sizes = []
+        self._postings = {}
+        for name in names:
+            self.add(name)
+
+    def add(self, name: str) -> int:
+        """
+        indexes name and returns its position
+
+        Raises:
+            TypeError:
+                if name is not a str
+        """
+        if not isinstance(name, str):
+            raise TypeError(f"name must be a str but is a {type(name)}")
+        position = len(self._names)
+        nameTrigrams = trigrams(name)
+        self._names.append(name)
+        self._sizes.append(len(nameTrigrams))
+        for trigram in nameTrigrams:
+            self._postings.setdefault(trigram, []).append(position)
+        return position
+
+    def search(self, name: str, threshold: float = 0.0,
+               limit: int | None = None) -> list:
+        """
+        returns (score, name) for every indexed name whose similarity with
+        name is at least threshold, best score first and ties in insertion
+        order. At most limit results are returned if limit is not None
+
+        Raises:
+            TypeError:
+                if name is not a str
+        """
+        scored = [(-score, position)
+                  for position, score in self.scores(name).items()
+                  if score >= threshold]
+        scored.sort()
+        if limit is not None:
+            scored = scored[:limit]
+        return [(-negativeScore, self._names[position])
+                for negativeScore, position in scored]
+
+    def scores(self, name: str) -> dict:
+        """
+        returns a dict of position -> similarity with name for every indexed
+        name that shares at least one trigram with name
+
+        Raises:
+            TypeError:
+                if name is not a str
+        """
+        if not isinstance(name, str):
+            raise TypeError(f"name must be a str but is a {type(name)}")
+        queryTrigrams = trigrams(name)
+        postings = self._postings
+        shared = Counter(chain.from_iterable(
+            postings.get(trigram, ()) for trigram in queryTrigrams))
+        querySize = len(queryTrigrams)
+        sizes = self._sizes
+        return {position: 2 * count / (querySize + sizes[position])
+                for position, count in shared.items()}
+
+    def name(self, position: int) -> str:
+        """
+        returns the indexed name at position
+        """
+        return self._names[position]
+
+    def best(self, name: str, threshold: float = 0.0) -> tuple | None:
+        """
+        returns (score, name) of the indexed name most similar to name, or
+        None if no name scores at least threshold
+        """
+        found = self.search(name, threshold, limit=1)
+        return found[0] if found else None
+
+    def __len__(self) -> int:
+        return len(self._names)